@@ -1,36 +1,233 @@
 # GhostEncryptorV26G_Final.py
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from .ghash import GHash
 from .ghost_operator_g import GhostOperatorG
 from .ghost_matrix_cipher_g import GhostMatrixCipherG
 from .ghost_compressor_g_symbolic import GhostCompressorG
-from .ghost_mac_g import GhostMACG
+from .compressor_zlib import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_OUTPUT, INSTANCE_LIMIT
+from .ghost_cache_g import GhostCacheG
+from .ghost_mac_g import GhostMACG, GhostMACStreamG, TREE_BLOCK_SIZE
+from .ghost_header_g import GhostHeaderG, HEADER_SIZE, CODEC_SYMBOLIC, LEGACY_ROUNDS, validate_rounds
 from .ghost_pq_hybrid import simulate_kyber_encapsulate, simulate_kyber_decapsulate  # Suporte pós-quântico real
 from .ghost_pq_hybrid import GhostPQHybrid  # Simulação de integração com criptografia pós-quântica (PQ)
 
+
+# Substitui o print das mensagens de progresso quando quiet=True
+def _silent(*args, **kwargs):
+    pass
+
+
 # class GhostEncryptorV26G
 # Esta classe implementa a criptografia e descriptografia usando a Álgebra G.
 # Ela utiliza um operador G, cifragem de matriz, compressão simbólica e MAC-G.
 # A implementação é baseada em conceitos de criptografia moderna e técnicas de segurança.
 # A classe é escrita em Python e utiliza bibliotecas padrão para operações de criptografia.
 # A classe também inclui métodos para criptografar e descriptografar arquivos, garantindo que os dados possam ser recuperados corretamente.
+#
+# Thread-safety: uma única instância pode ser compartilhada entre threads. Depois do __init__,
+# o estado compartilhado é somente leitura (seed, operador, cifra, compressor, MAC); o KEM é
+# calculado uma única vez sob lock e os atributos last_recovered_* são mantidos por thread.
+# encrypt_concurrent/decrypt_concurrent distribuem lotes em um ThreadPoolExecutor interno
+# (zlib e os kernels NumPy do backend liberam o GIL em buffers grandes).
+#
+# Formato: cabeçalho GhostHeaderG (8) + pubkey (32) + MAC-G (64) + ciphertext.
+# O cabeçalho registra codec, rodadas e modo do MAC, e também é coberto pelo MAC-G;
+# ciphertexts legados (sem cabeçalho, 9 rodadas) continuam sendo aceitos.
 
 class GhostEncryptorV26G:
-    def __init__(self, seed: bytes = b"default_seed"):
+    def __init__(self, seed: bytes = b"default_seed", mac_mode: str = "linear", executor=None,
+                 dictionary_id: int = None, rounds: int = 9, max_output: int = DEFAULT_MAX_OUTPUT,
+                 cache=None):
         # Garante que seed é bytes
         if isinstance(seed, str):
             seed = seed.encode('utf-8')
 
         self.seed = seed
-        self.operator_g = GhostOperatorG(self.seed)
-        self.cipher = GhostMatrixCipherG(self.seed)
-        self.compressor = GhostCompressorG(seed=self.seed)
-        self.mac = GhostMACG(self.seed)
-        self.last_recovered_extension = None
-        self.last_recovered_data = None
-
-    def encrypt(self, plaintext: str) -> bytes:
+        # Rodadas GCBC padrão (ímpares); podem ser escolhidas por mensagem e ficam registradas no cabeçalho
+        self.rounds = validate_rounds(rounds)
+        # executor (GhostParallelExecutorG) paraleliza operador G e GCBC em payloads grandes
+        # cache (GhostCacheG ou caminho de diretório): matriz e KEM carregados do disco
+        if isinstance(cache, str):
+            cache = GhostCacheG(cache)
+        self.operator_g = GhostOperatorG(self.seed, executor=executor)
+        self.cipher = GhostMatrixCipherG(self.seed, executor=executor,
+                                         matrix=cache.matrix_for(self.seed) if cache is not None else None)
+        # dictionary_id: dicionário zlib pré-definido (ghost_dictionary_g) para mensagens pequenas
+        # max_output limita o tamanho descomprimido de cada mensagem (proteção contra bombas zlib)
+        self.compressor = GhostCompressorG(seed=self.seed, dictionary_id=dictionary_id, max_output=max_output)
+        # mac_mode="tree" usa o MAC-G em árvore (folhas verificáveis em paralelo)
+        self.mac = GhostMACG(self.seed, mode=mac_mode)
+        self._local = threading.local()
+        self._kem = cache.kem_for(self.seed) if cache is not None else None
+        self._kem_lock = threading.Lock()
+        self._thread_pool = None
+        self._pool_lock = threading.Lock()
+
+    # Estado de recuperação é por thread, para que chamadas concorrentes não se misturem
+    @property
+    def last_recovered_extension(self):
+        return getattr(self._local, "extension", None)
+
+    @last_recovered_extension.setter
+    def last_recovered_extension(self, value):
+        self._local.extension = value
+
+    @property
+    def last_recovered_data(self):
+        return getattr(self._local, "data", None)
+
+    @last_recovered_data.setter
+    def last_recovered_data(self, value):
+        self._local.data = value
+
+    def _session_keys(self):
+        # O KEM simulado é determinístico por seed: calculado uma única vez por instância
+        # e reaproveitado, para que instâncias "quentes" não repitam a derivação a cada chamada.
+        if self._kem is None:
+            with self._kem_lock:
+                if self._kem is None:
+                    self._kem = simulate_kyber_encapsulate(self.seed)
+        return self._kem
+
+    # ------------------------------------------------------------------ #
+    # Cabeçalho versionado
+    # ------------------------------------------------------------------ #
+    def _header(self, rounds: int) -> bytes:
+        block_size = self.mac.block_size if self.mac.mode == "tree" else 0
+        return GhostHeaderG(CODEC_SYMBOLIC, rounds, self.mac.mode, block_size).pack()
+
+    def _parse_frame(self, ciphertext: bytes, legacy: bool = False):
+        """Separa (cabeçalho, pubkey, mac, ciphertext); cabeçalho é None no formato legado."""
+        if not legacy and GhostHeaderG.has_header(ciphertext):
+            header = GhostHeaderG.unpack(ciphertext)
+            if header.codec != CODEC_SYMBOLIC:
+                raise ValueError(f"Codec não suportado por este decifrador: {header.codec}")
+            body = ciphertext[HEADER_SIZE:]
+            return header, body[:32], body[32:96], body[96:]
+        return None, ciphertext[:32], ciphertext[32:96], ciphertext[96:]
+
+    def _mac_engine(self, header: GhostHeaderG) -> GhostMACG:
+        # O decifrador usa o modo de MAC registrado na mensagem, não o configurado na instância
+        if header is None or (header.mac_mode == self.mac.mode and
+                              (header.mac_mode == "linear" or header.mac_block_size == self.mac.block_size)):
+            return self.mac
+        return GhostMACG(self.seed, mode=header.mac_mode,
+                         block_size=header.mac_block_size or TREE_BLOCK_SIZE, workers=self.mac.workers)
+
+    def _check_frame(self, ciphertext: bytes, quiet: bool = False):
+        """Retorna (cabeçalho, ciphertext interno) se o MAC-G conferir; levanta ValueError se não."""
+        header, _, mac, encrypted = self._parse_frame(ciphertext)
+        mac_input = encrypted if header is None else ciphertext[:HEADER_SIZE] + encrypted
+        if not self._mac_engine(header).verify_mac(mac_input, mac, quiet=quiet):
+            raise ValueError("MAC-G falhou! Dados comprometidos.")
+        return header, encrypted
+
+    def _verify_frame(self, ciphertext: bytes, quiet: bool = False):
+        """Verifica o MAC-G e retorna (ciphertext interno, rodadas); levanta ValueError se falhar."""
+        try:
+            header, encrypted = self._check_frame(ciphertext, quiet=quiet)
+        except ValueError:
+            if not GhostHeaderG.has_header(ciphertext):
+                raise
+            # Um ciphertext legado cuja pubkey começa com o MAGIC também é conferido sem cabeçalho
+            _, _, mac, encrypted = self._parse_frame(ciphertext, legacy=True)
+            if not self.mac.verify_mac(encrypted, mac, quiet=quiet):
+                raise
+            header = None
+        return encrypted, LEGACY_ROUNDS if header is None else header.rounds
+
+    # ------------------------------------------------------------------ #
+    # Verificação sem decifrar (auditoria)
+    # ------------------------------------------------------------------ #
+    # O MAC-G cobre cabeçalho + ciphertext, então a integridade pode ser conferida com uma
+    # única passada do MAC, sem decifrar nem descomprimir.
+    def verify_only(self, ciphertext: bytes) -> bool:
+        """Confere apenas o MAC-G de um ciphertext; não decifra nem imprime nada."""
+        try:
+            self._verify_frame(ciphertext, quiet=True)
+        except ValueError:
+            return False
+        return True
+
+    def verify_stream(self, source, size: int = None, chunk_size: int = 1024 * 1024) -> bool:
+        """
+        Confere o MAC-G de um ciphertext lido em pedaços de `source` (objeto com read),
+        sem carregá-lo inteiro em memória. `size` é o tamanho total (obtido do arquivo se omitido).
+        Se a leitura com cabeçalho falhar e `source` permitir seek, o quadro é conferido também
+        no formato legado (pubkey que começa com o MAGIC do cabeçalho).
+        """
+        if size is None:
+            size = os.fstat(source.fileno()).st_size - source.tell()
+        if size < 96:
+            return False
+        start = source.tell() if getattr(source, "seekable", lambda: False)() else None
+        head = source.read(HEADER_SIZE)
+        if not GhostHeaderG.has_header(head):
+            return self._verify_stream_body(source, head, None, size, chunk_size)
+        try:
+            header = GhostHeaderG.unpack(head)
+        except ValueError:
+            header = None
+        if header is not None and self._verify_stream_body(source, head, header, size, chunk_size):
+            return True
+        if start is None:
+            return False
+        source.seek(start)
+        return self._verify_stream_body(source, source.read(HEADER_SIZE), None, size, chunk_size)
+
+    def _verify_stream_body(self, source, head: bytes, header, size: int, chunk_size: int) -> bool:
+        # `head` são os primeiros HEADER_SIZE bytes já lidos; header None = formato legado
+        if header is None:
+            # Formato legado: pubkey (32) + MAC (64) + ciphertext; o MAC cobre só o ciphertext
+            mac = (head + source.read(96 - HEADER_SIZE))[32:96]
+            prefix, remaining = b'', size - 96
+        else:
+            if header.codec != CODEC_SYMBOLIC or size < HEADER_SIZE + 96:
+                return False
+            mac = source.read(96)[32:]
+            prefix, remaining = head, size - HEADER_SIZE - 96
+
+        stream = GhostMACStreamG(self._mac_engine(header), len(prefix) + remaining)
+        stream.update(prefix)
+        while remaining > 0:
+            chunk = source.read(min(chunk_size, remaining))
+            if not chunk:
+                return False
+            stream.update(chunk)
+            remaining -= len(chunk)
+        return self.mac._constant_time_compare(stream.digest(), mac)
+
+    def verify_file(self, path: str, chunk_size: int = 1024 * 1024) -> bool:
+        """Confere o MAC-G de um arquivo cifrado com encryptByte/encryptFile, em streaming."""
+        with open(path, 'rb') as f:
+            return self.verify_stream(f, os.fstat(f.fileno()).st_size, chunk_size)
+
+    def _get_thread_pool(self, max_workers: int = None) -> ThreadPoolExecutor:
+        # max_workers só tem efeito na criação do pool (primeira chamada)
+        with self._pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ghost-v26g")
+            return self._thread_pool
+
+    def encrypt_concurrent(self, plaintexts, max_workers: int = None) -> list:
+        """Criptografa várias mensagens em paralelo (threads) com esta instância; mantém a ordem."""
+        return list(self._get_thread_pool(max_workers).map(self.encrypt, plaintexts))
+
+    def decrypt_concurrent(self, ciphertexts, max_workers: int = None) -> list:
+        """Descriptografa várias mensagens em paralelo (threads) com esta instância; mantém a ordem."""
+        return list(self._get_thread_pool(max_workers).map(self.decrypt, ciphertexts))
+
+    def shutdown(self) -> None:
+        """Encerra o pool de threads criado por encrypt_concurrent/decrypt_concurrent."""
+        with self._pool_lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown()
+                self._thread_pool = None
+
+    def encrypt(self, plaintext: str, rounds: int = None) -> bytes:
         # Entrada pode ser string, convertemos para bytes
         if isinstance(plaintext, str):
             plaintext = plaintext.encode('utf-8')
@@ -48,20 +245,22 @@ class GhostEncryptorV26G:
         print("[🔵] Transformações G aplicadas.")
 
         # Gerar chave pública e segredo compartilhado determinístico (Kyber real/simulado)
-        pubkey, shared_secret = simulate_kyber_encapsulate(self.seed)
+        pubkey, shared_secret = self._session_keys()
         print("[🔵] Chave pública e segredo compartilhado gerados com sucesso.")
 
         # Derivação da chave de sessão
         final_key = shared_secret[:32]
         iv = final_key[:16]  # derivação simples de IV
-        encrypted = self.cipher.encrypt_gcbc(transformed, iv, rounds=9)
+        rounds = self.rounds if rounds is None else validate_rounds(rounds)
+        encrypted = self.cipher.encrypt_gcbc(transformed, iv, rounds=rounds)
 
-        # MAC-G para integridade
-        mac = self.mac.generate_mac(encrypted)
+        # MAC-G para integridade (cobre também o cabeçalho com os parâmetros)
+        header = self._header(rounds)
+        mac = self.mac.generate_mac(header + encrypted)
         print("[🔵] Criptografia híbrida finalizada com sucesso.")
 
-        # Estrutura: pubkey (32) + mac (64) + ciphertext
-        return pubkey + mac + encrypted
+        # Estrutura: cabeçalho (8) + pubkey (32) + mac (64) + ciphertext
+        return header + pubkey + mac + encrypted
 
     def decrypt(self, ciphertext: bytes) -> str:
         print("[🔹] Iniciando descriptografia com V26G...")
@@ -69,22 +268,17 @@ class GhostEncryptorV26G:
         if not isinstance(ciphertext, bytes):
             raise TypeError("O ciphertext deve estar em formato bytes!")
 
-        pubkey = ciphertext[:32]
-        mac = ciphertext[32:96]
-        encrypted = ciphertext[96:]
-
-        # Verificação do MAC-G
-        if not self.mac.verify_mac(encrypted, mac):
-            raise ValueError("MAC-G falhou! Dados comprometidos.")
+        # Verificação do MAC-G (parâmetros lidos do cabeçalho, ou legado)
+        encrypted, rounds = self._verify_frame(ciphertext)
         print("[🔹] MAC-G validado com sucesso.")
 
         # Simula a recuperação do segredo compartilhado
-        _, shared_secret = simulate_kyber_encapsulate(self.seed)
+        _, shared_secret = self._session_keys()
         final_key = shared_secret[:32]
 
         # Decifra os dados
         iv = final_key[:16]  # derivação simples de IV
-        decrypted = self.cipher.decrypt_gcbc(encrypted, iv, rounds=9)
+        decrypted = self.cipher.decrypt_gcbc(encrypted, iv, rounds=rounds)
 
         # Reverter transformações G
         restored = self.operator_g.apply_operator_sequence(decrypted, reverse=True)
@@ -110,9 +304,12 @@ class GhostEncryptorV26G:
             raise
     
 ###----------------------------------------------------------------------------------###
+    @staticmethod
     def encryptFile(input_path: str, output_path: str, encrypt_fn) -> None:
         """
         Lê um arquivo, criptografa seu conteúdo e salva em outro arquivo.
+        Para arquivos grandes, prefira ghost_file_engine_g.GhostFileEngineG, que sobrepõe
+        leitura, cifra e gravação bloco a bloco.
 
         Args:
             input_path (str): Caminho do arquivo de entrada.
@@ -130,6 +327,7 @@ class GhostEncryptorV26G:
         print(f"[🔐] Arquivo '{input_path}' criptografado e salvo como '{output_path}'.")
 
 
+    @staticmethod
     def decryptFile(input_path: str, output_path: str, decrypt_fn) -> None:
         """
         Lê um arquivo criptografado, descriptografa seu conteúdo e salva no destino.
@@ -150,71 +348,86 @@ class GhostEncryptorV26G:
         print(f"[🔓] Arquivo '{input_path}' descriptografado e salvo como '{output_path}'.")
     ###----------------------------------------------------------------------------------###
     
-    def encryptByte(self, plaintext: bytes) -> bytes:
-        print("[🟢] Iniciando criptografia com V26G...")
+    # quiet=True suprime as mensagens de progresso (uso em serviços, ex.: ghost_daemon_g)
+    def encryptByte(self, plaintext: bytes, rounds: int = None, quiet: bool = False) -> bytes:
+        log = _silent if quiet else print
+        log("[🟢] Iniciando criptografia com V26G...")
 
         if not isinstance(plaintext, bytes):
             raise TypeError("O plaintext deve estar em formato bytes!")
 
         # Compressão simbólica
         compressed = self.compressor.compress(plaintext)
-        print("[🟢] Compressão simbólica concluída.")
+        log("[🟢] Compressão simbólica concluída.")
 
         # Aplicar transformações G
         transformed = self.operator_g.apply_operator_sequence(compressed)
-        print("[🟢] Transformações G aplicadas.")
+        log("[🟢] Transformações G aplicadas.")
 
         # Simula a geração de chave pública e segredo compartilhado determinístico
-        pubkey, shared_secret = simulate_kyber_encapsulate(self.seed)
+        pubkey, shared_secret = self._session_keys()
         final_key = shared_secret[:32]
-        print("[🟢] Chave pública e segredo compartilhado gerados.")
+        log("[🟢] Chave pública e segredo compartilhado gerados.")
 
         # Cifra os dados com GCBC (baseado na Álgebra G)
         iv = final_key[:16]
-        ciphertext = self.cipher.encrypt_gcbc(transformed, iv, rounds=9)
-        print("[🟢] Cifra GCBC concluída.")
+        rounds = self.rounds if rounds is None else validate_rounds(rounds)
+        ciphertext = self.cipher.encrypt_gcbc(transformed, iv, rounds=rounds)
+        log("[🟢] Cifra GCBC concluída.")
 
-        # Gera o MAC-G para integridade
-        mac = self.mac.generate_mac(ciphertext)
-        print(f"[🟢] MAC-G gerado: {mac}")
+        # Gera o MAC-G para integridade (cabeçalho + ciphertext)
+        header = self._header(rounds)
+        mac = self.mac.generate_mac(header + ciphertext)
+        log(f"[🟢] MAC-G gerado: {mac}")
 
-        # Monta o resultado final: pubkey (32) + mac (64) + ciphertext
-        final_output = pubkey + mac + ciphertext
-        print("[🟢] Criptografia finalizada com sucesso.")
+        # Monta o resultado final: cabeçalho (8) + pubkey (32) + mac (64) + ciphertext
+        final_output = header + pubkey + mac + ciphertext
+        log("[🟢] Criptografia finalizada com sucesso.")
 
         return final_output
 
-    def decryptByte(self, ciphertext: bytes) -> bytes:
-        print("[🔹] Iniciando descriptografia de arquivo com V26G...")
-
+    def decrypt_iter(self, ciphertext: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE, max_output: int = INSTANCE_LIMIT):
+        """
+        Verifica e decifra, gerando o texto original em pedaços de até `chunk_size` bytes.
+        A saída descomprimida nunca fica inteira em memória e é limitada por `max_output`
+        (padrão: o max_output da instância; None desativa o limite nesta chamada).
+        """
         if not isinstance(ciphertext, bytes):
             raise TypeError("O ciphertext deve estar em formato bytes!")
 
-        pubkey = ciphertext[:32]
-        mac = ciphertext[32:96]
-        encrypted = ciphertext[96:]
+        encrypted, rounds = self._verify_frame(ciphertext)
+        _, shared_secret = self._session_keys()
+        decrypted = self.cipher.decrypt_gcbc(encrypted, shared_secret[:16], rounds=rounds)
+        restored = self.operator_g.apply_operator_sequence(decrypted, reverse=True)
+        return self.compressor.iter_decompress(restored, chunk_size=chunk_size, max_output=max_output)
 
-        # Verificação do MAC-G
-        if not self.mac.verify_mac(encrypted, mac):
-            raise ValueError("MAC-G falhou! Dados comprometidos.")
-        print("[🔹] MAC-G validado com sucesso.")
+    def decryptByte(self, ciphertext: bytes, quiet: bool = False) -> bytes:
+        log = _silent if quiet else print
+        log("[🔹] Iniciando descriptografia de arquivo com V26G...")
+
+        if not isinstance(ciphertext, bytes):
+            raise TypeError("O ciphertext deve estar em formato bytes!")
+
+        # Verificação do MAC-G (parâmetros lidos do cabeçalho, ou legado)
+        encrypted, rounds = self._verify_frame(ciphertext, quiet=quiet)
+        log("[🔹] MAC-G validado com sucesso.")
 
         # Recupera o segredo compartilhado determinístico
-        _, shared_secret = simulate_kyber_encapsulate(self.seed)
+        _, shared_secret = self._session_keys()
         final_key = shared_secret[:32]
 
         # Decifra os dados
         iv = final_key[:16]
-        decrypted = self.cipher.decrypt_gcbc(encrypted, iv, rounds=9)
+        decrypted = self.cipher.decrypt_gcbc(encrypted, iv, rounds=rounds)
 
         # Reverte transformações G
         restored = self.operator_g.apply_operator_sequence(decrypted, reverse=True)
-        print("[🔹] Operador G revertido com sucesso.")
+        log("[🔹] Operador G revertido com sucesso.")
         assert restored.startswith(b'\x00G'), "[DEBUG] Flag de compressão simbólica corrompida após restauração"
 
         # Descompressão simbólica
         decompressed = self.compressor.decompress(restored)
-        print("[🔹] Descompressão simbólica concluída.")
+        log("[🔹] Descompressão simbólica concluída.")
 
         # Retorna sempre como bytes
         if isinstance(decompressed, str):
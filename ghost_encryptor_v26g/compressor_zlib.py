@@ -1,16 +1,81 @@
 # compressor_zlib.py
 import zlib
+
+# Descompressão limitada e em streaming (zlib.decompressobj com max_length).
+# Um payload pequeno e autenticado pode inflar para gigabytes; aqui a saída é produzida em
+# pedaços de no máximo `chunk_size` bytes e a soma é limitada por `max_output` por chamada
+# (None desativa o limite). Todos os compressores do pacote usam estes auxiliares.
+# Nos métodos dos compressores, max_output=INSTANCE_LIMIT (padrão) usa o limite da instância;
+# None desativa o limite naquela chamada e 0 é um limite literal de zero bytes.
+DEFAULT_MAX_OUTPUT = 512 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _InstanceLimit:
+    def __repr__(self):
+        return "INSTANCE_LIMIT"
+
+
+INSTANCE_LIMIT = _InstanceLimit()
+
+
+def resolve_max_output(max_output, instance_limit):
+    """Limite efetivo de uma chamada: o da instância quando max_output é INSTANCE_LIMIT."""
+    return instance_limit if max_output is INSTANCE_LIMIT else max_output
+
+
+def iter_decompress(data: bytes, zdict: bytes = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    max_output: int = DEFAULT_MAX_OUTPUT):
+    """Gera o texto descomprimido em pedaços; levanta ValueError se passar de `max_output`."""
+    if chunk_size <= 0:
+        raise ValueError("O tamanho do pedaço deve ser positivo.")
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    pending = data
+    total = 0
+    try:
+        while not decompressor.eof:
+            chunk = decompressor.decompress(pending, chunk_size)
+            pending = decompressor.unconsumed_tail
+            if not chunk:
+                if not pending and not decompressor.eof:
+                    raise ValueError("Dados comprimidos truncados.")
+                continue
+            total += len(chunk)
+            if max_output is not None and total > max_output:
+                raise ValueError(f"Descompressão excede o limite de {max_output} bytes.")
+            yield chunk
+    except zlib.error as e:
+        raise ValueError("Erro ao descomprimir os dados: " + str(e)) from None
+
+
+def bounded_decompress(data: bytes, zdict: bytes = None, max_output: int = DEFAULT_MAX_OUTPUT) -> bytes:
+    """Equivalente a zlib.decompress, mas com teto de saída."""
+    return b''.join(iter_decompress(data, zdict, max_output=max_output))
+
+
+def iter_raw(data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE, max_output: int = DEFAULT_MAX_OUTPUT):
+    """Fatia dados já descomprimidos (armazenados crus) respeitando o mesmo teto."""
+    if max_output is not None and len(data) > max_output:
+        raise ValueError(f"Descompressão excede o limite de {max_output} bytes.")
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
 # GhostCompressor
 # Classe para compressão e descompressão de dados usando zlib.
 # Esta classe fornece métodos para comprimir e descomprimir dados.
 class GhostCompressor:
+    def __init__(self, max_output: int = DEFAULT_MAX_OUTPUT):
+        self.max_output = max_output
+
     def compress(self, data: bytes) -> bytes:
         # Compressão com zlib
         return zlib.compress(data)
 
-    def decompress(self, data: bytes) -> bytes:
-        # Descompressão com zlib
-        try:
-            return zlib.decompress(data)
-        except zlib.error as e:
-            raise ValueError("Erro ao descomprimir os dados: " + str(e))
+    def decompress(self, data: bytes, max_output: int = INSTANCE_LIMIT) -> bytes:
+        # Descompressão com zlib, limitada a max_output (padrão: limite da instância; None: sem limite)
+        return bounded_decompress(data, max_output=resolve_max_output(max_output, self.max_output))
+
+    def iter_decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE, max_output: int = INSTANCE_LIMIT):
+        return iter_decompress(data, chunk_size=chunk_size,
+                               max_output=resolve_max_output(max_output, self.max_output))
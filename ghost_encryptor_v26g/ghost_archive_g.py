@@ -0,0 +1,198 @@
+# ghost_archive_g.py
+
+import json
+import os
+import struct
+import zlib
+
+from .ghost_audit_g import iter_files
+from .ghost_seekable_g import DEFAULT_BLOCK_SIZE as _SEEKABLE_BLOCK_SIZE, GhostSeekableG
+
+# Arquivo compactado (pacote) para muitos arquivos pequenos.
+#
+# Em vez de um ciphertext por arquivo (KEM, cabeçalho de 96+ bytes, stream zlib e MAC-G cada),
+# o conteúdo de todos os arquivos é concatenado em um único fluxo lógico e gravado como um
+# contêiner indexado (ghost_seekable_g):
+#
+#   fluxo lógico : dados do arquivo 1 + dados do arquivo 2 + ... + catálogo (JSON) + trailer
+#   trailer      : offset do catálogo (8) + tamanho do catálogo (8) + CATALOG_MAGIC (4)
+#
+# Os blocos do contêiner são "sólidos": vários arquivos pequenos são comprimidos juntos, com
+# uma única configuração de chave e um MAC-G por bloco. O catálogo (nomes, offsets, tamanhos,
+# CRC-32, mtime e permissões) fica dentro do fluxo cifrado; listar o pacote decifra apenas os
+# blocos finais e extrair um arquivo decifra apenas os blocos que ele ocupa.
+CATALOG_VERSION = 1
+CATALOG_MAGIC = b'GARX'
+DEFAULT_BLOCK_SIZE = 16 * _SEEKABLE_BLOCK_SIZE  # blocos sólidos de 1 MiB
+
+_TRAILER = struct.Struct('>QQ4s')
+
+
+def _member_name(path: str, base_dir: str) -> str:
+    return os.path.relpath(path, base_dir).replace(os.sep, '/')
+
+
+def _safe_target(dest_dir: str, name: str) -> str:
+    # Impede que nomes do catálogo escapem do diretório de destino
+    parts = name.split('/')
+    if name.startswith('/') or any(p in ('', '.', '..') for p in parts):
+        raise ValueError(f"Nome inválido no pacote: {name!r}")
+    return os.path.join(dest_dir, *parts)
+
+
+# Class _PackSource
+# Objeto com read() que concatena os arquivos de entrada e, ao final, o catálogo e o trailer.
+# Os arquivos são abertos um de cada vez, à medida que o contêiner consome o fluxo.
+class _PackSource:
+    def __init__(self, paths, base_dir: str):
+        self._paths = iter(paths)
+        self._base_dir = base_dir
+        self._fh = None
+        self._current = None
+        self._tail = None
+        self.offset = 0
+        self.entries = []
+
+    def _open_next(self) -> bool:
+        for path in self._paths:
+            st = os.stat(path)
+            self._fh = open(path, 'rb')
+            self._current = {"name": _member_name(path, self._base_dir), "offset": self.offset,
+                             "size": 0, "crc32": 0, "mtime": st.st_mtime, "mode": st.st_mode & 0o777}
+            return True
+        return False
+
+    def _close_current(self) -> None:
+        self._fh.close()
+        self._fh = None
+        self.entries.append(self._current)
+        self._current = None
+
+    def _catalog_tail(self) -> bytes:
+        catalog = json.dumps({"version": CATALOG_VERSION, "files": self.entries}).encode('utf-8')
+        return catalog + _TRAILER.pack(self.offset, len(catalog), CATALOG_MAGIC)
+
+    def read(self, size: int) -> bytes:
+        while self._tail is None:
+            if self._fh is None and not self._open_next():
+                self._tail = memoryview(self._catalog_tail())
+                break
+            data = self._fh.read(size)
+            if data:
+                self._current["size"] += len(data)
+                self._current["crc32"] = zlib.crc32(data, self._current["crc32"])
+                self.offset += len(data)
+                return data
+            self._close_current()
+        data = bytes(self._tail[:size])
+        self._tail = self._tail[size:]
+        return data
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+
+
+# Class GhostArchiveG
+# Empacota arquivos em um contêiner indexado único e os lista/extrai individualmente.
+class GhostArchiveG:
+    def __init__(self, seed: bytes = b"default_seed", block_size: int = DEFAULT_BLOCK_SIZE):
+        self.seekable = GhostSeekableG(seed, block_size=block_size)
+
+    def pack(self, paths, output_path: str, base_dir: str = None) -> dict:
+        """
+        Empacota `paths` (caminhos de arquivo) em `output_path`. Os nomes no catálogo são
+        relativos a `base_dir` (padrão: diretório atual).
+        """
+        source = _PackSource(paths, base_dir or os.getcwd())
+        try:
+            with open(output_path, 'wb') as dst:
+                blocks = self.seekable.write(source, dst)
+        finally:
+            source.close()
+        stats = {"files": len(source.entries), "blocks": blocks, "bytes_in": source.offset,
+                 "bytes_out": os.path.getsize(output_path)}
+        print(f"[🔐] {stats['files']} arquivos empacotados em '{output_path}' "
+              f"({stats['bytes_in']} -> {stats['bytes_out']} bytes, {blocks} blocos).")
+        return stats
+
+    def pack_directory(self, root: str, output_path: str, pattern: str = "*") -> dict:
+        """Empacota todos os arquivos de `root` (recursivamente) que casam com `pattern`."""
+        return self.pack(iter_files(root, pattern), output_path, base_dir=root)
+
+    def open(self, source) -> "GhostArchiveReaderG":
+        """Abre um pacote (bytes, caminho ou objeto de arquivo) para listagem e extração."""
+        return GhostArchiveReaderG(self, source)
+
+    def list(self, source) -> list:
+        with self.open(source) as reader:
+            return reader.entries
+
+    def extract_all(self, source, dest_dir: str) -> int:
+        """Extrai todos os arquivos do pacote em `dest_dir`; retorna quantos foram extraídos."""
+        with self.open(source) as reader:
+            for entry in reader.entries:
+                reader.extract(entry["name"], dest_dir)
+            count = len(reader.entries)
+        print(f"[🔓] {count} arquivos extraídos em '{dest_dir}'.")
+        return count
+
+
+# Class GhostArchiveReaderG
+# Lê o catálogo de um pacote e extrai arquivos sob demanda.
+class GhostArchiveReaderG:
+    def __init__(self, archive: GhostArchiveG, source):
+        self._reader = archive.seekable.open(source)
+        try:
+            self._load_catalog()
+        except BaseException:
+            self._reader.close()
+            raise
+
+    def _load_catalog(self) -> None:
+        size = self._reader.size
+        if size < _TRAILER.size:
+            raise ValueError("Pacote truncado.")
+        catalog_offset, catalog_len, magic = _TRAILER.unpack(
+            self._reader.read_range(size - _TRAILER.size, _TRAILER.size))
+        if magic != CATALOG_MAGIC or catalog_offset + catalog_len + _TRAILER.size != size:
+            raise ValueError("Trailer do catálogo do pacote inválido.")
+        catalog = json.loads(self._reader.read_range(catalog_offset, catalog_len).decode('utf-8'))
+        if catalog.get("version") != CATALOG_VERSION:
+            raise ValueError(f"Versão de catálogo não suportada: {catalog.get('version')}")
+        self.entries = catalog["files"]
+        self._by_name = {entry["name"]: entry for entry in self.entries}
+
+    def names(self) -> list:
+        return [entry["name"] for entry in self.entries]
+
+    def read(self, name: str) -> bytes:
+        """Decifra apenas os blocos que contêm o arquivo e confere seu CRC-32."""
+        entry = self._by_name.get(name)
+        if entry is None:
+            raise ValueError(f"Arquivo não encontrado no pacote: {name}")
+        data = self._reader.read_range(entry["offset"], entry["size"])
+        if len(data) != entry["size"] or zlib.crc32(data) != entry["crc32"]:
+            raise ValueError(f"Conteúdo divergente do catálogo: {name}")
+        return data
+
+    def extract(self, name: str, dest_dir: str) -> str:
+        """Grava um arquivo do pacote em `dest_dir`, restaurando mtime e permissões."""
+        entry = self._by_name.get(name)
+        target = _safe_target(dest_dir, name)
+        data = self.read(name)
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        os.chmod(target, entry["mode"])
+        os.utime(target, (entry["mtime"], entry["mtime"]))
+        return target
+
+    def close(self) -> None:
+        self._reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,138 @@
+# ghost_audit_g.py
+
+import fnmatch
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .GhostEncryptorV26G_Final import GhostEncryptorV26G
+
+# Auditoria de integridade em lote para ciphertexts armazenados.
+# Cada objeto (arquivo ou blob) passa por uma única passada do MAC-G (verify_only/verify_file),
+# sem decifrar nem descomprimir. Os objetos são distribuídos em lotes por um pool de processos
+# e os arquivos são lidos em pedaços, de modo que a memória não depende do tamanho dos arquivos.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_BATCH_SIZE = 1024
+
+# Encriptadores por seed, reaproveitados entre os itens de cada processo do pool
+_ENCRYPTORS = {}
+
+
+def _encryptor_for(seed: bytes) -> GhostEncryptorV26G:
+    encryptor = _ENCRYPTORS.get(seed)
+    if encryptor is None:
+        encryptor = _ENCRYPTORS[seed] = GhostEncryptorV26G(seed)
+    return encryptor
+
+
+def _audit_item(seed: bytes, item, chunk_size: int) -> tuple:
+    # Executado nos processos do pool: retorna (nome, tamanho, ok, erro)
+    try:
+        encryptor = _encryptor_for(seed)
+        if isinstance(item, str):
+            size = os.path.getsize(item)
+            return item, size, encryptor.verify_file(item, chunk_size), None
+        name, blob = item
+        return name, len(blob), encryptor.verify_only(bytes(blob)), None
+    except OSError as e:
+        return (item if isinstance(item, str) else item[0]), 0, False, str(e)
+
+
+def _audit_batch(seed: bytes, items: list, chunk_size: int) -> list:
+    return [_audit_item(seed, item, chunk_size) for item in items]
+
+
+def iter_files(root: str, pattern: str = "*"):
+    """Percorre `root` recursivamente e gera os caminhos que casam com `pattern`."""
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if fnmatch.fnmatch(filename, pattern):
+                yield os.path.join(dirpath, filename)
+
+
+# Class GhostAuditorG
+# Verifica o MAC-G de muitos ciphertexts em paralelo e produz um relatório das falhas.
+class GhostAuditorG:
+    def __init__(self, seed: bytes = b"default_seed", workers: int = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, batch_size: int = DEFAULT_BATCH_SIZE):
+        if isinstance(seed, str):
+            seed = seed.encode('utf-8')
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+
+    def _batches(self, items):
+        iterator = iter(items)
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def _results(self, items):
+        if self.workers == 1:
+            for batch in self._batches(items):
+                yield from _audit_batch(self.seed, batch, self.chunk_size)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # No máximo 2 lotes por processo em voo: a lista de itens nunca fica inteira em memória
+            pending = []
+            for batch in self._batches(items):
+                pending.append(pool.submit(_audit_batch, self.seed, batch, self.chunk_size))
+                if len(pending) >= self.workers * 2:
+                    yield from pending.pop(0).result()
+            for future in pending:
+                yield from future.result()
+
+    def audit(self, items) -> dict:
+        """
+        Audita caminhos de arquivo e/ou pares (nome, blob).
+        Retorna {"checked", "passed", "bytes", "seconds", "failed": [{"name", "error"}]}.
+        """
+        start = time.perf_counter()
+        report = {"checked": 0, "passed": 0, "bytes": 0, "failed": []}
+        for name, size, ok, error in self._results(items):
+            report["checked"] += 1
+            report["bytes"] += size
+            if ok:
+                report["passed"] += 1
+            else:
+                report["failed"].append({"name": name, "error": error or "MAC-G inválido"})
+        report["seconds"] = time.perf_counter() - start
+        return report
+
+    def audit_directory(self, root: str, pattern: str = "*") -> dict:
+        report = self.audit(iter_files(root, pattern))
+        status = "✔️" if not report["failed"] else "❌"
+        print(f"[{status}] Auditoria de '{root}': {report['passed']}/{report['checked']} íntegros "
+              f"({report['seconds']:.2f}s).")
+        return report
+
+    @staticmethod
+    def write_report(report: dict, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Auditoria de integridade (somente MAC-G) do GhostEncryptor V26G")
+    parser.add_argument("root", help="Diretório com os arquivos cifrados")
+    parser.add_argument("--seed", required=True)
+    parser.add_argument("--pattern", default="*")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", help="Grava o relatório neste arquivo")
+    args = parser.parse_args()
+
+    auditor = GhostAuditorG(args.seed, workers=args.workers)
+    result = auditor.audit_directory(args.root, args.pattern)
+    if args.json:
+        GhostAuditorG.write_report(result, args.json)
+    for failure in result["failed"]:
+        print(f"[❌] {failure['name']}: {failure['error']}")
+    sys.exit(1 if result["failed"] else 0)
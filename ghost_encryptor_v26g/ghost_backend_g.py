@@ -0,0 +1,131 @@
+# ghost_backend_g.py
+
+import os
+
+try:  # NumPy é opcional: sem ele, tudo roda nas compreensões Python originais
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+# Backend dos estágios byte a byte (XOR com chave, g_add/g_sub, histograma de entropia).
+#
+#   "auto"   : usa NumPy quando disponível e o buffer tem ao menos NUMPY_THRESHOLD bytes
+#   "numpy"  : força NumPy (erro se não estiver instalado)
+#   "python" : força as compreensões Python puras
+#
+# O backend inicial pode ser escolhido pela variável de ambiente GHOST_BACKEND.
+# Ambos os backends produzem saídas idênticas byte a byte.
+BACKENDS = ("auto", "numpy", "python")
+NUMPY_AVAILABLE = np is not None
+NUMPY_THRESHOLD = 2048
+
+_backend = "auto"
+
+
+def set_backend(name: str) -> None:
+    """Seleciona o backend global ("auto", "numpy" ou "python")."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {name}")
+    if name == "numpy" and not NUMPY_AVAILABLE:
+        raise ImportError("Backend 'numpy' solicitado, mas o NumPy não está instalado.")
+    _backend = name
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_numpy_threshold(size: int) -> None:
+    """Ajusta o tamanho mínimo de buffer para o modo "auto" usar NumPy."""
+    global NUMPY_THRESHOLD
+    NUMPY_THRESHOLD = size
+
+
+def use_numpy(size: int) -> bool:
+    """Decide, para um buffer de `size` bytes, se o kernel NumPy deve ser usado."""
+    if _backend == "numpy":
+        return True
+    if _backend == "python":
+        return False
+    return NUMPY_AVAILABLE and size >= NUMPY_THRESHOLD
+
+
+set_backend(os.environ.get("GHOST_BACKEND", "auto"))
+
+
+# ---------------------------------------------------------------------- #
+# Auxiliares NumPy
+# ---------------------------------------------------------------------- #
+def _np_tiled(key: bytes, length: int, offset: int = 0):
+    """Chave repetida até `length` posições, começando na posição `offset` (key[i % len(key)])."""
+    arr = np.frombuffer(bytes(key), dtype=np.uint8)
+    shift = offset % len(arr)
+    if shift:
+        arr = np.roll(arr, -shift)
+    return np.tile(arr, -(-length // len(arr)))[:length]
+
+
+def _np_view(data: bytes):
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+# ---------------------------------------------------------------------- #
+# Kernels
+# ---------------------------------------------------------------------- #
+def xor_keys(data: bytes, keys: list, offset: int = 0) -> bytes:
+    """XOR de cada byte i com key[(i + offset) % len(key)] de todas as chaves."""
+    if use_numpy(len(data)):
+        if not data:
+            return b''
+        out = _np_view(data).copy()
+        for key in keys:
+            out ^= _np_tiled(key, len(data), offset)
+        return out.tobytes()
+
+    if len(keys) == 1:
+        key = keys[0]
+        return bytes([b ^ key[(i + offset) % len(key)] for i, b in enumerate(data)])
+    if len(keys) == 2:
+        k1, k2 = keys
+        return bytes([b ^ k1[(i + offset) % len(k1)] ^ k2[(i + offset) % len(k2)] for i, b in enumerate(data)])
+    result = data
+    for key in keys:
+        result = bytes([b ^ key[(i + offset) % len(key)] for i, b in enumerate(result)])
+    return result
+
+
+def xor_byte(data: bytes, value: int) -> bytes:
+    """XOR de todos os bytes com uma constante (transformação do GhostNumberG)."""
+    value &= 0xFF
+    if use_numpy(len(data)):
+        return (_np_view(data) ^ np.uint8(value)).tobytes()
+    return bytes([b ^ value for b in data])
+
+
+def g_add_keys(data: bytes, key: bytes) -> bytes:
+    """Adição G byte a byte com a chave: (a + b + (a ^ b) % 7) % 256."""
+    if use_numpy(len(data)):
+        a = _np_view(data).astype(np.int16)
+        b = _np_tiled(key, len(data)).astype(np.int16)
+        return ((a + b + (a ^ b) % 7) % 256).astype(np.uint8).tobytes()
+    return bytes([(b + key[i % len(key)] + (b ^ key[i % len(key)]) % 7) % 256 for i, b in enumerate(data)])
+
+
+def g_sub_keys(data: bytes, key: bytes) -> bytes:
+    """Subtração G byte a byte com a chave: (a - b - (a ^ b) % 7) % 256."""
+    if use_numpy(len(data)):
+        a = _np_view(data).astype(np.int16)
+        b = _np_tiled(key, len(data)).astype(np.int16)
+        return ((a - b - (a ^ b) % 7) % 256).astype(np.uint8).tobytes()
+    return bytes([(b - key[i % len(key)] - (b ^ key[i % len(key)]) % 7) % 256 for i, b in enumerate(data)])
+
+
+def byte_histogram(data: bytes) -> list:
+    """Contagem de ocorrências de cada valor de byte (256 posições)."""
+    if use_numpy(len(data)):
+        return np.bincount(_np_view(data), minlength=256).tolist()
+    counts = [0] * 256
+    for b in data:
+        counts[b] += 1
+    return counts
@@ -0,0 +1,162 @@
+# ghost_cache_g.py
+
+import hmac
+import mmap
+import os
+import struct
+import zlib
+
+from .ghost_mac_g import digest_key, keyed_digest
+from .ghost_pq_hybrid import simulate_kyber_encapsulate
+
+# Cache persistente (opcional) de tabelas pré-calculadas e material de chave por seed.
+#
+# Processos curtos (cron, CLI) refazem a cada início a matriz do GhostMatrixCipherG e o KEM
+# simulado; com um diretório de cache, um processo frio carrega esse estado do disco.
+#
+#   arquivo  : MAGIC (3) + versão (1) + tipo (8) + tamanho (4) + CRC-32 (4)
+#              + verificador (32) + conteúdo
+#   nome     : <tipo>-<id>.gk, onde id = BLAKE2b-256 da seed inteira sob uma chave própria do
+#              cache (o nome não revela a seed)
+#   verificador: BLAKE2b-256 do conteúdo sob uma chave derivada da seed e do tipo
+#
+# Os arquivos são lidos por mmap; CRC-32 e verificador são calculados sobre uma memoryview do
+# mapeamento, e o conteúdo é convertido direto para o valor final (matriz, chaves) sem cópia
+# intermediária. O verificador garante que a entrada foi gerada para esta seed: uma colisão de
+# nomes ou um arquivo plantado é tratado como ausência. Versão diferente, conteúdo corrompido ou truncado
+# também contam como ausência: o valor é recalculado e regravado. O diretório é criado com permissão 0o700 e os arquivos com 0o600,
+# pois guardam segredos derivados da seed; a gravação é atômica (arquivo temporário + replace).
+MAGIC = b'\x00GK'
+VERSION = 3
+KIND_MATRIX = b'matrix'
+KIND_KEM = b'kem'
+MATRIX_SIZE = 16
+VERIFIER_SIZE = 32
+
+_HEADER = struct.Struct('>3sB8sII32s')
+_SUFFIX = ".gk"
+
+
+def _matrix_bytes(seed: bytes) -> bytes:
+    # Mesma fórmula de GhostMatrixCipherG._generate_matrix, linha a linha
+    return bytes((i * j + seed[(i + j) % len(seed)]) % 256
+                 for i in range(MATRIX_SIZE) for j in range(MATRIX_SIZE))
+
+
+# Class GhostCacheG
+# Diretório de cache com entradas versionadas, verificadas (CRC-32 + BLAKE2b) e carregadas por mmap.
+class GhostCacheG:
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        os.chmod(cache_dir, 0o700)
+        self._memory = {}  # entradas já carregadas neste processo
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, kind: bytes, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{kind.decode('ascii')}-{key}{_SUFFIX}")
+
+    @staticmethod
+    def seed_key(seed: bytes) -> str:
+        """Identificador da seed usado nos nomes de arquivo."""
+        return keyed_digest(b"ghost-cache-key-v3", seed, VERIFIER_SIZE).hex()
+
+    @staticmethod
+    def _verifier(seed: bytes, kind: bytes, payload) -> bytes:
+        return keyed_digest(digest_key(seed, b"ghost-cache-v3:" + kind), payload, VERIFIER_SIZE)
+
+    def load(self, kind: bytes, key: str, seed: bytes, parse=bytes):
+        """
+        Retorna parse(conteúdo) da entrada, ou None se ausente, de outra versão, corrompida
+        ou gerada para outra seed. `parse` recebe uma memoryview do mapeamento, válida apenas
+        durante a chamada.
+        """
+        path = self._path(kind, key)
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < _HEADER.size:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    magic, version, stored_kind, length, crc, verifier = _HEADER.unpack_from(mapped)
+                    if (magic != MAGIC or version != VERSION or stored_kind.rstrip(b'\x00') != kind
+                            or len(mapped) != _HEADER.size + length):
+                        return None
+                    # A view precisa ser liberada antes de o mmap ser fechado
+                    with memoryview(mapped) as view, view[_HEADER.size:] as payload:
+                        if zlib.crc32(payload) != crc:
+                            return None
+                        if not hmac.compare_digest(self._verifier(seed, kind, payload), verifier):
+                            return None
+                        return parse(payload)
+        except FileNotFoundError:
+            return None
+
+    def store(self, kind: bytes, key: str, seed: bytes, payload: bytes) -> None:
+        path = self._path(kind, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, kind, len(payload), zlib.crc32(payload),
+                                     self._verifier(seed, kind, payload)))
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get_or_compute(self, kind: bytes, seed: bytes, compute, parse=bytes):
+        """
+        Carrega a entrada da seed ou a calcula com compute() e a grava. Retorna parse(conteúdo),
+        que também é o valor guardado em memória.
+        """
+        memory_key = (kind, seed)
+        if memory_key in self._memory:
+            return self._memory[memory_key]
+        key = self.seed_key(seed)
+        value = self.load(kind, key, seed, parse)
+        if value is None:
+            self.misses += 1
+            payload = bytes(compute())
+            self.store(kind, key, seed, payload)
+            value = parse(memoryview(payload))
+        else:
+            self.hits += 1
+        self._memory[memory_key] = value
+        return value
+
+    # ------------------------------------------------------------------ #
+    # Material derivado da seed
+    # ------------------------------------------------------------------ #
+    def matrix_for(self, seed: bytes) -> list:
+        """Matriz 16x16 do GhostMatrixCipherG para a seed."""
+        def parse(flat):
+            return [flat[i:i + MATRIX_SIZE].tolist() for i in range(0, len(flat), MATRIX_SIZE)]
+        return self.get_or_compute(KIND_MATRIX, seed, lambda: _matrix_bytes(seed), parse)
+
+    def kem_for(self, seed: bytes) -> tuple:
+        """(pubkey, shared_secret) de simulate_kyber_encapsulate para a seed."""
+        def compute():
+            pubkey, shared_secret = simulate_kyber_encapsulate(seed)
+            return bytes([len(pubkey)]) + pubkey + shared_secret
+        def parse(payload):
+            split = 1 + payload[0]
+            return bytes(payload[1:split]), bytes(payload[split:])
+        return self.get_or_compute(KIND_KEM, seed, compute, parse)
+
+    def warm(self, seed: bytes) -> None:
+        """Pré-calcula todo o material da seed (ex.: na instalação ou no deploy)."""
+        self.matrix_for(seed)
+        self.kem_for(seed)
+
+    def clear(self) -> int:
+        """Remove as entradas do cache; retorna quantos arquivos foram apagados."""
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(_SUFFIX):
+                os.remove(os.path.join(self.cache_dir, name))
+                removed += 1
+        self._memory.clear()
+        return removed
@@ -0,0 +1,246 @@
+# ghost_compact_g.py
+
+import struct
+import zlib
+
+from .ghost_header_g import validate_rounds
+
+# Quadro compacto para mensagens pequenas e de alto volume.
+#
+#   flags (1) + [pubkey (32) | key-id (4)] + [sequência (varint)] + rodadas (varint)
+#   + tamanho da tag (1) + tamanho do ciphertext (varint) + tag + ciphertext
+#
+# Em vez dos 32 bytes da pubkey e dos 64 do MAC-G por mensagem, o quadro leva um key-id
+# de 4 bytes (quando o par já conhece a pubkey) e uma tag MAC-G dobrada (XOR) para um
+# tamanho configurável. A dobra, ao contrário de um simples corte, mantém cada byte do MAC-G
+# (e portanto cada byte autenticado) refletido na tag.
+# O prefixo b'\x00G' da compressão simbólica é implícito. No modo sessão, a pubkey vai
+# apenas no primeiro quadro e os seguintes levam só um número de sequência.
+# A tag cobre todos os campos do quadro antes dela, além do ciphertext.
+FLAG_PUBKEY = 0x01
+FLAG_KEY_ID = 0x02
+FLAG_SEQUENCE = 0x04
+FLAG_VERSION = 0x10  # versão 1 no nibble alto
+
+DEFAULT_TAG_LENGTH = 16
+MIN_TAG_LENGTH = 8
+MAX_TAG_LENGTH = 64
+
+_SYMBOLIC_PREFIX = b'\x00G'
+
+
+def encode_varint(value: int) -> bytes:
+    """Codifica um inteiro não negativo em varint (7 bits por byte, little-endian)."""
+    if value < 0:
+        raise ValueError("Varint não aceita valores negativos.")
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data: bytes, offset: int = 0) -> tuple:
+    """Decodifica um varint a partir de `offset`; retorna (valor, novo offset)."""
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Varint truncado.")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+        if shift > 63:
+            raise ValueError("Varint longo demais.")
+
+
+def fold_tag(mac: bytes, length: int) -> bytes:
+    """Reduz o MAC-G a `length` bytes com XOR: o byte i do MAC vai para a posição i % length."""
+    tag = bytearray(length)
+    for i, b in enumerate(mac):
+        tag[i % length] ^= b
+    return bytes(tag)
+
+
+def key_id_for(pubkey: bytes) -> bytes:
+    """Identificador curto (4 bytes) de uma chave pública."""
+    return struct.pack('>I', zlib.crc32(pubkey) & 0xFFFFFFFF)
+
+
+# Class GhostCompactFramerG
+# Produz e abre quadros compactos usando os componentes de um GhostEncryptorV26G.
+class GhostCompactFramerG:
+    def __init__(self, encryptor, tag_length: int = DEFAULT_TAG_LENGTH, send_pubkey: bool = False):
+        if not MIN_TAG_LENGTH <= tag_length <= MAX_TAG_LENGTH:
+            raise ValueError(f"A tag deve ter entre {MIN_TAG_LENGTH} e {MAX_TAG_LENGTH} bytes.")
+        self.encryptor = encryptor
+        self.tag_length = tag_length
+        self.send_pubkey = send_pubkey
+        self.pubkey, shared_secret = encryptor._session_keys()
+        self.iv = shared_secret[:16]
+        self.key_id = key_id_for(self.pubkey)
+        self.known_keys = {self.key_id: self.pubkey}
+
+    def register_peer_key(self, pubkey: bytes) -> bytes:
+        """Registra a pubkey de um par para que quadros com o key-id dela sejam aceitos."""
+        key_id = key_id_for(pubkey)
+        self.known_keys[key_id] = pubkey
+        return key_id
+
+    # ------------------------------------------------------------------ #
+    # Cifra
+    # ------------------------------------------------------------------ #
+    def _encrypt_body(self, plaintext: bytes, rounds: int) -> bytes:
+        compressed = self.encryptor.compressor.compress(plaintext)
+        transformed = self.encryptor.operator_g.apply_operations(compressed[len(_SYMBOLIC_PREFIX):])
+        return self.encryptor.cipher.encrypt_gcbc(transformed, self.iv, rounds=rounds)
+
+    def _decrypt_body(self, encrypted: bytes, rounds: int) -> bytes:
+        decrypted = self.encryptor.cipher.decrypt_gcbc(encrypted, self.iv, rounds=rounds)
+        restored = self.encryptor.operator_g.reverse_operations(decrypted)
+        return self.encryptor.compressor.decompress(_SYMBOLIC_PREFIX + restored)
+
+    def _tag(self, header: bytes, encrypted: bytes, length: int) -> bytes:
+        return fold_tag(self.encryptor.mac._ghash_v6(header + encrypted), length)
+
+    def seal(self, plaintext: bytes, rounds: int = None, sequence: int = None, with_pubkey: bool = None) -> bytes:
+        """Cria um quadro compacto para `plaintext`."""
+        if isinstance(plaintext, str):
+            plaintext = plaintext.encode('utf-8')
+        rounds = self.encryptor.rounds if rounds is None else validate_rounds(rounds)
+        with_pubkey = self.send_pubkey if with_pubkey is None else with_pubkey
+
+        encrypted = self._encrypt_body(plaintext, rounds)
+        flags = FLAG_VERSION
+        prefix = bytearray()
+        if with_pubkey:
+            flags |= FLAG_PUBKEY
+            prefix += self.pubkey
+        elif sequence is None:
+            flags |= FLAG_KEY_ID
+            prefix += self.key_id
+        if sequence is not None:
+            flags |= FLAG_SEQUENCE
+            prefix += encode_varint(sequence)
+        prefix += encode_varint(rounds)
+        prefix.append(self.tag_length)
+        prefix += encode_varint(len(encrypted))
+
+        header = bytes([flags]) + bytes(prefix)
+        return header + self._tag(header, encrypted, self.tag_length) + encrypted
+
+    def parse(self, data: bytes, offset: int = 0) -> dict:
+        """Lê os campos de um quadro a partir de `offset` (sem verificar a tag)."""
+        start = offset
+        if offset >= len(data):
+            raise ValueError("Quadro compacto truncado.")
+        flags = data[offset]
+        offset += 1
+        if flags & 0xF0 != FLAG_VERSION:
+            raise ValueError(f"Versão de quadro compacto não suportada: {flags >> 4}")
+
+        fields = {"pubkey": None, "key_id": None, "sequence": None}
+        if flags & FLAG_PUBKEY:
+            fields["pubkey"] = bytes(data[offset:offset + 32])
+            offset += 32
+        elif flags & FLAG_KEY_ID:
+            fields["key_id"] = bytes(data[offset:offset + 4])
+            offset += 4
+        if flags & FLAG_SEQUENCE:
+            fields["sequence"], offset = decode_varint(data, offset)
+        fields["rounds"], offset = decode_varint(data, offset)
+        validate_rounds(fields["rounds"])
+        if offset >= len(data):
+            raise ValueError("Quadro compacto truncado.")
+        tag_length = data[offset]
+        offset += 1
+        length, offset = decode_varint(data, offset)
+
+        end = offset + tag_length + length
+        if end > len(data) or not MIN_TAG_LENGTH <= tag_length <= MAX_TAG_LENGTH:
+            raise ValueError("Quadro compacto truncado ou inválido.")
+        fields["header"] = bytes(data[start:offset])
+        fields["tag"] = bytes(data[offset:offset + tag_length])
+        fields["encrypted"] = bytes(data[offset + tag_length:end])
+        fields["end"] = end
+        return fields
+
+    def _open_fields(self, fields: dict) -> bytes:
+        if fields["pubkey"] is not None and fields["pubkey"] != self.pubkey:
+            raise ValueError("Chave pública do quadro não corresponde a esta seed.")
+        if fields["key_id"] is not None and self.known_keys.get(fields["key_id"]) != self.pubkey:
+            raise ValueError("Key-id desconhecido para esta seed.")
+
+        # O tamanho da tag vem do quadro apenas para delimitá-lo; quem recebe exige o seu próprio
+        # tamanho, senão um quadro com tag mínima rebaixaria a resistência a falsificação
+        if len(fields["tag"]) != self.tag_length:
+            raise ValueError(f"Tamanho de tag inesperado: {len(fields['tag'])} (esperado {self.tag_length}).")
+        expected = self._tag(fields["header"], fields["encrypted"], self.tag_length)
+        if not self.encryptor.mac._constant_time_compare(expected, fields["tag"]):
+            raise ValueError("MAC-G falhou! Dados comprometidos.")
+        return self._decrypt_body(fields["encrypted"], fields["rounds"])
+
+    def open(self, frame: bytes) -> bytes:
+        """Verifica e decifra um quadro compacto isolado."""
+        fields = self.parse(frame)
+        if fields["end"] != len(frame):
+            raise ValueError("Dados extras após o quadro compacto.")
+        return self._open_fields(fields)
+
+    def iter_frames(self, stream: bytes):
+        """Percorre quadros concatenados (os tamanhos varint tornam o fluxo autodelimitado)."""
+        offset = 0
+        while offset < len(stream):
+            fields = self.parse(stream, offset)
+            offset = fields["end"]
+            yield fields
+
+
+# Class GhostCompactSessionG
+# Sessão sobre quadros compactos: a pubkey segue só no primeiro quadro e cada quadro
+# carrega um número de sequência autenticado (quadros repetidos ou fora de ordem são rejeitados).
+class GhostCompactSessionG:
+    def __init__(self, framer: GhostCompactFramerG):
+        self.framer = framer
+        self._send_sequence = 0
+        self._recv_sequence = -1
+        self._peer_pubkey = None
+
+    def seal(self, plaintext: bytes, rounds: int = None) -> bytes:
+        first = self._send_sequence == 0
+        frame = self.framer.seal(plaintext, rounds=rounds, sequence=self._send_sequence, with_pubkey=first)
+        self._send_sequence += 1
+        return frame
+
+    def _accept(self, fields: dict) -> bytes:
+        sequence = fields["sequence"]
+        if sequence is None:
+            raise ValueError("Quadro sem número de sequência em modo sessão.")
+        if self._peer_pubkey is None and fields["pubkey"] is None:
+            raise ValueError("O primeiro quadro da sessão deve trazer a chave pública.")
+        if sequence <= self._recv_sequence:
+            raise ValueError(f"Quadro repetido ou fora de ordem: {sequence}")
+
+        plaintext = self.framer._open_fields(fields)
+        # Só um quadro autenticado inicia a sessão
+        if self._peer_pubkey is None:
+            self._peer_pubkey = fields["pubkey"]
+        self._recv_sequence = sequence
+        return plaintext
+
+    def open(self, frame: bytes) -> bytes:
+        fields = self.framer.parse(frame)
+        if fields["end"] != len(frame):
+            raise ValueError("Dados extras após o quadro compacto.")
+        return self._accept(fields)
+
+    def open_stream(self, stream: bytes) -> list:
+        """Abre todos os quadros de um fluxo concatenado, em ordem."""
+        return [self._accept(fields) for fields in self.framer.iter_frames(stream)]
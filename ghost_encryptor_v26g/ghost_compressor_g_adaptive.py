@@ -1,44 +1,189 @@
+import struct
+import threading
+import time
 import zlib
 
+from .compressor_zlib import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_MAX_OUTPUT, INSTANCE_LIMIT, iter_decompress, iter_raw, resolve_max_output,
+)
+from .ghost_dictionary_g import DEFAULT_REGISTRY, compress_with_dictionary
+
+# Política adaptativa: para entradas grandes, algumas janelas pequenas são comprimidas
+# (nível 1) para estimar a compressibilidade. Dados incompressíveis (JPEG, vídeo, dados já
+# cifrados) são armazenados crus; nos demais, o nível é escolhido pelo ganho estimado e
+# pela vazão estimada de cada nível frente à meta de vazão.
+#
+# A decisão de não comprimir é conferida por amostragem: a cada RAW_AUDIT_INTERVAL blocos
+# enviados crus, um é comprimido de verdade (nível 1). O resultado real entra nas estatísticas
+# e, se a compressão compensar, a saída comprimida é usada. Blocos crus não conferidos contam
+# apenas no volume, não na taxa de acerto.
+PROBE_THRESHOLD = 8 * 1024      # abaixo disso não há amostragem (regra por tamanho)
+PROBE_WINDOWS = 3
+PROBE_WINDOW_SIZE = 4 * 1024
+RAW_RATIO = 0.95                # razão estimada acima da qual os dados vão crus
+LOW_GAIN = 0.10                 # ganho abaixo do qual só vale o nível mais rápido
+RAW_AUDIT_INTERVAL = 16         # 1 a cada N blocos crus é comprimido para conferir a decisão
+DEFAULT_THROUGHPUT_TARGET = 20.0  # MB/s
+# Custo relativo aproximado de cada nível em relação ao nível 1
+LEVEL_COST = {9: 6.0, 6: 3.0, 1: 1.0}
+
+
 # Class GhostCompressorGAdaptive
-# Esta classe aplica compressão zlib com comportamento adaptativo simples.
+# Esta classe aplica compressão zlib com comportamento adaptativo.
 class GhostCompressorGAdaptive:
     """
     GhostCompressorGAdaptive aplica compressão zlib com comportamento adaptativo simples.
     Suporta prefixos para diferenciar dados vazios e comprimidos.
     Opcionalmente usa uma seed (não usada nesta versão, mas reservada para versões futuras).
+    Com dictionary_id, usa um dicionário zlib pré-definido (prefixo \x02 + ID de 4 bytes).
+    Dados que não encolhem são armazenados crus (prefixo \x03).
+    A descompressão é limitada a max_output bytes (por instância ou por chamada; None desativa).
     """
 
-    def __init__(self, seed: bytes = b''):
+    def __init__(self, seed: bytes = b'', dictionary_id: int = None, registry=None,
+                 throughput_target: float = DEFAULT_THROUGHPUT_TARGET, max_output: int = DEFAULT_MAX_OUTPUT):
         self.seed = seed  # Mantido para compatibilidade com arquitetura GhostEncryptorV24G
+        self.dictionary_id = dictionary_id
+        self.registry = registry or DEFAULT_REGISTRY
+        self.throughput_target = throughput_target
+        self.max_output = max_output
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._raw_decisions = 0
+
+    # ------------------------------------------------------------------ #
+    # Sonda de compressibilidade e estatísticas
+    # ------------------------------------------------------------------ #
+    def estimate(self, data: bytes) -> tuple:
+        """
+        Comprime algumas janelas espalhadas pelos dados (nível 1).
+        Retorna (razão estimada comprimido/original, vazão do nível 1 em MB/s).
+        """
+        step = max((len(data) - PROBE_WINDOW_SIZE) // max(PROBE_WINDOWS - 1, 1), 1)
+        windows = [data[i * step:i * step + PROBE_WINDOW_SIZE] for i in range(PROBE_WINDOWS)]
+        sampled = sum(len(w) for w in windows)
+
+        start = time.perf_counter()
+        compressed = sum(len(zlib.compress(w, 1)) for w in windows)
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        return compressed / sampled, sampled / elapsed / (1024 * 1024)
+
+    def choose_level(self, data: bytes) -> int:
+        """Retorna o nível zlib a usar, ou 0 para armazenar os dados crus."""
+        if len(data) < PROBE_THRESHOLD:
+            return 9 if len(data) > 1024 else 1  # Compressão adaptativa simples
+        ratio, level1_mbps = self.estimate(data)
+        if ratio > RAW_RATIO:
+            return 0
+        if 1 - ratio < LOW_GAIN:
+            return 1
+        for level in (9, 6):
+            if level1_mbps / LEVEL_COST[level] >= self.throughput_target:
+                return level
+        return 1
+
+    def _record(self, decision: str, size_in: int, size_out: int, hit: bool = None) -> None:
+        # hit=None: resultado não conferido (bloco cru fora da amostragem)
+        with self._stats_lock:
+            entry = self._stats.setdefault(decision, {"count": 0, "checked": 0, "hits": 0,
+                                                      "bytes_in": 0, "bytes_out": 0})
+            entry["count"] += 1
+            if hit is not None:
+                entry["checked"] += 1
+                entry["hits"] += hit
+            entry["bytes_in"] += size_in
+            entry["bytes_out"] += size_out
+
+    def _audit_raw(self) -> bool:
+        with self._stats_lock:
+            self._raw_decisions += 1
+            return self._raw_decisions % RAW_AUDIT_INTERVAL == 1
+
+    def decision_stats(self) -> dict:
+        """
+        Estatísticas por decisão: contagem, fração das chamadas, taxa de acerto entre as
+        decisões conferidas (saída menor que a entrada; para "raw", compressão amostrada que de
+        fato não compensaria) e razão média. hit_rate é None se nenhuma decisão foi conferida.
+        """
+        with self._stats_lock:
+            stats = {k: dict(v) for k, v in self._stats.items()}
+        total = sum(v["count"] for v in stats.values()) or 1
+        for entry in stats.values():
+            entry["share"] = entry["count"] / total
+            entry["hit_rate"] = entry["hits"] / entry["checked"] if entry["checked"] else None
+            entry["ratio"] = entry["bytes_out"] / max(entry["bytes_in"], 1)
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats = {}
+            self._raw_decisions = 0
 
     def compress(self, data: bytes) -> bytes:
         """
         Comprime os dados com zlib. Adiciona prefixo:
-        \x00 para dados vazios, \x01 para dados comprimidos.
+        \x00 para dados vazios, \x01 para dados comprimidos,
+        \x02 para dados comprimidos com dicionário, \x03 para dados crus.
         """
         if not data:
             return b'\x00'  # Marcador para dados vazios
-        level = 9 if len(data) > 1024 else 1  # Compressão adaptativa simples
-        compressed = zlib.compress(data, level)
-        return b'\x01' + compressed
 
-    def decompress(self, data: bytes) -> bytes:
+        if self.dictionary_id is not None:
+            decision = "dictionary"
+            level = 9 if len(data) > 1024 else 1
+            zdict = self.registry.get(self.dictionary_id)
+            output = b'\x02' + struct.pack('>I', self.dictionary_id) + compress_with_dictionary(data, zdict, level)
+        else:
+            level = self.choose_level(data)
+            if level == 0:
+                # A sonda indicou dados incompressíveis: nenhum trabalho do zlib, exceto nos
+                # blocos amostrados, que conferem a decisão com uma compressão real
+                if not self._audit_raw():
+                    self._record("raw", len(data), len(data) + 1)
+                    return b'\x03' + data
+                output = b'\x01' + zlib.compress(data, 1)
+                if len(output) > RAW_RATIO * (len(data) + 1):
+                    self._record("raw", len(data), len(data) + 1, True)
+                    return b'\x03' + data
+                self._record("raw", len(data), len(output), False)
+                return output
+            decision = f"level_{level}"
+            output = b'\x01' + zlib.compress(data, level)
+
+        if len(output) > len(data) + 1:
+            # A compressão não compensou: mantém os dados crus e registra o erro da decisão
+            self._record(decision, len(data), len(data) + 1, False)
+            return b'\x03' + data
+        self._record(decision, len(data), len(output), True)
+        return output
+
+    def decompress(self, data: bytes, max_output: int = INSTANCE_LIMIT) -> bytes:
         """
         Descomprime os dados com base no prefixo.
-        \x00: retorna vazio, \x01: descomprime com zlib.
+        \x00: retorna vazio, \x01: descomprime com zlib, \x02: descomprime com dicionário,
+        \x03: dados crus.
         """
+        return b''.join(self.iter_decompress(data, max_output=max_output))
+
+    def iter_decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE, max_output: int = INSTANCE_LIMIT):
+        """Gera o texto original em pedaços de até `chunk_size` bytes."""
         if not data:
             raise ValueError("Dados vazios não podem ser descomprimidos.")
         flag = data[0]
         payload = data[1:]
+        max_output = resolve_max_output(max_output, self.max_output)
 
         if flag == 0x00:
-            return b''
+            return iter(())
         elif flag == 0x01:
-            try:
-                return zlib.decompress(payload)
-            except Exception as e:
-                raise ValueError("Erro ao descomprimir os dados adaptativos: " + str(e))
+            return iter_decompress(payload, chunk_size=chunk_size, max_output=max_output)
+        elif flag == 0x02:
+            if len(payload) < 4:
+                raise ValueError("Cabeçalho de dicionário truncado.")
+            (dict_id,) = struct.unpack('>I', payload[:4])
+            zdict = self.registry.get(dict_id)
+            return iter_decompress(payload[4:], zdict, chunk_size, max_output)
+        elif flag == 0x03:
+            return iter_raw(payload, chunk_size, max_output)
         else:
             raise ValueError(f"Flag de compressão desconhecida: {flag}")
@@ -1,42 +1,71 @@
 # ghost_compressor_g.py
 
+import struct
 import zlib
 
+from . import ghost_backend_g as backend
+from .compressor_zlib import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_OUTPUT, INSTANCE_LIMIT, iter_decompress, resolve_max_output
+from .ghost_dictionary_g import DEFAULT_REGISTRY, compress_with_dictionary
+
 # Class GhostCompressorG
 # Esta classe implementa a compressão simbólica de dados usando o algoritmo zlib.
 # Ela adiciona um prefixo para diferenciar entre dados vazios e dados comprimidos.
+# Com dictionary_id, usa um dicionário zlib pré-definido (ghost_dictionary_g) e grava o ID no cabeçalho.
+# A descompressão é limitada a max_output bytes (por instância ou por chamada; None desativa) e pode ser
+# consumida em pedaços com iter_decompress.
 class GhostCompressorG:
-    def __init__(self, seed: bytes):
+    def __init__(self, seed: bytes, dictionary_id: int = None, registry=None,
+                 max_output: int = DEFAULT_MAX_OUTPUT):
         self.seed = seed
+        self.dictionary_id = dictionary_id
+        self.registry = registry or DEFAULT_REGISTRY
+        self.max_output = max_output
 
     def compress(self, data: bytes) -> bytes:
         if not data:
             return b'\x00G\x00'  # marcador para vazio
 
+        if self.dictionary_id is not None:
+            zdict = self.registry.get(self.dictionary_id)
+            encoded = self._symbolic_encode(compress_with_dictionary(data, zdict))
+            # marcador para dado simbólico comprimido com dicionário + ID (4 bytes)
+            return b'\x00G\x02' + struct.pack('>I', self.dictionary_id) + encoded
+
         compressed = zlib.compress(data)
         encoded = self._symbolic_encode(compressed)
         return b'\x00G\x01' + encoded  # marcador para dado simbólico comprimido
 
-    def decompress(self, data: bytes) -> bytes:
-        if not data.startswith(b'\x00G'):
+    def decompress(self, data: bytes, max_output: int = INSTANCE_LIMIT) -> bytes:
+        return b''.join(self.iter_decompress(data, max_output=max_output))
+
+    def iter_decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE, max_output: int = INSTANCE_LIMIT):
+        """Gera o texto original em pedaços de até `chunk_size` bytes."""
+        if not data.startswith(b'\x00G') or len(data) < 3:
             raise ValueError("Flag de compressão simbólica inválida.")
 
         flag = data[2]
         content = data[3:]
+        max_output = resolve_max_output(max_output, self.max_output)
 
         if flag == 0x00:
-            return b''  # dado original era vazio
+            return iter(())  # dado original era vazio
         elif flag == 0x01:
             decoded = self._symbolic_decode(content)
-            return zlib.decompress(decoded)
+            return iter_decompress(decoded, chunk_size=chunk_size, max_output=max_output)
+        elif flag == 0x02:
+            if len(content) < 4:
+                raise ValueError("Cabeçalho de dicionário truncado.")
+            (dict_id,) = struct.unpack('>I', content[:4])
+            decoded = self._symbolic_decode(content[4:])
+            return iter_decompress(decoded, self.registry.get(dict_id), chunk_size, max_output)
         else:
             raise ValueError("Flag de tipo de dado simbólico desconhecida.")
 
     def _symbolic_encode(self, data: bytes) -> bytes:
-        return bytes([b ^ self.seed[i % len(self.seed)] for i, b in enumerate(data)])
+        return backend.xor_keys(data, [self.seed])
 
     def _symbolic_decode(self, data: bytes) -> bytes:
-        return bytes([b ^ self.seed[i % len(self.seed)] for i, b in enumerate(data)])
+        return backend.xor_keys(data, [self.seed])
 
 
 if __name__ == "__main__":
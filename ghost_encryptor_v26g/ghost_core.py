@@ -3,7 +3,8 @@ from .utils import GhostEntropyAI
 from .ghost_matrix_cipher_g import GhostMatrixCipherG
 from .ghost_transformer_v26 import GhostTransformerV26
 from .compressor_zlib import GhostCompressor
-from .ghost_mac_g import GhostMACG
+from .ghost_mac_g import GhostMACG, TREE_BLOCK_SIZE
+from .ghost_header_g import GhostHeaderG, HEADER_SIZE, CODEC_ZLIB, LEGACY_ROUNDS, validate_rounds
 from .ghost_operator_g import GhostOperatorG
 from .v26g_quantum import GhostSecurityAutotuner, kyber_encapsulate
 from .v26g_benchmark import measure_entropy
@@ -11,6 +12,8 @@ from .v26g_benchmark import measure_entropy
 # Class GhostCore
 # Esta classe encapsula a lógica principal do GhostEncryptor V26G.
 # Ela gerencia a criptografia, compressão, MAC e entropia.
+# Formato: cabeçalho GhostHeaderG (8) + iv (16) + MAC-G (64) + ciphertext. As rodadas escolhidas
+# pelo autotuner ficam no cabeçalho, e o decrypt usa exatamente essas rodadas.
 class GhostCore:
     def __init__(self, seed: str):
         if isinstance(seed, bytes):
@@ -53,20 +56,52 @@ class GhostCore:
         tuning = self.autotuner.suggest_parameters(entropy, len(compressed))
         print(f"[AUTOTUNER] Nível: {tuning['level']}, Rodadas: {tuning['rounds']}")
 
-        # Transformação + cifragem com rodadas adaptativas (se suportado)
-        transformed = self.transformer.transform(compressed, rounds=tuning['rounds'])
-        encrypted = self.matrix_cipher.encrypt_gcbc(transformed, iv, rounds=tuning['rounds'])
+        # Transformação + cifragem com rodadas adaptativas (ímpares), registradas no cabeçalho
+        rounds = validate_rounds(tuning['rounds'])
+        transformed = self.transformer.transform(compressed, rounds=rounds)
+        encrypted = self.matrix_cipher.encrypt_gcbc(transformed, iv, rounds=rounds)
 
-        # MAC
-        mac = self.mac.compute_mac(encrypted, iv)
+        # MAC (cobre cabeçalho, iv e ciphertext)
+        block_size = self.mac.block_size if self.mac.mode == "tree" else 0
+        header = GhostHeaderG(CODEC_ZLIB, rounds, self.mac.mode, block_size).pack()
+        mac = self.mac.generate_mac(header + iv + encrypted)
 
-        return iv + mac + encrypted
+        return header + iv + mac + encrypted
+
+    def _verify(self, payload: bytes, legacy: bool = False):
+        """Verifica o MAC-G e retorna (iv, ciphertext, rodadas); levanta ValueError se falhar."""
+        if not legacy and GhostHeaderG.has_header(payload):
+            header = GhostHeaderG.unpack(payload)
+            if header.codec != CODEC_ZLIB:
+                raise ValueError(f"Codec não suportado pelo GhostCore: {header.codec}")
+            prefix, body, rounds = payload[:HEADER_SIZE], payload[HEADER_SIZE:], header.rounds
+            mac_engine = self.mac
+            if header.mac_mode != self.mac.mode or (header.mac_mode == "tree" and header.mac_block_size != self.mac.block_size):
+                mac_engine = GhostMACG(self.main_key, mode=header.mac_mode,
+                                       block_size=header.mac_block_size or TREE_BLOCK_SIZE)
+        else:
+            # Formato legado: sem cabeçalho, rodadas fixas
+            prefix, body, rounds, mac_engine = b'', payload, LEGACY_ROUNDS, self.mac
+
+        iv = body[:16]
+        mac = body[16:16+64]
+        encrypted = body[16+64:]
+        mac_input = prefix + iv + encrypted if prefix else encrypted
+        if not mac_engine.verify_mac(mac_input, mac):
+            raise ValueError("MAC-G falhou! Dados comprometidos.")
+        return iv, encrypted, rounds
 
     def decrypt(self, payload: bytes) -> bytes:
-        iv = payload[:16]
-        mac = payload[16:16+64]
-        encrypted = payload[16+64:]
-        self.mac.verify_mac(encrypted, iv, mac)
-        decrypted = self.matrix_cipher.decrypt_gcbc(encrypted, iv)
-        original = self.transformer.transform_decrypt(decrypted)
+        try:
+            iv, encrypted, rounds = self._verify(payload)
+        except ValueError as error:
+            # Um payload legado cujo iv começa com o MAGIC do cabeçalho também é conferido sem cabeçalho
+            if not GhostHeaderG.has_header(payload):
+                raise
+            try:
+                iv, encrypted, rounds = self._verify(payload, legacy=True)
+            except ValueError:
+                raise error from None
+        decrypted = self.matrix_cipher.decrypt_gcbc(encrypted, iv, rounds=rounds)
+        original = self.transformer.transform_decrypt(decrypted, rounds=rounds)
         return self.compressor.decompress(original)
@@ -0,0 +1,371 @@
+# ghost_daemon_g.py
+
+import asyncio
+import queue
+import socket
+import struct
+import threading
+from collections import OrderedDict
+
+from .GhostEncryptorV26G_Final import GhostEncryptorV26G
+
+# Protocolo do daemon (todas as mensagens são prefixadas por 4 bytes big-endian de tamanho)
+#
+#   requisição : op (1) + id (4) + tamanho da seed (2) + seed + payload
+#   resposta   : status (1) + id (4) + payload (resultado ou mensagem de erro UTF-8)
+#
+# Operações: b'E' criptografa, b'D' descriptografa, b'V' verifica (payload b'\x01' ou b'\x00').
+# Várias requisições podem ser enviadas antes de ler as respostas (pipelining);
+# as respostas de uma conexão saem sempre na ordem das requisições. O servidor continua
+# lendo requisições enquanto há respostas pendentes (até max_pending por conexão) e o
+# cliente envia lotes grandes em uma thread enquanto lê, para que nenhum dos lados fique
+# bloqueado com o buffer do socket cheio.
+OP_ENCRYPT = b'E'
+OP_DECRYPT = b'D'
+OP_VERIFY = b'V'
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+DEFAULT_MAX_FRAME = 64 * 1024 * 1024
+DEFAULT_MAX_INSTANCES = 64
+DEFAULT_MAX_PENDING = 64
+_INLINE_SEND = 64 * 1024  # lotes menores que isso cabem no buffer do socket: envio direto
+
+_LENGTH = struct.Struct('>I')
+_REQUEST = struct.Struct('>cIH')
+_RESPONSE = struct.Struct('>BI')
+
+
+def encode_request(op: bytes, request_id: int, seed: bytes, payload: bytes) -> bytes:
+    body = _REQUEST.pack(op, request_id, len(seed)) + seed + payload
+    return _LENGTH.pack(len(body)) + body
+
+
+def decode_request(body: bytes) -> tuple:
+    op, request_id, seed_len = _REQUEST.unpack_from(body)
+    start = _REQUEST.size
+    if start + seed_len > len(body):
+        raise ValueError("Tamanho de seed maior que a requisição.")
+    return op, request_id, body[start:start + seed_len], body[start + seed_len:]
+
+
+def encode_response(status: int, request_id: int, payload: bytes) -> bytes:
+    body = _RESPONSE.pack(status, request_id) + payload
+    return _LENGTH.pack(len(body)) + body
+
+
+# Class GhostEncryptionDaemonG
+# Serviço local (asyncio) que mantém instâncias "quentes" do GhostEncryptorV26G por seed.
+# Escuta em um socket Unix ou em TCP local e atende ao protocolo acima.
+class GhostEncryptionDaemonG:
+    def __init__(self, socket_path: str = None, host: str = "127.0.0.1", port: int = 0,
+                 max_instances: int = DEFAULT_MAX_INSTANCES, max_frame: int = DEFAULT_MAX_FRAME,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.max_instances = max_instances
+        self.max_frame = max_frame
+        self.max_pending = max_pending
+        self._instances = OrderedDict()
+        self._lock = threading.Lock()
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    # ------------------------------------------------------------------ #
+    # Instâncias quentes
+    # ------------------------------------------------------------------ #
+    def get_encryptor(self, seed: bytes) -> GhostEncryptorV26G:
+        """Retorna a instância quente da seed, criando-a (LRU) se necessário."""
+        with self._lock:
+            encryptor = self._instances.get(seed)
+            if encryptor is not None:
+                self._instances.move_to_end(seed)
+                return encryptor
+
+        encryptor = GhostEncryptorV26G(seed)
+        encryptor._session_keys()  # aquece o KEM antes da primeira requisição
+
+        with self._lock:
+            encryptor = self._instances.setdefault(seed, encryptor)
+            while len(self._instances) > self.max_instances:
+                self._instances.popitem(last=False)
+        return encryptor
+
+    def handle(self, op: bytes, seed: bytes, payload: bytes) -> bytes:
+        """Executa uma operação do protocolo e retorna o payload de resposta."""
+        encryptor = self.get_encryptor(seed)
+        # Sem mensagens de progresso por requisição: o daemon não escreve na saída padrão
+        if op == OP_ENCRYPT:
+            return encryptor.encryptByte(payload, quiet=True)
+        elif op == OP_DECRYPT:
+            return encryptor.decryptByte(payload, quiet=True)
+        elif op == OP_VERIFY:
+            # Só o MAC-G: sem decifrar nem descomprimir
+            return b'\x01' if encryptor.verify_only(payload) else b'\x00'
+        raise ValueError(f"Operação desconhecida: {op!r}")
+
+    # ------------------------------------------------------------------ #
+    # Servidor asyncio
+    # ------------------------------------------------------------------ #
+    async def _write_responses(self, writer, pending: asyncio.Queue):
+        # Grava as respostas na ordem das requisições. Se a conexão cair, continua consumindo
+        # a fila (descartando) para que o leitor nunca fique preso em um put().
+        connected = True
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            if isinstance(item, bytes):
+                response = item
+            else:
+                request_id, future = item
+                try:
+                    response = encode_response(STATUS_OK, request_id, await future)
+                except Exception as e:
+                    response = encode_response(STATUS_ERROR, request_id, str(e).encode('utf-8'))
+            if connected:
+                try:
+                    writer.write(response)
+                    await writer.drain()
+                except ConnectionError:
+                    connected = False
+
+    async def _handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(maxsize=self.max_pending)
+        writer_task = asyncio.create_task(self._write_responses(writer, pending))
+        try:
+            while True:
+                try:
+                    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+                except asyncio.IncompleteReadError:
+                    break
+                if length > self.max_frame or length < _REQUEST.size:
+                    await pending.put(encode_response(STATUS_ERROR, 0, "Quadro inválido.".encode('utf-8')))
+                    break
+
+                body = await reader.readexactly(length)
+                try:
+                    op, request_id, seed, payload = decode_request(body)
+                except ValueError as e:
+                    # Quadro malformado: responde com erro e encerra a conexão (o fluxo não é confiável)
+                    request_id = _REQUEST.unpack_from(body)[1]
+                    await pending.put(encode_response(STATUS_ERROR, request_id, str(e).encode('utf-8')))
+                    break
+                future = loop.run_in_executor(None, self.handle, op, seed, payload)
+                await pending.put((request_id, future))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            await pending.put(None)
+            await writer_task
+            writer.close()
+
+    async def start(self):
+        """Abre o socket de escuta (Unix se socket_path foi informado, senão TCP local)."""
+        if self.socket_path:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        print(f"[🟢] Daemon GhostEncryptor V26G escutando em {self.address}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    @property
+    def address(self):
+        return self.socket_path or (self.host, self.port)
+
+    def start_in_thread(self):
+        """Executa o daemon em uma thread própria (útil para embutir em aplicações e testes)."""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+            self._server.close()
+            # Conexões ainda abertas (leitor e gravador de respostas) são canceladas antes de fechar o loop
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="ghost-daemon", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.address
+
+    def stop(self):
+        """Encerra um daemon iniciado com start_in_thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+
+# Class GhostDaemonClientG
+# Cliente síncrono do daemon com pool de conexões reutilizáveis.
+class GhostDaemonClientG:
+    def __init__(self, socket_path: str = None, host: str = "127.0.0.1", port: int = None,
+                 pool_size: int = 4, timeout: float = 30.0):
+        if socket_path is None and port is None:
+            raise ValueError("Informe socket_path ou port.")
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._next_id = 0
+        self._id_lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        if self.socket_path:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+        else:
+            conn = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def _acquire(self) -> socket.socket:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, conn: socket.socket, healthy: bool = True) -> None:
+        if healthy:
+            self._idle.put(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def _request_id(self) -> int:
+        with self._id_lock:
+            self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+            return self._next_id
+
+    @staticmethod
+    def _recv_exact(conn: socket.socket, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = conn.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionError("Conexão encerrada pelo daemon.")
+            buf += chunk
+        return bytes(buf)
+
+    def pipeline(self, seed: bytes, operations: list) -> list:
+        """
+        Envia várias operações [(op, payload), ...] de uma vez e lê as respostas em ordem.
+        Retorna a lista de resultados; erros do daemon são levantados como ValueError.
+        """
+        if isinstance(seed, str):
+            seed = seed.encode('utf-8')
+        ids = [self._request_id() for _ in operations]
+        frames = b''.join(
+            encode_request(op, request_id, seed, payload)
+            for (op, payload), request_id in zip(operations, ids)
+        )
+
+        conn = self._acquire()
+        healthy = False
+        sender = None
+        send_errors = []
+        try:
+            if len(frames) <= _INLINE_SEND:
+                conn.sendall(frames)
+            else:
+                # Envia em paralelo à leitura: com o lote maior que os buffers, o daemon só
+                # continua lendo se as respostas dele estiverem sendo consumidas
+                def send():
+                    try:
+                        conn.sendall(frames)
+                    except OSError as e:
+                        send_errors.append(e)
+                sender = threading.Thread(target=send, name="ghost-daemon-send", daemon=True)
+                sender.start()
+            responses = []
+            for request_id in ids:
+                (length,) = _LENGTH.unpack(self._recv_exact(conn, _LENGTH.size))
+                body = self._recv_exact(conn, length)
+                status, response_id = _RESPONSE.unpack_from(body)
+                if response_id != request_id:
+                    raise ConnectionError("Resposta fora de ordem do daemon.")
+                responses.append((status, body[_RESPONSE.size:]))
+            if sender is not None:
+                sender.join()
+                if send_errors:
+                    raise send_errors[0]
+            healthy = True
+        finally:
+            if sender is not None and sender.is_alive():
+                # Acorda a thread de envio bloqueada antes de descartar a conexão
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sender.join()
+            self._release(conn, healthy)
+
+        results = []
+        for status, payload in responses:
+            if status != STATUS_OK:
+                raise ValueError(payload.decode('utf-8', errors='replace'))
+            results.append(payload)
+        return results
+
+    def encrypt(self, seed: bytes, plaintext: bytes) -> bytes:
+        return self.pipeline(seed, [(OP_ENCRYPT, plaintext)])[0]
+
+    def decrypt(self, seed: bytes, ciphertext: bytes) -> bytes:
+        return self.pipeline(seed, [(OP_DECRYPT, ciphertext)])[0]
+
+    def verify(self, seed: bytes, ciphertext: bytes) -> bool:
+        return self.pipeline(seed, [(OP_VERIFY, ciphertext)])[0] == b'\x01'
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Daemon local do GhostEncryptor V26G")
+    parser.add_argument("--socket", help="caminho do socket Unix")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7626)
+    args = parser.parse_args()
+
+    daemon = GhostEncryptionDaemonG(socket_path=args.socket, host=args.host, port=args.port)
+    asyncio.run(daemon.serve_forever())
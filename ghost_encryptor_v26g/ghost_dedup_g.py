@@ -0,0 +1,271 @@
+# ghost_dedup_g.py
+
+import json
+import os
+import sqlite3
+
+from . import ghost_backend_g as backend
+from .GhostEncryptorV26G_Final import GhostEncryptorV26G
+from .ghost_mac_g import digest_key, keyed_digest
+
+# Backups deduplicados com chunking definido pelo conteúdo (CDC).
+#
+#   1. A entrada é dividida com um hash rolante Gear: um corte ocorre quando os bits altos
+#      do hash zeram, então inserções e remoções só deslocam os cortes vizinhos. Com NumPy,
+#      o hash de todas as posições de um buffer é calculado de uma vez (vetorizado).
+#   2. Cada chunk recebe uma impressão digital com chave (BLAKE2b sob uma chave derivada da
+#      seed), resistente a colisões e que não revela o conteúdo para quem não conhece a seed.
+#   3. Um índice SQLite local registra os chunks já armazenados; apenas chunks novos passam
+#      pelo pipeline do GhostEncryptorV26G (encryptByte) e são gravados.
+#   4. O manifesto (também cifrado) lista as impressões digitais de cada arquivo, em ordem.
+#
+# Em um backup repetido, só os chunks alterados são comprimidos, cifrados e gravados; o custo
+# dos chunks inalterados é o do chunking e do BLAKE2b, ambos em velocidade de C.
+MANIFEST_VERSION = 2
+DEFAULT_MIN_CHUNK = 2 * 1024
+DEFAULT_AVG_CHUNK = 8 * 1024
+DEFAULT_MAX_CHUNK = 64 * 1024
+
+_MASK64 = (1 << 64) - 1
+_GEAR_WINDOW = 64  # o hash Gear só depende dos últimos 64 bytes (os bits mais antigos saem pela esquerda)
+
+
+def _gear_table() -> tuple:
+    # Tabela fixa de 256 valores pseudoaleatórios de 64 bits (splitmix64)
+    table = []
+    state = 0x9E3779B97F4A7C15
+    for _ in range(256):
+        state = (state + 0x9E3779B97F4A7C15) & _MASK64
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        table.append(z ^ (z >> 31))
+    return tuple(table)
+
+
+_GEAR = _gear_table()
+_GEAR_NP = backend.np.array(_GEAR, dtype=backend.np.uint64) if backend.NUMPY_AVAILABLE else None
+
+
+def _cut_point(data, min_size: int, max_size: int, mask: int) -> int:
+    """Posição do primeiro corte em `data` (ou o fim, se não houver corte até max_size)."""
+    length = len(data)
+    if length <= min_size:
+        return length
+    limit = min(length, max_size)
+    gear = _GEAR
+    h = 0
+    # Aquece o hash com a janela que antecede min_size (equivale a hashear desde o início)
+    for i in range(max(0, min_size - _GEAR_WINDOW), min_size):
+        h = ((h << 1) + gear[data[i]]) & _MASK64
+    for i in range(min_size, limit):
+        h = ((h << 1) + gear[data[i]]) & _MASK64
+        if not h & mask:
+            return i + 1
+    return limit
+
+
+def _gear_hashes(data):
+    """
+    Hash Gear de todas as posições de `data` (NumPy): h[i] = soma de GEAR[data[i - k]] << k
+    para k < 64, com aritmética de 64 bits. É o mesmo valor do laço de _cut_point sempre que
+    a janela de 64 bytes cabe dentro do chunk (garantido quando min_size >= 64).
+    A janela é montada por duplicação (1, 2, 4, ..., 64 termos): 6 passadas em vez de 63.
+    """
+    np = backend.np
+    hashes = _GEAR_NP[np.frombuffer(data, dtype=np.uint8)]
+    span = 1
+    while span < _GEAR_WINDOW:
+        shifted = hashes[:len(hashes) - span] << np.uint64(span)
+        hashes[span:] += shifted
+        span *= 2
+    return hashes
+
+
+def _cut_points(data, min_size: int, max_size: int, mask: int, eof: bool) -> list:
+    """
+    Fins dos chunks completos de `data`. Sem `eof`, para antes do trecho final menor que
+    max_size, que pode continuar na próxima leitura.
+    """
+    ends = []
+    start = 0
+    length = len(data)
+    vectorized = min_size >= _GEAR_WINDOW and backend.use_numpy(length)
+    if vectorized:
+        np = backend.np
+        hits = np.flatnonzero((_gear_hashes(data) & np.uint64(mask)) == 0)
+    while start < length:
+        remaining = length - start
+        if remaining < max_size and not eof:
+            break
+        if vectorized:
+            limit = start + min(remaining, max_size)
+            if remaining <= min_size:
+                end = length
+            else:
+                j = int(np.searchsorted(hits, start + min_size))
+                end = int(hits[j]) + 1 if j < len(hits) and hits[j] < limit else limit
+        else:
+            end = start + _cut_point(memoryview(data)[start:start + max_size], min_size, max_size, mask)
+        ends.append(end)
+        start = end
+    return ends
+
+
+def iter_chunks(source, min_size: int = DEFAULT_MIN_CHUNK, avg_size: int = DEFAULT_AVG_CHUNK,
+                max_size: int = DEFAULT_MAX_CHUNK):
+    """Divide `source` (objeto com read) em chunks definidos pelo conteúdo."""
+    if avg_size & (avg_size - 1) or not 0 < min_size <= avg_size <= max_size:
+        raise ValueError("Tamanhos de chunk inválidos (avg_size deve ser potência de 2 e min <= avg <= max).")
+    bits = avg_size.bit_length() - 1
+    mask = ((1 << bits) - 1) << (64 - bits)  # bits altos: dependem de toda a janela
+
+    buffer = bytearray()
+    eof = False
+    while True:
+        # Lê vários chunks máximos por vez: os cortes de todo o buffer saem de uma única passada
+        while not eof and len(buffer) < max_size * 4:
+            data = source.read(max_size * 4)
+            if not data:
+                eof = True
+            buffer += data
+        if not buffer:
+            return
+        start = 0
+        for end in _cut_points(buffer, min_size, max_size, mask, eof):
+            yield bytes(buffer[start:end])
+            start = end
+        del buffer[:start]
+
+
+# Class GhostDedupStoreG
+# Repositório de chunks cifrados com índice SQLite e manifestos cifrados por arquivo.
+#
+#   store_dir/index.sqlite            : fingerprint -> tamanho original, tamanho armazenado, referências
+#   store_dir/chunks/ab/abcd....g     : chunk cifrado com encryptByte
+class GhostDedupStoreG:
+    def __init__(self, store_dir: str, seed: bytes = b"default_seed", min_size: int = DEFAULT_MIN_CHUNK,
+                 avg_size: int = DEFAULT_AVG_CHUNK, max_size: int = DEFAULT_MAX_CHUNK):
+        if isinstance(seed, str):
+            seed = seed.encode('utf-8')
+        self.store_dir = store_dir
+        self.chunk_sizes = (min_size, avg_size, max_size)
+        self.encryptor = GhostEncryptorV26G(seed)
+        # Chave separada para as impressões digitais (não reutiliza a chave do MAC das mensagens)
+        self._fingerprint_key = digest_key(seed, b"ghost-dedup-v2")
+
+        os.makedirs(os.path.join(store_dir, "chunks"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(store_dir, "index.sqlite"))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " fingerprint TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " stored_size INTEGER NOT NULL,"
+            " refs INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.commit()
+
+    def fingerprint(self, chunk: bytes) -> str:
+        """Impressão digital com chave de um chunk (hex do BLAKE2b-256 com chave + tamanho)."""
+        return f"{keyed_digest(self._fingerprint_key, chunk).hex()}-{len(chunk):x}"
+
+    def _chunk_path(self, fingerprint: str) -> str:
+        return os.path.join(self.store_dir, "chunks", fingerprint[:2], fingerprint + ".g")
+
+    def has_chunk(self, fingerprint: str) -> bool:
+        row = self._db.execute("SELECT 1 FROM chunks WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        return row is not None
+
+    def _store_chunk(self, fingerprint: str, chunk: bytes) -> int:
+        sealed = self.encryptor.encryptByte(chunk)
+        path = self._chunk_path(fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(sealed)
+        os.replace(tmp_path, path)  # o índice só aponta para chunks gravados por completo
+        self._db.execute("INSERT INTO chunks (fingerprint, size, stored_size, refs) VALUES (?, ?, ?, 0)",
+                         (fingerprint, len(chunk), len(sealed)))
+        return len(sealed)
+
+    def _load_chunk(self, fingerprint: str, size: int) -> bytes:
+        with open(self._chunk_path(fingerprint), 'rb') as f:
+            chunk = self.encryptor.decryptByte(f.read())
+        if len(chunk) != size or self.fingerprint(chunk) != fingerprint:
+            raise ValueError(f"Chunk corrompido ou trocado: {fingerprint}")
+        return chunk
+
+    # ------------------------------------------------------------------ #
+    # Backup e restauração
+    # ------------------------------------------------------------------ #
+    def backup_stream(self, source) -> tuple:
+        """
+        Armazena os chunks novos de `source` e retorna (manifesto cifrado, estatísticas).
+        As estatísticas incluem o total de chunks, quantos eram novos e os bytes gravados.
+        """
+        stats = {"chunks": 0, "new_chunks": 0, "bytes_in": 0, "bytes_new": 0, "bytes_written": 0}
+        entries = []
+        try:
+            for chunk in iter_chunks(source, *self.chunk_sizes):
+                fingerprint = self.fingerprint(chunk)
+                if not self.has_chunk(fingerprint):
+                    stats["bytes_written"] += self._store_chunk(fingerprint, chunk)
+                    stats["new_chunks"] += 1
+                    stats["bytes_new"] += len(chunk)
+                self._db.execute("UPDATE chunks SET refs = refs + 1 WHERE fingerprint = ?", (fingerprint,))
+                entries.append([fingerprint, len(chunk)])
+                stats["chunks"] += 1
+                stats["bytes_in"] += len(chunk)
+            self._db.commit()
+        except BaseException:
+            self._db.rollback()
+            raise
+
+        manifest = {"version": MANIFEST_VERSION, "size": stats["bytes_in"], "chunks": entries}
+        sealed_manifest = self.encryptor.encryptByte(json.dumps(manifest).encode('utf-8'))
+        stats["bytes_written"] += len(sealed_manifest)
+        return sealed_manifest, stats
+
+    def read_manifest(self, sealed_manifest: bytes) -> dict:
+        manifest = json.loads(self.encryptor.decryptByte(sealed_manifest).decode('utf-8'))
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Versão de manifesto não suportada: {manifest.get('version')}")
+        return manifest
+
+    def restore_stream(self, sealed_manifest: bytes, output) -> int:
+        """Reconstrói o conteúdo descrito pelo manifesto em `output`; retorna os bytes gravados."""
+        manifest = self.read_manifest(sealed_manifest)
+        written = 0
+        for fingerprint, size in manifest["chunks"]:
+            chunk = self._load_chunk(fingerprint, size)
+            output.write(chunk)
+            written += len(chunk)
+        if written != manifest["size"]:
+            raise ValueError("Tamanho restaurado difere do manifesto.")
+        return written
+
+    def backup_file(self, input_path: str, manifest_path: str) -> dict:
+        with open(input_path, 'rb') as src:
+            sealed_manifest, stats = self.backup_stream(src)
+        with open(manifest_path, 'wb') as f:
+            f.write(sealed_manifest)
+        print(f"[🔐] Backup de '{input_path}': {stats['new_chunks']}/{stats['chunks']} chunks novos, "
+              f"{stats['bytes_written']} bytes gravados.")
+        return stats
+
+    def restore_file(self, manifest_path: str, output_path: str) -> int:
+        with open(manifest_path, 'rb') as f:
+            sealed_manifest = f.read()
+        with open(output_path, 'wb') as dst:
+            written = self.restore_stream(sealed_manifest, dst)
+        print(f"[🔓] Backup restaurado em '{output_path}' ({written} bytes).")
+        return written
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
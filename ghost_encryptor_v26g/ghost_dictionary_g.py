@@ -0,0 +1,120 @@
+# ghost_dictionary_g.py
+
+import threading
+import zlib
+from collections import Counter
+
+from .compressor_zlib import DEFAULT_MAX_OUTPUT, bounded_decompress
+
+# Dicionários zlib pré-definidos (zdict) para mensagens pequenas e repetitivas.
+# Sem histórico, o zlib não encontra repetições em mensagens de poucos KB; com um dicionário
+# treinado a partir de um corpus de exemplo, os trechos comuns viram referências curtas.
+# O ID do dicionário é gravado no cabeçalho comprimido e resolvido no registro ao descomprimir.
+DEFAULT_DICT_SIZE = 16 * 1024
+DEFAULT_SEGMENT_SIZE = 64
+DEFAULT_KMER = 8
+
+
+def build_dictionary(samples, size: int = DEFAULT_DICT_SIZE,
+                     segment_size: int = DEFAULT_SEGMENT_SIZE, k: int = DEFAULT_KMER) -> bytes:
+    """
+    Treina um dicionário a partir de amostras.
+    Seleciona os segmentos que cobrem os k-mers presentes em mais amostras; os mais valiosos
+    ficam no final, onde o zlib os alcança com as menores distâncias.
+    """
+    samples = [bytes(s) for s in samples if s]
+    if not samples:
+        raise ValueError("É preciso ao menos uma amostra para treinar o dicionário.")
+
+    # Frequência de documento de cada k-mer (em quantas amostras ele aparece)
+    df = Counter()
+    for sample in samples:
+        df.update({sample[i:i + k] for i in range(len(sample) - k + 1)})
+
+    def kmers(segment):
+        return {segment[i:i + k] for i in range(len(segment) - k + 1)}
+
+    candidates = []
+    seen = set()
+    for sample in samples:
+        for start in range(0, len(sample), segment_size):
+            segment = sample[start:start + segment_size]
+            if segment in seen:
+                continue
+            seen.add(segment)
+            score = sum(df[m] for m in kmers(segment) if df[m] > 1)
+            if score:
+                candidates.append((score, segment))
+    candidates.sort(key=lambda item: item[0], reverse=True)
+
+    selected = []
+    covered = set()
+    total = 0
+    for _, segment in candidates:
+        fresh = kmers(segment) - covered
+        if not any(df[m] > 1 for m in fresh):
+            continue
+        selected.append(segment)
+        covered |= fresh
+        total += len(segment)
+        if total >= size:
+            break
+
+    if not selected:  # amostras sem nada em comum: usa o final do corpus
+        selected = [b''.join(samples)[-size:]]
+    return b''.join(reversed(selected))[-size:]
+
+
+def dictionary_id(zdict: bytes) -> int:
+    """ID padrão de um dicionário: Adler-32 (o mesmo DICTID que o zlib usa internamente)."""
+    return zlib.adler32(zdict) & 0xFFFFFFFF
+
+
+# Class GhostDictionaryRegistryG
+# Registro de dicionários por ID (32 bits). Os compressores consultam o registro padrão
+# (DEFAULT_REGISTRY) a menos que outro seja informado.
+class GhostDictionaryRegistryG:
+    def __init__(self):
+        self._dictionaries = {}
+        self._lock = threading.Lock()
+
+    def register(self, zdict: bytes, dict_id: int = None) -> int:
+        """Registra um dicionário e retorna seu ID."""
+        if not zdict:
+            raise ValueError("Dicionário vazio.")
+        if dict_id is None:
+            dict_id = dictionary_id(zdict)
+        if not 0 <= dict_id <= 0xFFFFFFFF:
+            raise ValueError("O ID do dicionário deve caber em 32 bits.")
+        with self._lock:
+            existing = self._dictionaries.get(dict_id)
+            if existing is not None and existing != zdict:
+                raise ValueError(f"ID de dicionário já registrado com outro conteúdo: {dict_id}")
+            self._dictionaries[dict_id] = bytes(zdict)
+        return dict_id
+
+    def get(self, dict_id: int) -> bytes:
+        try:
+            return self._dictionaries[dict_id]
+        except KeyError:
+            raise ValueError(f"Dicionário desconhecido: {dict_id}") from None
+
+    def __contains__(self, dict_id: int) -> bool:
+        return dict_id in self._dictionaries
+
+
+DEFAULT_REGISTRY = GhostDictionaryRegistryG()
+
+
+def register_dictionary(zdict: bytes, dict_id: int = None) -> int:
+    """Registra um dicionário no registro padrão."""
+    return DEFAULT_REGISTRY.register(zdict, dict_id)
+
+
+def compress_with_dictionary(data: bytes, zdict: bytes, level: int = -1) -> bytes:
+    compressor = zlib.compressobj(level, zdict=zdict)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress_with_dictionary(data: bytes, zdict: bytes, max_output: int = DEFAULT_MAX_OUTPUT) -> bytes:
+    return bounded_decompress(data, zdict, max_output=max_output)
@@ -0,0 +1,199 @@
+# ghost_file_engine_g.py
+
+import itertools
+import os
+import queue
+import threading
+import time
+
+from .ghost_seekable_g import _INDEX_ENTRY, FINGERPRINT_SALT_SIZE, GhostSeekableG, _read_full
+
+# Motor de arquivos em pipeline (double buffering).
+#
+#   thread leitora  -> fila limitada -> cômputo (compressão, operador G, GCBC, MAC-G) -> fila limitada -> thread gravadora
+#
+# Enquanto o bloco atual é processado, a thread leitora já busca os próximos e a gravadora
+# descarrega os anteriores; como a E/S libera o GIL, o tempo total tende a max(E/S, CPU)
+# em vez da soma. A profundidade das filas limita a memória a ~2 * queue_depth blocos.
+# A saída é um contêiner indexado (ghost_seekable_g), legível também por acesso aleatório.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_QUEUE_DEPTH = 4
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    # put bloqueante que desiste se outra etapa falhar (evita deadlock com fila cheia)
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def run_pipeline(read_next, process, write, queue_depth: int = DEFAULT_QUEUE_DEPTH) -> dict:
+    """
+    Executa leitura, processamento e gravação sobrepostos.
+    `read_next()` devolve o próximo item (ou None no fim), `process(item)` roda na thread
+    chamadora e `write(resultado)` roda na thread gravadora, na mesma ordem da leitura.
+    Retorna os tempos gastos em cada etapa e o tempo total (segundos).
+    """
+    if queue_depth < 1:
+        raise ValueError("A profundidade da fila deve ser ao menos 1.")
+
+    inbound = queue.Queue(maxsize=queue_depth)
+    outbound = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+    errors = []
+    stats = {"read_seconds": 0.0, "compute_seconds": 0.0, "write_seconds": 0.0, "items": 0}
+
+    def reader():
+        try:
+            while True:
+                start = time.perf_counter()
+                item = read_next()
+                stats["read_seconds"] += time.perf_counter() - start
+                if item is None:
+                    _put(inbound, _END, stop)
+                    return
+                if not _put(inbound, item, stop):
+                    return
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def writer():
+        try:
+            while True:
+                result = _get(outbound, stop)
+                if result is _END:
+                    return
+                start = time.perf_counter()
+                write(result)
+                stats["write_seconds"] += time.perf_counter() - start
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=reader, name="ghost-reader", daemon=True),
+               threading.Thread(target=writer, name="ghost-writer", daemon=True)]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+
+    try:
+        while True:
+            item = _get(inbound, stop)
+            if item is _END:
+                _put(outbound, _END, stop)
+                break
+            start = time.perf_counter()
+            result = process(item)
+            stats["compute_seconds"] += time.perf_counter() - start
+            stats["items"] += 1
+            if not _put(outbound, result, stop):
+                break
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        for t in threads:
+            t.join()
+
+    if errors:
+        raise errors[0]
+    stats["wall_seconds"] = time.perf_counter() - wall_start
+    return stats
+
+
+# Class GhostFileEngineG
+# Criptografa e descriptografa arquivos grandes em pipeline, bloco a bloco.
+class GhostFileEngineG:
+    def __init__(self, seed: bytes = b"default_seed", chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 queue_depth: int = DEFAULT_QUEUE_DEPTH):
+        if queue_depth < 1:
+            raise ValueError("A profundidade da fila deve ser ao menos 1.")
+        self.seekable = GhostSeekableG(seed, block_size=chunk_size)
+        self.chunk_size = chunk_size
+        self.queue_depth = queue_depth
+        self.last_stats = None
+
+    def encrypt_stream(self, source, output) -> dict:
+        """Lê `source` e grava o contêiner cifrado em `output`, sobrepondo E/S e cômputo."""
+        seekable = self.seekable
+        header = seekable._container_header()
+        output.write(header)
+        salt = os.urandom(FINGERPRINT_SALT_SIZE)
+        state = {"offset": len(header), "count": 0, "total": 0, "index": bytearray()}
+        counter = itertools.count()
+
+        def read_next():
+            chunk = _read_full(source, self.chunk_size)
+            return (next(counter), chunk) if chunk else None
+
+        def process(item):
+            idx, chunk = item
+            return len(chunk), seekable.fingerprint(idx, chunk, salt), seekable.seal_block(idx, chunk)
+
+        def write(result):
+            plain_len, fingerprint, sealed = result
+            output.write(sealed)
+            state["index"] += _INDEX_ENTRY.pack(state["offset"], len(sealed), plain_len, fingerprint)
+            state["offset"] += len(sealed)
+            state["total"] += plain_len
+            state["count"] += 1
+
+        stats = run_pipeline(read_next, process, write, self.queue_depth)
+        seekable._finish_container(output, header, state["index"], salt, state["offset"],
+                                   state["count"], state["total"])
+        self.last_stats = stats
+        return stats
+
+    def decrypt_stream(self, source, output) -> dict:
+        """Verifica e decifra um contêiner (bytes, caminho ou arquivo) gravando em `output`."""
+        with self.seekable.open(source) as reader:
+            entries = iter(enumerate(reader.entries))
+
+            def read_next():
+                item = next(entries, None)
+                if item is None:
+                    return None
+                idx, (offset, sealed_len, plain_len) = item
+                return idx, plain_len, reader._read_at(offset, sealed_len)
+
+            def process(item):
+                idx, plain_len, sealed = item
+                plaintext = self.seekable.open_block(idx, sealed)
+                if len(plaintext) != plain_len:
+                    raise ValueError(f"Tamanho inesperado no bloco {idx}.")
+                return plaintext
+
+            stats = run_pipeline(read_next, process, output.write, self.queue_depth)
+        self.last_stats = stats
+        return stats
+
+    def encrypt_file(self, input_path: str, output_path: str) -> dict:
+        with open(input_path, 'rb') as src, open(output_path, 'wb') as dst:
+            stats = self.encrypt_stream(src, dst)
+        print(f"[🔐] Arquivo '{input_path}' criptografado em {stats['items']} blocos "
+              f"({stats['wall_seconds']:.2f}s) como '{output_path}'.")
+        return stats
+
+    def decrypt_file(self, input_path: str, output_path: str) -> dict:
+        with open(input_path, 'rb') as src, open(output_path, 'wb') as dst:
+            stats = self.decrypt_stream(src, dst)
+        print(f"[🔓] Arquivo '{input_path}' descriptografado ({stats['wall_seconds']:.2f}s) "
+              f"e salvo como '{output_path}'.")
+        return stats
@@ -0,0 +1,88 @@
+# ghost_header_g.py
+
+import struct
+
+# Cabeçalho versionado e autodescritivo do GhostEncryptor V26G.
+#
+#   MAGIC (3) + versão (1) + codec (1) + rodadas (1) + modo do MAC (1) + log2 do bloco do MAC (1)
+#
+# O cabeçalho registra os parâmetros de ajuste escolhidos na criptografia (por exemplo, as
+# rodadas sugeridas pelo GhostSecurityAutotuner), e o decifrador faz exatamente o trabalho
+# descrito nele. Ciphertexts sem cabeçalho continuam sendo aceitos no formato legado.
+#
+# As rodadas precisam ser ímpares: o GCBC e a transformação aplicam o mesmo XOR a cada rodada,
+# então um número par (ou zero) de rodadas se cancela e devolve o texto original.
+#
+# Ambiguidade com o formato legado: um ciphertext legado começa pela pubkey, que pode começar
+# com o MAGIC (chance de 1 em 2^24). Por isso os decifradores, quando a leitura com cabeçalho
+# falha (cabeçalho inválido ou MAC-G que não confere), conferem o quadro também como legado.
+MAGIC = b'\x00GH'
+VERSION = 1
+
+CODEC_ZLIB = 0        # compressor_zlib.GhostCompressor
+CODEC_SYMBOLIC = 1    # ghost_compressor_g_symbolic.GhostCompressorG
+CODEC_ADAPTIVE = 2    # ghost_compressor_g_adaptive.GhostCompressorGAdaptive
+
+MAC_MODES = {"linear": 0, "tree": 1}
+_MAC_MODE_NAMES = {v: k for k, v in MAC_MODES.items()}
+
+LEGACY_ROUNDS = 9     # rodadas fixas usadas antes do cabeçalho existir
+
+_HEADER = struct.Struct('>3sBBBBB')
+HEADER_SIZE = _HEADER.size
+
+
+def validate_rounds(rounds: int) -> int:
+    """Retorna `rounds` se for um número de rodadas válido (ímpar, de 1 a 255)."""
+    if not isinstance(rounds, int) or not 0 < rounds <= 255 or rounds % 2 == 0:
+        raise ValueError(f"Número de rodadas inválido: {rounds!r} (deve ser ímpar, de 1 a 255; "
+                         "rodadas pares se cancelam).")
+    return rounds
+
+
+# Class GhostHeaderG
+# Representa o cabeçalho versionado com os parâmetros de uma mensagem.
+class GhostHeaderG:
+    __slots__ = ("codec", "rounds", "mac_mode", "mac_block_size", "version")
+
+    def __init__(self, codec: int, rounds: int, mac_mode: str = "linear",
+                 mac_block_size: int = 0, version: int = VERSION):
+        validate_rounds(rounds)
+        if mac_mode not in MAC_MODES:
+            raise ValueError(f"Modo de MAC-G desconhecido: {mac_mode}")
+        if mac_block_size and mac_block_size & (mac_block_size - 1):
+            raise ValueError("O bloco do MAC-G em árvore deve ser potência de 2.")
+        self.codec = codec
+        self.rounds = rounds
+        self.mac_mode = mac_mode
+        self.mac_block_size = mac_block_size if mac_mode == "tree" else 0
+        self.version = version
+
+    def pack(self) -> bytes:
+        block_log2 = self.mac_block_size.bit_length() - 1 if self.mac_block_size else 0
+        return _HEADER.pack(MAGIC, self.version, self.codec, self.rounds,
+                            MAC_MODES[self.mac_mode], block_log2)
+
+    @staticmethod
+    def has_header(data: bytes) -> bool:
+        return len(data) >= HEADER_SIZE and data[:len(MAGIC)] == MAGIC
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "GhostHeaderG":
+        """Lê o cabeçalho do início de `data` (use has_header antes para o formato legado)."""
+        if not cls.has_header(data):
+            raise ValueError("Cabeçalho Ghost ausente ou truncado.")
+        _, version, codec, rounds, mac_mode, block_log2 = _HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"Versão de cabeçalho não suportada: {version}")
+        if mac_mode not in _MAC_MODE_NAMES:
+            raise ValueError(f"Modo de MAC-G desconhecido no cabeçalho: {mac_mode}")
+        mode = _MAC_MODE_NAMES[mac_mode]
+        return cls(codec, rounds, mode, (1 << block_log2) if mode == "tree" else 0, version)
+
+    def __eq__(self, other):
+        return isinstance(other, GhostHeaderG) and self.pack() == other.pack()
+
+    def __repr__(self):
+        return (f"GhostHeaderG(codec={self.codec}, rounds={self.rounds}, "
+                f"mac_mode={self.mac_mode!r}, mac_block_size={self.mac_block_size})")
@@ -0,0 +1,260 @@
+# ghost_log_g.py
+
+import os
+import struct
+import time
+
+from .GhostEncryptorV26G_Final import GhostEncryptorV26G
+from .ghost_compact_g import GhostCompactFramerG, decode_varint, encode_varint, fold_tag
+
+# Log cifrado somente de acréscimo (append-only).
+#
+#   cabeçalho : MAGIC (3) + versão (1) + pubkey (32)
+#   entradas  : tipo (1) + tamanho (varint) + corpo
+#       b'R' registro   -> quadro compacto (ghost_compact_g) com número de sequência
+#       b'B' lote       -> idem, com vários registros (varint tamanho + registro) no texto
+#       b'C' checkpoint -> próxima sequência (varint) + cadeia (16) + tag (16)
+#
+# Cada registro é cifrado e autenticado sozinho com o material de sessão em cache, então
+# um acréscimo custa o tamanho do registro, não o do log. Uma cadeia com chave acumula as
+# tags dos registros (cadeia = MAC-G(cadeia anterior + tag)) e os checkpoints periódicos a
+# selam: remoções, trocas ou reordenações antes de um checkpoint são detectadas na leitura.
+# Registros depois do último checkpoint são autenticados individualmente, e a sequência
+# contínua impede que um registro do meio seja removido sem ser notado.
+MAGIC = b'\x00GL'
+VERSION = 1
+RECORD = b'R'
+BATCH = b'B'
+CHECKPOINT = b'C'
+DEFAULT_CHECKPOINT_INTERVAL = 64
+TAG_LENGTH = 16
+
+_HEADER = struct.Struct('>3sB32s')
+
+
+def _chain_step(encryptor: GhostEncryptorV26G, chain: bytes, tag: bytes) -> bytes:
+    return fold_tag(encryptor.mac._ghash_v6(chain + tag), TAG_LENGTH)
+
+
+def _checkpoint_tag(encryptor: GhostEncryptorV26G, sequence: int, chain: bytes) -> bytes:
+    return fold_tag(encryptor.mac._ghash_v6(CHECKPOINT + encode_varint(sequence) + chain), TAG_LENGTH)
+
+
+def _pack_batch(records: list) -> bytes:
+    return b''.join(encode_varint(len(r)) + r for r in records)
+
+
+def _unpack_batch(data: bytes) -> list:
+    records = []
+    offset = 0
+    while offset < len(data):
+        length, offset = decode_varint(data, offset)
+        if offset + length > len(data):
+            raise ValueError("Lote de registros truncado.")
+        records.append(data[offset:offset + length])
+        offset += length
+    return records
+
+
+# Class GhostLogWriterG
+# Acrescenta registros cifrados a um arquivo de log; ao reabrir um log existente, retoma
+# a sequência e a cadeia a partir do conteúdo verificado.
+class GhostLogWriterG:
+    def __init__(self, path: str, seed: bytes = b"default_seed",
+                 checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL, autoflush: bool = True,
+                 sync: bool = False):
+        # autoflush: entrega cada registro ao sistema operacional (visível para leitores em tail);
+        # sync: além disso, força fsync a cada flush
+        self.path = path
+        self.encryptor = GhostEncryptorV26G(seed)
+        self.framer = GhostCompactFramerG(self.encryptor, tag_length=TAG_LENGTH)
+        self.checkpoint_interval = checkpoint_interval
+        self.autoflush = autoflush
+        self.sync = sync
+
+        self.sequence = 0
+        self.chain = bytes(TAG_LENGTH)
+        self._since_checkpoint = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with GhostLogReaderG(path, seed) as reader:
+                reader.poll()
+                if reader.pending_bytes:
+                    raise ValueError("Log com entrada final incompleta; não é seguro acrescentar.")
+                self.sequence, self.chain = reader.sequence, reader.chain
+                self._since_checkpoint = reader.sequence - reader.verified_through
+            self._fh = open(path, 'ab')
+        else:
+            self._fh = open(path, 'ab')
+            self._fh.write(_HEADER.pack(MAGIC, VERSION, self.framer.pubkey))
+
+    def _write_entry(self, kind: bytes, body: bytes) -> None:
+        self._fh.write(kind + encode_varint(len(body)) + body)
+
+    def _append_frame(self, kind: bytes, plaintext: bytes) -> int:
+        sequence = self.sequence
+        frame = self.framer.seal(plaintext, sequence=sequence)
+        self._write_entry(kind, frame)
+        self.chain = _chain_step(self.encryptor, self.chain, self.framer.parse(frame)["tag"])
+        self.sequence += 1
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+        elif self.autoflush:
+            self.flush()
+        return sequence
+
+    def append(self, record: bytes) -> int:
+        """Acrescenta um registro; retorna seu número de sequência."""
+        if isinstance(record, str):
+            record = record.encode('utf-8')
+        return self._append_frame(RECORD, record)
+
+    def append_batch(self, records: list) -> int:
+        """Acrescenta vários registros pequenos em um único quadro (uma tag para o lote)."""
+        records = [r.encode('utf-8') if isinstance(r, str) else bytes(r) for r in records]
+        return self._append_frame(BATCH, _pack_batch(records))
+
+    def checkpoint(self) -> None:
+        """Grava um checkpoint selando a cadeia de todos os registros anteriores."""
+        body = encode_varint(self.sequence) + self.chain + _checkpoint_tag(self.encryptor, self.sequence, self.chain)
+        self._write_entry(CHECKPOINT, body)
+        self._since_checkpoint = 0
+        self.flush()
+
+    def flush(self) -> None:
+        self._fh.flush()
+        if self.sync:
+            os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        if self._since_checkpoint:
+            self.checkpoint()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Class GhostLogReaderG
+# Lê o log de forma incremental: poll() devolve os registros completos que apareceram desde
+# a última chamada (uma entrada final ainda sendo gravada fica pendente) e follow() acompanha
+# o arquivo como um `tail -f`.
+class GhostLogReaderG:
+    def __init__(self, path: str, seed: bytes = b"default_seed"):
+        self.encryptor = GhostEncryptorV26G(seed)
+        self.framer = GhostCompactFramerG(self.encryptor, tag_length=TAG_LENGTH)
+        self._fh = open(path, 'rb')
+        self._buffer = bytearray()
+        self._header_checked = False
+
+        self.sequence = 0                # próxima sequência esperada
+        self.chain = bytes(TAG_LENGTH)
+        self.verified_through = 0        # registros [0, verified_through) selados por checkpoint
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self._buffer)
+
+    def _check_header(self) -> bool:
+        if len(self._buffer) < _HEADER.size:
+            return False
+        magic, version, pubkey = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError("Flag de log cifrado inválida.")
+        if version != VERSION:
+            raise ValueError(f"Versão de log cifrado não suportada: {version}")
+        if pubkey != self.framer.pubkey:
+            raise ValueError("Chave pública do log não corresponde a esta seed.")
+        del self._buffer[:_HEADER.size]
+        self._header_checked = True
+        return True
+
+    def _next_entry(self):
+        # Retorna (tipo, corpo, tamanho) da próxima entrada completa, ou None se ainda estiver
+        # incompleta. A entrada só sai do buffer depois de verificada (ver poll).
+        if len(self._buffer) < 2:
+            return None
+        try:
+            length, offset = decode_varint(self._buffer, 1)
+        except ValueError:
+            return None  # varint ainda incompleto
+        if offset + length > len(self._buffer):
+            return None
+        return bytes(self._buffer[:1]), bytes(self._buffer[offset:offset + length]), offset + length
+
+    def _open_frame(self, body: bytes) -> tuple:
+        # Retorna (texto, cadeia seguinte) sem alterar o estado do leitor
+        fields = self.framer.parse(body)
+        if fields["end"] != len(body) or fields["sequence"] != self.sequence:
+            raise ValueError(f"Sequência inesperada no log: {fields['sequence']} (esperada {self.sequence}).")
+        plaintext = self.framer._open_fields(fields)
+        return plaintext, _chain_step(self.encryptor, self.chain, fields["tag"])
+
+    def _check_checkpoint(self, body: bytes) -> None:
+        sequence, offset = decode_varint(body)
+        chain, tag = body[offset:offset + TAG_LENGTH], body[offset + TAG_LENGTH:]
+        expected = _checkpoint_tag(self.encryptor, sequence, chain)
+        if not self.encryptor.mac._constant_time_compare(expected, tag):
+            raise ValueError("MAC-G do checkpoint falhou! Log comprometido.")
+        if sequence != self.sequence or not self.encryptor.mac._constant_time_compare(chain, self.chain):
+            raise ValueError("Cadeia do log não confere com o checkpoint! Registros removidos ou alterados.")
+        self.verified_through = sequence
+
+    def poll(self) -> list:
+        """
+        Lê o que foi acrescentado ao arquivo e retorna os novos registros verificados.
+        Se uma entrada falhar, os registros verificados antes dela são retornados e a entrada
+        continua no buffer, sem alterar sequência nem cadeia: o erro é levantado na próxima
+        chamada (ou já nesta, se nenhum registro a precedeu).
+        """
+        self._buffer += self._fh.read()
+        if not self._header_checked and not self._check_header():
+            return []
+        records = []
+        while True:
+            entry = self._next_entry()
+            if entry is None:
+                return records
+            kind, body, size = entry
+            try:
+                if kind in (RECORD, BATCH):
+                    plaintext, chain = self._open_frame(body)
+                    new_records = [plaintext] if kind == RECORD else _unpack_batch(plaintext)
+                    self.chain = chain
+                    self.sequence += 1
+                    records.extend(new_records)
+                elif kind == CHECKPOINT:
+                    self._check_checkpoint(body)
+                else:
+                    raise ValueError(f"Tipo de entrada desconhecido no log: {kind!r}")
+            except ValueError:
+                if records:
+                    return records
+                raise
+            del self._buffer[:size]
+
+    def records(self):
+        """Gera todos os registros já presentes no arquivo."""
+        yield from self.poll()
+
+    def follow(self, poll_interval: float = 0.5, stop=None):
+        """Gera registros conforme são acrescentados, até `stop` (threading.Event) ser acionado."""
+        while stop is None or not stop.is_set():
+            batch = self.poll()
+            yield from batch
+            if not batch:
+                time.sleep(poll_interval)
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,5 +1,54 @@
 # ghost_mac_g.py
+import hashlib
 import hmac
+import os
+import struct
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
+# Parâmetros do modo árvore (Merkle) do MAC-G
+TREE_BLOCK_SIZE = 64 * 1024          # tamanho das folhas
+TREE_PARALLEL_THRESHOLD = 1024 * 1024  # abaixo disso as folhas são calculadas em um único processo
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+
+# Pools de processos das folhas, criados sob demanda (um por nº de workers) e reaproveitados
+# entre chamadas e instâncias: iniciar processos custa mais que um MAC de poucos MiB.
+# shutdown_pools() os encerra explicitamente (também são encerrados na saída do interpretador).
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def shutdown_pools() -> None:
+    """Encerra os pools de processos do MAC-G em árvore (recriados na próxima chamada paralela)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+# Resumos com chave em velocidade de C (BLAKE2b da biblioteca padrão), para identificar e
+# comparar conteúdo (impressões digitais de chunks e blocos, nomes e verificadores de cache).
+# O GHash V6 continua sendo o MAC das mensagens, mas não resiste a colisões (cada byte de
+# entrada toca uma única posição do tag), então não serve como identidade de conteúdo.
+def digest_key(seed: bytes, context: bytes) -> bytes:
+    """Chave de 64 bytes derivada da seed inteira para um contexto (domínio) específico."""
+    return hashlib.blake2b(bytes(seed), digest_size=64, key=context[:64]).digest()
+
+
+def keyed_digest(key: bytes, data, size: int = 32) -> bytes:
+    """BLAKE2b com chave sobre `data` (bytes, bytearray ou memoryview)."""
+    return hashlib.blake2b(data, key=key, digest_size=size).digest()
+
 
 # Class GhostMACG
 # Esta classe implementa um sistema de MAC (Código de Autenticação de Mensagem) avançado.
@@ -15,10 +64,23 @@ import hmac
 # GhostMACG é uma implementação avançada de MAC (Código de Autenticação de Mensagem) para garantir a integridade e autenticidade dos dados.
 # A classe utiliza uma combinação de funções hash, entropia dinâmica e compressão simbólica.
 # O objetivo é garantir a integridade e autenticidade dos dados.
+# Thread-safety: o GHash usa apenas variáveis locais; instâncias podem ser compartilhadas entre threads.
 
 class GhostMACG:
-    def __init__(self, seed: bytes):
+    def __init__(self, seed: bytes, mode: str = "linear", block_size: int = TREE_BLOCK_SIZE, workers: int = None):
+        """
+        mode="linear": uma única cadeia GHash V6 sobre todos os dados (padrão).
+        mode="tree": GHash V6 por bloco de `block_size` bytes, combinados em árvore até a raiz.
+        workers: nº de processos para as folhas (None = automático, 1 = sequencial).
+        """
+        if mode not in ("linear", "tree"):
+            raise ValueError(f"Modo de MAC-G desconhecido: {mode}")
+        if block_size <= 0:
+            raise ValueError("O tamanho do bloco deve ser positivo.")
         self.seed = seed
+        self.mode = mode
+        self.block_size = block_size
+        self.workers = workers
     
     def _rotate_left(self, val, r_bits, max_bits=8):
         return ((val << r_bits) & (2**max_bits - 1)) | (val >> (max_bits - r_bits))
@@ -28,24 +90,97 @@ class GhostMACG:
         Versão avançada: usa rotação, entropia dinâmica G, compressão simbólica e operador θ.
         """
         mac = bytearray(64)
-        entropy = sum(self.seed) % 256
-        theta = len(data) ^ len(self.seed)
-
-        for i, b in enumerate(data):
-            idx = (i + theta) % 64
-            g_val = self.seed[i % len(self.seed)] ^ entropy ^ ((i * 17) % 251)
-            rotated = self._rotate_left(b ^ g_val, (i + entropy) % 8)
-            mac[idx] = (mac[idx] + rotated + g_val + theta) % 256
-
-            # Evolução da entropia com feedback dinâmico (modo G)
-            entropy = (entropy + rotated + mac[idx] + i) % 256
-            theta = (theta ^ rotated ^ entropy) % 256
-
+        _ghash_v6_update(self.seed, mac, sum(self.seed) % 256, len(data) ^ len(self.seed), data, 0)
         return bytes(mac)
 
     def generate_mac(self, data: bytes) -> bytes:
+        if self.mode == "tree":
+            return self.tree_root(self.tree_leaves(data))
         return self._ghash_v6(data)
 
+    # ------------------------------------------------------------------ #
+    # Modo árvore (Merkle)
+    # ------------------------------------------------------------------ #
+    def leaf_tag(self, index: int, block: bytes) -> bytes:
+        """Tag de uma folha: GHash V6 sobre prefixo de folha + índice + bloco."""
+        return self._ghash_v6(_LEAF_PREFIX + struct.pack('>Q', index) + bytes(block))
+
+    def _node_tag(self, left: bytes, right: bytes) -> bytes:
+        return self._ghash_v6(_NODE_PREFIX + left + right)
+
+    def _split_blocks(self, data: bytes) -> list:
+        view = memoryview(data)
+        blocks = [view[i:i + self.block_size] for i in range(0, len(data), self.block_size)]
+        return blocks or [view[0:0]]
+
+    def _resolve_workers(self, data_len: int, block_count: int) -> int:
+        if self.workers is not None:
+            return max(1, min(self.workers, block_count))
+        if data_len < TREE_PARALLEL_THRESHOLD or block_count < 2:
+            return 1
+        return max(1, min(os.cpu_count() or 1, block_count))
+
+    def tree_leaves(self, data: bytes) -> list:
+        """Calcula as tags de todas as folhas, em paralelo quando compensa."""
+        blocks = self._split_blocks(data)
+        workers = self._resolve_workers(len(data), len(blocks))
+        if workers == 1:
+            return [self.leaf_tag(i, block) for i, block in enumerate(blocks)]
+
+        pool = _get_pool(workers)
+        try:
+            return list(pool.map(
+                _leaf_tag_worker,
+                [self.seed] * len(blocks),
+                range(len(blocks)),
+                [bytes(block) for block in blocks],
+            ))
+        except BrokenExecutor:
+            # Um processo morreu: descarta o pool para que a próxima chamada crie outro
+            with _pools_lock:
+                if _pools.get(workers) is pool:
+                    del _pools[workers]
+            raise
+
+    def tree_root(self, leaves: list) -> bytes:
+        """Combina as tags das folhas, par a par, até a raiz."""
+        level = list(leaves)
+        if not level:
+            raise ValueError("A árvore do MAC-G precisa de ao menos uma folha.")
+        while len(level) > 1:
+            nxt = [self._node_tag(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                nxt.append(level[-1])  # nó ímpar sobe sem alteração
+            level = nxt
+        return level[0]
+
+    def generate_tree(self, data: bytes) -> tuple:
+        """Retorna (raiz, folhas) para armazenamento junto ao ciphertext."""
+        leaves = self.tree_leaves(data)
+        return self.tree_root(leaves), leaves
+
+    def locate_corrupted_blocks(self, data: bytes, leaves: list) -> list:
+        """Compara as folhas armazenadas com os dados e retorna os índices dos blocos corrompidos."""
+        current = self.tree_leaves(data)
+        corrupted = [
+            i for i, (a, b) in enumerate(zip(current, leaves))
+            if not self._constant_time_compare(a, b)
+        ]
+        # Blocos a mais ou a menos também contam como corrompidos
+        corrupted.extend(range(min(len(current), len(leaves)), max(len(current), len(leaves))))
+        return corrupted
+
+    def verify_block(self, index: int, block: bytes, leaves: list, root: bytes = None) -> bool:
+        """
+        Verifica um único bloco contra sua folha, sem recalcular o arquivo inteiro.
+        Se `root` for informado, as folhas armazenadas também são conferidas contra a raiz.
+        """
+        if not 0 <= index < len(leaves):
+            return False
+        if root is not None and not self._constant_time_compare(self.tree_root(leaves), root):
+            return False
+        return self._constant_time_compare(self.leaf_tag(index, block), leaves[index])
+
     # Função externa para uso simplificado
     @staticmethod
     def generate(transformed: bytes, shared_secret: bytes) -> bytes:
@@ -64,12 +199,13 @@ class GhostMACG:
         return mac_engine.verify_mac(transformed, received_mac)
 
 
-    def verify_mac(self, data: bytes, mac: bytes) -> bool:
+    def verify_mac(self, data: bytes, mac: bytes, quiet: bool = False) -> bool:
         expected_mac = self.generate_mac(data)
         result = self._constant_time_compare(expected_mac, mac)
-        print(f"[DEBUG] expected_mac: {expected_mac}")
-        print(f"[DEBUG] received_mac: {mac}")
-        print(f"[DEBUG] expected_mac == mac: {result}")
+        if not quiet:
+            print(f"[DEBUG] expected_mac: {expected_mac}")
+            print(f"[DEBUG] received_mac: {mac}")
+            print(f"[DEBUG] expected_mac == mac: {result}")
         return result
 
     def _constant_time_compare(self, a: bytes, b: bytes) -> bool:
@@ -79,3 +215,67 @@ class GhostMACG:
         for x, y in zip(a, b):
             result |= x ^ y
         return result == 0
+
+
+# Função de nível de módulo para que as folhas possam ser calculadas em outros processos
+def _leaf_tag_worker(seed: bytes, index: int, block: bytes) -> bytes:
+    return GhostMACG(seed).leaf_tag(index, block)
+
+
+def _ghash_v6_update(seed: bytes, mac: bytearray, entropy: int, theta: int, data: bytes, start: int) -> tuple:
+    # Laço do GHash V6 a partir da posição absoluta `start`; retorna (entropy, theta) para continuar
+    seed_len = len(seed)
+    for i, b in enumerate(data, start):
+        idx = (i + theta) % 64
+        g_val = seed[i % seed_len] ^ entropy ^ ((i * 17) % 251)
+        v = b ^ g_val
+        r = (i + entropy) % 8
+        rotated = ((v << r) & 0xFF) | (v >> (8 - r))
+        mac[idx] = (mac[idx] + rotated + g_val + theta) % 256
+
+        # Evolução da entropia com feedback dinâmico (modo G)
+        entropy = (entropy + rotated + mac[idx] + i) % 256
+        theta = (theta ^ rotated ^ entropy) % 256
+    return entropy, theta
+
+
+# Class GhostMACStreamG
+# MAC-G incremental, para autenticar dados lidos em pedaços (arquivos grandes) sem tê-los
+# inteiros em memória. O GHash V6 depende do tamanho total desde o primeiro byte (θ inicial),
+# por isso o tamanho precisa ser informado na criação. O resultado é idêntico ao generate_mac.
+class GhostMACStreamG:
+    def __init__(self, mac: GhostMACG, total_length: int):
+        self.mac = mac
+        self.total_length = total_length
+        self._position = 0
+        if mac.mode == "linear":
+            self._tag = bytearray(64)
+            self._entropy = sum(mac.seed) % 256
+            self._theta = total_length ^ len(mac.seed)
+        else:
+            self._buffer = bytearray()
+            self._leaves = []
+
+    def update(self, data: bytes) -> None:
+        if self._position + len(data) > self.total_length:
+            raise ValueError("Mais dados do que o tamanho total informado ao MAC-G.")
+        if self.mac.mode == "linear":
+            self._entropy, self._theta = _ghash_v6_update(
+                self.mac.seed, self._tag, self._entropy, self._theta, data, self._position)
+        else:
+            self._buffer += data
+            size = self.mac.block_size
+            while len(self._buffer) >= size:
+                self._leaves.append(self.mac.leaf_tag(len(self._leaves), self._buffer[:size]))
+                del self._buffer[:size]
+        self._position += len(data)
+
+    def digest(self) -> bytes:
+        if self._position != self.total_length:
+            raise ValueError("Dados insuficientes para o tamanho total informado ao MAC-G.")
+        if self.mac.mode == "linear":
+            return bytes(self._tag)
+        leaves = list(self._leaves)
+        if self._buffer or not leaves:
+            leaves.append(self.mac.leaf_tag(len(leaves), self._buffer))
+        return self.mac.tree_root(leaves)
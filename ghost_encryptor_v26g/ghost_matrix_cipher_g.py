@@ -9,17 +9,23 @@
 # A cifragem é baseada em operações de XOR e manipulação de matrizes, proporcionando segurança adicional.
 # A classe é otimizada para trabalhar com dados binários e pode ser facilmente integrada em sistemas de criptografia.
 # Implementa cifragem baseada em matrizes usando a Álgebra G (educacional)
+# Thread-safety: instâncias são imutáveis após o __init__ e podem ser compartilhadas entre threads.
 
 import os
 
+from . import ghost_backend_g as backend
+
 class GhostMatrixCipherG:
-    def __init__(self, key: bytes):
+    def __init__(self, key: bytes, executor=None, matrix: list = None):
         if isinstance(key, str):
             key = key.encode()
             
         self.key = key
         self.seed = key
-        self.matrix = self._generate_matrix()
+        # matrix: matriz já calculada (ex.: carregada do GhostCacheG) para pular a geração
+        self.matrix = matrix if matrix is not None else self._generate_matrix()
+        # Executor opcional (GhostParallelExecutorG) para buffers grandes
+        self.executor = executor
 
     def _generate_matrix(self):
         size = 16
@@ -33,6 +39,8 @@ class GhostMatrixCipherG:
             data = data.encode()
         if isinstance(iv, str):
             iv = iv.encode()
+        if self.executor is not None and self.executor.accepts(data):
+            return self.executor.xor_keys(data, [iv, self.key], rounds)
         result = data
         for _ in range(rounds):
             result = self._xor_gcbc_round(result, iv)
@@ -43,6 +51,8 @@ class GhostMatrixCipherG:
             data = data.encode()
         if isinstance(iv, str):
             iv = iv.encode()
+        if self.executor is not None and self.executor.accepts(data):
+            return self.executor.xor_keys(data, [iv, self.key], rounds)
         result = data
         for _ in range(rounds):
             result = self._xor_gcbc_round(result, iv)
@@ -55,10 +65,8 @@ class GhostMatrixCipherG:
         return self._xor_g_operator(data, key)
 
     def _xor_gcbc_round(self, data: bytes, iv: bytes) -> bytes:
-        return bytes([
-            b ^ iv[i % len(iv)] ^ self.key[i % len(self.key)]
-            for i, b in enumerate(data)
-        ])
+        # b ^ iv[i % len(iv)] ^ key[i % len(key)], via backend (NumPy ou Python puro)
+        return backend.xor_keys(data, [iv, self.key])
         
     def _xor_g_operator(self, data: bytes, key: bytes) -> bytes:
         kstream = bytearray()
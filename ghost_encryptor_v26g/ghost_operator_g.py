@@ -1,5 +1,7 @@
 # ghost_operator_g.py
 
+from . import ghost_backend_g as backend
+
 # Class GhostOperatorG
 # Esta classe implementa operadores G simbólicos e matemáticos para transformação avançada em criptografia.
 # Ele implementa lógica baseada na Álgebra G (não comutativa, com incerteza incorporada).
@@ -8,11 +10,13 @@
 # A implementação é baseada em conceitos de criptografia moderna e técnicas de segurança.
 # A classe é escrita em Python e utiliza bibliotecas padrão para operações de criptografia.
 # A classe também inclui métodos para verificação de MAC, garantindo que os dados não tenham sido alterados.
+# Thread-safety: as operações não alteram a instância, que pode ser compartilhada entre threads.
 
 class GhostOperatorG:
-    def __init__(self, seed: bytes):
-        """Inicializa o operador G com uma seed."""
+    def __init__(self, seed: bytes, executor=None):
+        """Inicializa o operador G com uma seed (e, opcionalmente, um executor paralelo)."""
         self.seed = seed
+        self.executor = executor
         
     def apply_operator_sequence(self, data: bytes, reverse: bool = False) -> bytes:
         """Aplica uma sequência de operações de acordo com o parâmetro reverse."""
@@ -39,6 +43,14 @@ class GhostOperatorG:
         """Subtração G (inverso da g_add)"""
         return (a - b - (a ^ b) % 7) % 256
 
+    def g_add_bytes(self, data: bytes) -> bytes:
+        """g_add de cada byte com a seed (vetorizado pelo backend quando possível)."""
+        return backend.g_add_keys(data, self.seed)
+
+    def g_sub_bytes(self, data: bytes) -> bytes:
+        """g_sub de cada byte com a seed (vetorizado pelo backend quando possível)."""
+        return backend.g_sub_keys(data, self.seed)
+
     def g_mul(self, a: int, b: int) -> int:
         """Multiplicação G (com não comutatividade simples)"""
         # Multiplicação modificada para refletir comportamento não comutativo
@@ -67,14 +79,32 @@ class GhostOperatorG:
 
     def apply_operations(self, data: bytes) -> bytes:
         # Simula uma transformação G com operador XOR e rotação
+        if self.executor is not None and self.executor.accepts(data):
+            return self.executor.rotate_right_xor(data, self.seed)
         rotated = data[-1:] + data[:-1]
-        return bytes([b ^ self.seed[i % len(self.seed)] for i, b in enumerate(rotated)])
+        return backend.xor_keys(rotated, [self.seed])
         #"""Aplica transformações G sobre os dados."""
         #return bytes([self.g_add(b, self.seed[i % len(self.seed)]) for i, b in enumerate(data)])
 
     def reverse_operations(self, data: bytes) -> bytes:
-        xor_reversed = bytes([b ^ self.seed[i % len(self.seed)] for i, b in enumerate(data)])
+        if self.executor is not None and self.executor.accepts(data):
+            return self.executor.xor_rotate_left(data, self.seed)
+        xor_reversed = backend.xor_keys(data, [self.seed])
         return xor_reversed[1:] + xor_reversed[:1]
         #"""Desfaz transformações G."""
         #return bytes([self.g_sub(b, self.seed[i % len(self.seed)]) for i, b in enumerate(data)])
 
+
+# Versões em nível de módulo dos operadores G.
+# São importadas diretamente por ghost_pq_hybrid e espelham os métodos da classe.
+def g_add(a: int, b: int) -> int:
+    """Adição G (mesma definição de GhostOperatorG.g_add)."""
+    return (a + b + (a ^ b) % 7) % 256
+
+def g_mul(a: int, b: int) -> int:
+    """Multiplicação G (mesma definição de GhostOperatorG.g_mul)."""
+    return ((a * (b + 1)) ^ (b * (a + 1))) % 256
+
+def g_mod(a: int, mod: int) -> int:
+    """Módulo G (mesma definição de GhostOperatorG.g_mod)."""
+    return (a + (a ^ mod) % 11) % mod
@@ -0,0 +1,117 @@
+# ghost_parallel_g.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# Execução paralela dos estágios com chave indexada por posição (i % len(key)).
+# O buffer é colocado em multiprocessing.shared_memory e cada processo aplica o estágio,
+# no próprio lugar, a uma fatia disjunta; nada é serializado (pickle) além dos parâmetros.
+DEFAULT_THRESHOLD = 4 * 1024 * 1024  # abaixo disso o caminho de um único núcleo é usado
+MIN_SLICE = 256 * 1024
+
+
+def _keystream(offset: int, length: int, keys: list) -> int:
+    """Fluxo de chave (como inteiro) das posições [offset, offset + length) para todas as chaves."""
+    stream = 0
+    for key in keys:
+        shift = offset % len(key)
+        rotated = key[shift:] + key[:shift]
+        tiled = (rotated * (length // len(key) + 1))[:length]
+        stream ^= int.from_bytes(tiled, 'big')
+    return stream
+
+
+def _xor_slice_worker(shm_name: str, start: int, stop: int, keys: list, rounds: int) -> None:
+    # Executado nos processos do pool: anexa o bloco compartilhado e altera apenas a sua fatia
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf[start:stop]
+        length = stop - start
+        value = int.from_bytes(view, 'big')
+        stream = _keystream(start, length, keys)
+        for _ in range(rounds):
+            value ^= stream
+        view[:] = value.to_bytes(length, 'big')
+        view.release()
+    finally:
+        shm.close()
+
+
+# Class GhostParallelExecutorG
+# Executor paralelo para buffers grandes em GhostMatrixCipherG (GCBC) e GhostOperatorG.
+# Instâncias são passadas como `executor=` para o cipher/operador (ou para o GhostEncryptorV26G);
+# buffers menores que `threshold` continuam no caminho original de um único núcleo.
+class GhostParallelExecutorG:
+    def __init__(self, workers: int = None, threshold: int = DEFAULT_THRESHOLD, min_slice: int = MIN_SLICE):
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.min_slice = min_slice
+        self._pool = None
+
+    def accepts(self, data: bytes) -> bool:
+        """Indica se o buffer é grande o suficiente para compensar o paralelismo."""
+        return self.workers > 1 and len(data) >= self.threshold
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _slices(self, length: int) -> list:
+        count = max(1, min(self.workers, length // self.min_slice))
+        step = -(-length // count)
+        return [(start, min(start + step, length)) for start in range(0, length, step)]
+
+    def _run(self, shm: shared_memory.SharedMemory, length: int, keys: list, rounds: int) -> None:
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_xor_slice_worker, shm.name, start, stop, keys, rounds)
+            for start, stop in self._slices(length)
+        ]
+        for future in futures:
+            future.result()
+
+    def _transform(self, data: bytes, keys: list, rounds: int, rotate: int = 0) -> bytes:
+        # rotate=+1: rotação à direita antes do XOR; rotate=-1: rotação à esquerda depois do XOR
+        length = len(data)
+        if length == 0:
+            return b''
+        keys = [bytes(k) for k in keys]
+        shm = shared_memory.SharedMemory(create=True, size=length)
+        try:
+            if rotate == 1:
+                shm.buf[0] = data[-1]
+                shm.buf[1:length] = data[:-1]
+            else:
+                shm.buf[:length] = data
+            self._run(shm, length, keys, rounds)
+            if rotate == -1:
+                return bytes(shm.buf[1:length]) + bytes(shm.buf[:1])
+            return bytes(shm.buf[:length])
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def xor_keys(self, data: bytes, keys: list, rounds: int = 1) -> bytes:
+        """Aplica `rounds` vezes o XOR com todas as chaves (posição i usa key[i % len(key)])."""
+        return self._transform(data, keys, rounds)
+
+    def rotate_right_xor(self, data: bytes, key: bytes) -> bytes:
+        """Equivalente paralelo de GhostOperatorG.apply_operations."""
+        return self._transform(data, [key], 1, rotate=1)
+
+    def xor_rotate_left(self, data: bytes, key: bytes) -> bytes:
+        """Equivalente paralelo de GhostOperatorG.reverse_operations."""
+        return self._transform(data, [key], 1, rotate=-1)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
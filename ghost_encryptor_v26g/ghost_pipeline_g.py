@@ -0,0 +1,227 @@
+# ghost_pipeline_g.py
+
+import json
+import struct
+import zlib
+
+from . import ghost_backend_g as backend
+from .compressor_zlib import GhostCompressor
+from .ghost_compressor_g_adaptive import GhostCompressorGAdaptive
+from .ghost_compressor_g_symbolic import GhostCompressorG
+from .ghost_mac_g import GhostMACG
+from .ghost_operator_g import GhostOperatorG
+from .ghost_pq_hybrid import simulate_kyber_encapsulate
+from .interfaces import IGhostEncryptor
+
+# Pipeline declarativo do GhostEncryptor V26G.
+#
+# Os estágios são dados (dicts), na ordem de aplicação na criptografia:
+#   {"stage": "compress", "codec": "symbolic" | "zlib" | "adaptive"}
+#   {"stage": "operator"}                                   -> GhostOperatorG.apply_operations
+#   {"stage": "transform", "rounds": 9, "key": "seed"}       -> XOR com a chave, por rodada
+#   {"stage": "gcbc", "rounds": 9}                           -> XOR com iv e seed, por rodada (GCBC)
+#   {"stage": "xor", "keys": ["seed", "iv"], "rounds": 1}
+#
+# Antes de executar, o planejamento reduz os estágios de XOR com chave a passes únicos:
+# rodadas em número par se cancelam, estágios de XOR adjacentes viram um só passe e chaves
+# repetidas um número par de vezes desaparecem. O resultado é idêntico byte a byte ao da
+# execução ingênua (optimize=False), sem o trabalho que não tem efeito.
+#
+# Formato: MAC-G (64) + dados processados; o MAC cobre o ID do plano (CRC-32 da configuração)
+# e os dados, de modo que configurações diferentes falham na verificação em vez de gerar lixo.
+CODECS = ("symbolic", "zlib", "adaptive")
+KEY_NAMES = ("seed", "iv")
+MAC_MODES = ("linear", "tree")
+
+PRESETS = {
+    # Mesma ordem de estágios do GhostEncryptorV26G_Final
+    "final": [
+        {"stage": "compress", "codec": "symbolic"},
+        {"stage": "operator"},
+        {"stage": "gcbc", "rounds": 9},
+    ],
+    # Mesma ordem de estágios do GhostCore (transformador + GCBC)
+    "core": [
+        {"stage": "compress", "codec": "zlib"},
+        {"stage": "transform", "rounds": 9, "key": "seed"},
+        {"stage": "gcbc", "rounds": 9},
+    ],
+}
+
+_MAC_SIZE = 64
+
+
+def _lower(stage: dict) -> list:
+    """Converte um estágio declarado em passos primitivos (um passo de XOR por rodada)."""
+    kind = stage.get("stage")
+    if kind == "compress":
+        codec = stage.get("codec", "symbolic")
+        if codec not in CODECS:
+            raise ValueError(f"Codec desconhecido no pipeline: {codec}")
+        return [("compress", codec)]
+    if kind == "operator":
+        return [("operator",)]
+
+    if kind == "transform":
+        keys = (stage.get("key", "seed"),)
+    elif kind == "gcbc":
+        keys = ("iv", "seed")
+    elif kind == "xor":
+        keys = tuple(stage.get("keys", ()))
+    else:
+        raise ValueError(f"Estágio desconhecido no pipeline: {kind}")
+
+    rounds = stage.get("rounds", 9 if kind in ("transform", "gcbc") else 1)
+    if not isinstance(rounds, int) or rounds < 0:
+        raise ValueError("O número de rodadas deve ser um inteiro não negativo.")
+    for key in keys:
+        if key not in KEY_NAMES:
+            raise ValueError(f"Chave desconhecida no pipeline: {key}")
+    return [("xor", keys)] * rounds
+
+
+def _merge_xor(keys: list) -> tuple:
+    # XOR posicional com a mesma chave se cancela aos pares: mantém só as de contagem ímpar
+    counts = {}
+    for key in keys:
+        counts[key] = counts.get(key, 0) + 1
+    return tuple(key for key, count in counts.items() if count % 2)
+
+
+def plan_stages(stages: list, optimize: bool = True) -> list:
+    """Gera o plano de execução (lista de passos primitivos) para os estágios declarados."""
+    steps = []
+    for stage in stages:
+        steps.extend(_lower(stage))
+    if not optimize:
+        return steps
+
+    planned = []
+    pending = []  # chaves de XOR adjacentes ainda não emitidas
+    for step in steps:
+        if step[0] == "xor":
+            pending.extend(step[1])
+            continue
+        if pending:
+            merged = _merge_xor(pending)
+            if merged:
+                planned.append(("xor", merged))
+            pending = []
+        planned.append(step)
+    if pending:
+        merged = _merge_xor(pending)
+        if merged:
+            planned.append(("xor", merged))
+    return planned
+
+
+# Class GhostPipelineG
+# Encriptador configurável por dados que implementa IGhostEncryptor.
+class GhostPipelineG(IGhostEncryptor):
+    def __init__(self, seed: bytes = b"default_seed", stages: list = None, mac_mode: str = "linear",
+                 optimize: bool = True):
+        if isinstance(seed, str):
+            seed = seed.encode('utf-8')
+        if mac_mode not in MAC_MODES:
+            raise ValueError(f"Modo de MAC-G desconhecido: {mac_mode}")
+        self.seed = seed
+        self.stages = [dict(s) for s in (stages if stages is not None else PRESETS["final"])]
+        self.mac_mode = mac_mode
+        self.plan = plan_stages(self.stages, optimize)
+
+        _, shared_secret = simulate_kyber_encapsulate(seed)
+        self._keys = {"seed": seed, "iv": shared_secret[:16]}
+        self._codecs = {}
+        self.operator_g = GhostOperatorG(seed)
+        self.mac = GhostMACG(seed, mode=mac_mode)
+        config = json.dumps({"stages": self.stages, "mac_mode": mac_mode}, sort_keys=True)
+        self.plan_id = struct.pack('>I', zlib.crc32(config.encode('utf-8')))
+
+    @classmethod
+    def from_config(cls, seed: bytes, config: dict, optimize: bool = True) -> "GhostPipelineG":
+        """Cria o pipeline a partir de {"stages": [...] | "preset": nome, "mac_mode": ...}."""
+        stages = config.get("stages")
+        if stages is None:
+            preset = config.get("preset", "final")
+            if preset not in PRESETS:
+                raise ValueError(f"Preset de pipeline desconhecido: {preset}")
+            stages = PRESETS[preset]
+        return cls(seed, stages, config.get("mac_mode", "linear"), optimize)
+
+    def _codec(self, name: str):
+        if name not in self._codecs:
+            if name == "symbolic":
+                self._codecs[name] = GhostCompressorG(seed=self.seed)
+            elif name == "adaptive":
+                self._codecs[name] = GhostCompressorGAdaptive(seed=self.seed)
+            else:
+                self._codecs[name] = GhostCompressor()
+        return self._codecs[name]
+
+    def _run(self, data: bytes, reverse: bool) -> bytes:
+        for step in (reversed(self.plan) if reverse else self.plan):
+            kind = step[0]
+            if kind == "xor":
+                data = backend.xor_keys(data, [self._keys[k] for k in step[1]])
+            elif kind == "operator":
+                op = self.operator_g
+                data = op.reverse_operations(data) if reverse else op.apply_operations(data)
+            else:
+                codec = self._codec(step[1])
+                data = codec.decompress(data) if reverse else codec.compress(data)
+        return data
+
+    def encrypt_bytes(self, plaintext: bytes) -> bytes:
+        body = self._run(bytes(plaintext), reverse=False)
+        return self.mac.generate_mac(self.plan_id + body) + body
+
+    def decrypt_bytes(self, ciphertext: bytes) -> bytes:
+        mac, body = ciphertext[:_MAC_SIZE], ciphertext[_MAC_SIZE:]
+        if len(mac) != _MAC_SIZE or not self.mac._constant_time_compare(
+                self.mac.generate_mac(self.plan_id + body), mac):
+            raise ValueError("MAC-G falhou! Dados comprometidos.")
+        return self._run(body, reverse=True)
+
+    def encrypt_text(self, plaintext: str) -> bytes:
+        return self.encrypt_bytes(plaintext.encode('utf-8'))
+
+    def decrypt_text(self, ciphertext: bytes) -> str:
+        return self.decrypt_bytes(ciphertext).decode('utf-8')
+
+
+# Class GhostPipelineBuilderG
+# Monta a lista de estágios de forma encadeada: builder.compress().operator().gcbc(9).build(seed)
+class GhostPipelineBuilderG:
+    def __init__(self):
+        self._stages = []
+        self._mac_mode = "linear"
+
+    def compress(self, codec: str = "symbolic") -> "GhostPipelineBuilderG":
+        self._stages.append({"stage": "compress", "codec": codec})
+        return self
+
+    def operator(self) -> "GhostPipelineBuilderG":
+        self._stages.append({"stage": "operator"})
+        return self
+
+    def transform(self, rounds: int = 9, key: str = "seed") -> "GhostPipelineBuilderG":
+        self._stages.append({"stage": "transform", "rounds": rounds, "key": key})
+        return self
+
+    def gcbc(self, rounds: int = 9) -> "GhostPipelineBuilderG":
+        self._stages.append({"stage": "gcbc", "rounds": rounds})
+        return self
+
+    def xor(self, keys: list, rounds: int = 1) -> "GhostPipelineBuilderG":
+        self._stages.append({"stage": "xor", "keys": list(keys), "rounds": rounds})
+        return self
+
+    def mac(self, mode: str = "linear") -> "GhostPipelineBuilderG":
+        self._mac_mode = mode
+        return self
+
+    def to_config(self) -> dict:
+        return {"stages": [dict(s) for s in self._stages], "mac_mode": self._mac_mode}
+
+    def build(self, seed: bytes = b"default_seed", optimize: bool = True) -> GhostPipelineG:
+        return GhostPipelineG.from_config(seed, self.to_config(), optimize)
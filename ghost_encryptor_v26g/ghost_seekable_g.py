@@ -0,0 +1,418 @@
+# ghost_seekable_g.py
+
+import hashlib
+import io
+import os
+import struct
+
+from .GhostEncryptorV26G_Final import GhostEncryptorV26G
+from .ghost_mac_g import digest_key
+from .ghost_pq_hybrid import simulate_kyber_encapsulate
+
+# Formato de contêiner indexado (seekable) do GhostEncryptor V26G.
+#
+#   cabeçalho : MAGIC (3) + versão (1) + tamanho do bloco (4) + pubkey (32)
+#   blocos    : para cada bloco -> MAC-G (64) + bloco cifrado
+#   índice    : para cada bloco -> offset (8) + tamanho selado (4) + tamanho original (4)
+#               + impressão digital do texto original (8, desde a versão 2)
+#               seguido do sal das impressões digitais (16, desde a versão 3)
+#   MAC-G do índice (64), cobrindo cabeçalho + índice + nº de blocos + tamanho total
+#   trailer   : offset do índice (8) + nº de blocos (4) + tamanho total (8) + TRAILER_MAGIC (4)
+#
+# Cada bloco é comprimido, transformado, cifrado e autenticado de forma independente,
+# de modo que uma leitura parcial só precisa decifrar os blocos que toca.
+# As impressões digitais permitem atualizar o contêiner incrementalmente (update_file,
+# update_range): só os blocos alterados são cifrados, autenticados e regravados.
+#
+# Desde a versão 3 a impressão digital é um BLAKE2b truncado, com chave derivada da seed e
+# de um sal aleatório de cada contêiner: sem a chave não é possível forjar colisões, e um
+# mesmo bloco tem impressões diferentes em contêineres diferentes. As somas CRC-32/Adler-32
+# da versão 2 não são usadas para pular blocos (contam como ausentes, como na versão 1).
+MAGIC = b'\x00GS'
+VERSION = 3
+SUPPORTED_VERSIONS = (1, 2, 3)
+TRAILER_MAGIC = b'GSIX'
+DEFAULT_BLOCK_SIZE = 64 * 1024
+FINGERPRINT_SIZE = 8
+FINGERPRINT_SALT_SIZE = 16
+
+_HEADER = struct.Struct('>3sBI32s')
+_INDEX_ENTRY_V1 = struct.Struct('>QII')
+_INDEX_ENTRY = struct.Struct('>QII8s')
+_TRAILER = struct.Struct('>QIQ4s')
+_INDEX_TOTALS = struct.Struct('>IQ')
+_MAC_SIZE = 64
+
+
+def _read_full(source, size: int) -> bytes:
+    # Garante blocos completos mesmo com leituras curtas (pipes, sockets)
+    parts = []
+    remaining = size
+    while remaining:
+        chunk = source.read(remaining)
+        if not chunk:
+            break
+        parts.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(parts)
+
+
+# Class GhostSeekableG
+# Esta classe produz e lê contêineres cifrados com acesso aleatório.
+# Ela reutiliza os componentes do GhostEncryptorV26G (compressão simbólica, operador G,
+# cifra GCBC e MAC-G), mas aplicados bloco a bloco, com um índice de offsets no final.
+class GhostSeekableG:
+    def __init__(self, seed: bytes = b"default_seed", block_size: int = DEFAULT_BLOCK_SIZE):
+        if isinstance(seed, str):
+            seed = seed.encode('utf-8')
+        if block_size <= 0:
+            raise ValueError("O tamanho do bloco deve ser positivo.")
+
+        self.seed = seed
+        self.block_size = block_size
+        self.encryptor = GhostEncryptorV26G(seed)
+        self.pubkey, shared_secret = simulate_kyber_encapsulate(seed)
+        # Mesma derivação de IV usada por encryptByte
+        self.iv = shared_secret[:16]
+        self._fingerprint_keys = {}  # sal do contêiner -> chave das impressões digitais
+
+    def fingerprint(self, index: int, plaintext: bytes, salt: bytes) -> bytes:
+        """
+        Impressão digital de um bloco para detecção de mudanças: BLAKE2b (velocidade de C)
+        de índice + texto original, com chave derivada da seed e do sal do contêiner.
+        A integridade continua a cargo do MAC-G.
+        """
+        key = self._fingerprint_keys.get(salt)
+        if key is None:
+            key = self._fingerprint_keys[salt] = digest_key(self.seed, b"ghost-seekable-fp-v3:" + salt)
+        digest = hashlib.blake2b(struct.pack('>Q', index), key=key, digest_size=FINGERPRINT_SIZE)
+        digest.update(plaintext)
+        return digest.digest()
+
+    # ------------------------------------------------------------------ #
+    # Blocos individuais
+    # ------------------------------------------------------------------ #
+    def seal_block(self, index: int, plaintext: bytes) -> bytes:
+        """Comprime, transforma, cifra e autentica um único bloco."""
+        compressed = self.encryptor.compressor.compress(plaintext)
+        transformed = self.encryptor.operator_g.apply_operations(compressed)
+        encrypted = self.encryptor.cipher.encrypt_gcbc(transformed, self.iv, rounds=9)
+        # O índice do bloco entra no MAC para impedir troca ou reordenação de blocos
+        mac = self.encryptor.mac.generate_mac(struct.pack('>Q', index) + encrypted)
+        return mac + encrypted
+
+    def open_block(self, index: int, sealed: bytes) -> bytes:
+        """Verifica o MAC-G de um bloco e devolve o texto original."""
+        mac = sealed[:_MAC_SIZE]
+        encrypted = sealed[_MAC_SIZE:]
+        expected = self.encryptor.mac.generate_mac(struct.pack('>Q', index) + encrypted)
+        if not self.encryptor.mac._constant_time_compare(expected, mac):
+            raise ValueError(f"MAC-G falhou no bloco {index}! Dados comprometidos.")
+
+        decrypted = self.encryptor.cipher.decrypt_gcbc(encrypted, self.iv, rounds=9)
+        restored = self.encryptor.operator_g.reverse_operations(decrypted)
+        return self.encryptor.compressor.decompress(restored)
+
+    # ------------------------------------------------------------------ #
+    # Escrita
+    # ------------------------------------------------------------------ #
+    def write(self, source, output) -> int:
+        """
+        Lê `source` (objeto com read) em blocos e grava o contêiner em `output`.
+        Retorna o número de blocos gravados.
+        """
+        header = self._container_header()
+        output.write(header)
+        offset = len(header)
+
+        salt = os.urandom(FINGERPRINT_SALT_SIZE)
+        index = bytearray()
+        total = 0
+        count = 0
+        while True:
+            chunk = _read_full(source, self.block_size)
+            if not chunk:
+                break
+            sealed = self.seal_block(count, chunk)
+            output.write(sealed)
+            index += _INDEX_ENTRY.pack(offset, len(sealed), len(chunk), self.fingerprint(count, chunk, salt))
+            offset += len(sealed)
+            total += len(chunk)
+            count += 1
+
+        self._finish_container(output, header, index, salt, offset, count, total)
+        return count
+
+    def _container_header(self, block_size: int = None) -> bytes:
+        return _HEADER.pack(MAGIC, VERSION, block_size or self.block_size, self.pubkey)
+
+    def _finish_container(self, output, header: bytes, index: bytes, salt: bytes, index_offset: int,
+                          count: int, total: int) -> None:
+        # Índice (com o sal) autenticado + trailer, gravados depois do último bloco
+        index = bytes(index) + salt
+        index_mac = self.encryptor.mac.generate_mac(header + index + _INDEX_TOTALS.pack(count, total))
+        output.write(index)
+        output.write(index_mac)
+        output.write(_TRAILER.pack(index_offset, count, total, TRAILER_MAGIC))
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        """Gera o contêiner indexado completo em memória."""
+        if isinstance(plaintext, str):
+            plaintext = plaintext.encode('utf-8')
+        output = io.BytesIO()
+        self.write(io.BytesIO(plaintext), output)
+        return output.getvalue()
+
+    def encrypt_file(self, input_path: str, output_path: str) -> None:
+        """Criptografa um arquivo no formato indexado, bloco a bloco."""
+        with open(input_path, 'rb') as src, open(output_path, 'wb') as dst:
+            count = self.write(src, dst)
+        print(f"[🔐] Arquivo '{input_path}' criptografado em {count} blocos como '{output_path}'.")
+
+    # ------------------------------------------------------------------ #
+    # Atualização incremental
+    # ------------------------------------------------------------------ #
+    # Blocos alterados são regravados no próprio lugar quando o novo bloco selado cabe no
+    # espaço antigo; caso contrário, vão para o fim da área de dados (onde ficava o índice).
+    # O índice, seu MAC-G e o trailer são sempre reescritos. A atualização não é atômica:
+    # uma interrupção no meio deixa o contêiner inválido (MAC-G falha), nunca silenciosamente errado.
+    def _begin_update(self, reader: "GhostSeekableReaderG") -> dict:
+        return {
+            "entries": list(reader.entries),
+            "fingerprints": list(reader.fingerprints),
+            # Contêineres anteriores à v3 ganham um sal novo (suas impressões são recalculadas)
+            "salt": reader.salt or os.urandom(FINGERPRINT_SALT_SIZE),
+            "block_size": reader.block_size,
+            "data_end": reader.index_offset,
+            "rewritten": 0,
+            "appended": 0,
+            "bytes_written": 0,
+        }
+
+    def _update_block(self, fh, state: dict, index: int, plaintext: bytes) -> None:
+        entries = state["entries"]
+        sealed = self.seal_block(index, plaintext)
+        if index < len(entries) and len(sealed) <= entries[index][1]:
+            offset = entries[index][0]
+            state["rewritten"] += 1
+        else:
+            offset = state["data_end"]
+            state["data_end"] += len(sealed)
+            state["appended"] += 1
+        fh.seek(offset)
+        fh.write(sealed)
+        state["bytes_written"] += len(sealed)
+
+        entry = (offset, len(sealed), len(plaintext))
+        fingerprint = self.fingerprint(index, plaintext, state["salt"])
+        if index < len(entries):
+            entries[index] = entry
+            state["fingerprints"][index] = fingerprint
+        else:
+            entries.append(entry)
+            state["fingerprints"].append(fingerprint)
+
+    def _finish_update(self, fh, state: dict, count: int, total: int) -> dict:
+        entries = state["entries"][:count]
+        fingerprints = state["fingerprints"][:count]
+        if None in fingerprints:
+            raise ValueError("Impressões digitais ausentes no índice; contêiner não foi alterado.")
+        # O índice é montado antes de qualquer escrita de metadados: uma falha aqui não
+        # deixa um cabeçalho novo sobre um índice antigo
+        index = b''.join(_INDEX_ENTRY.pack(*entries[i], fingerprints[i]) for i in range(count))
+        header = self._container_header(state["block_size"])  # contêineres antigos passam para a v3
+        fh.seek(0)
+        fh.write(header)
+        fh.seek(state["data_end"])
+        self._finish_container(fh, header, index, state["salt"], state["data_end"], count, total)
+        fh.truncate()
+        return {"blocks": count, "rewritten": state["rewritten"], "appended": state["appended"],
+                "bytes_written": state["bytes_written"]}
+
+    def update_file(self, container_path: str, source) -> dict:
+        """
+        Atualiza o contêiner para refletir o novo conteúdo de `source` (caminho ou objeto com read),
+        cifrando apenas os blocos cujas impressões digitais mudaram.
+        """
+        owns_source = isinstance(source, str)
+        src = open(source, 'rb') if owns_source else source
+        try:
+            with open(container_path, 'r+b') as fh:
+                reader = GhostSeekableReaderG(self, fh)
+                state = self._begin_update(reader)
+                block_size = state["block_size"]
+                count = total = 0
+                while True:
+                    chunk = _read_full(src, block_size)
+                    if not chunk:
+                        break
+                    known = count < reader.block_count
+                    if not (known and reader.entries[count][2] == len(chunk)
+                            and reader.fingerprints[count] == self.fingerprint(count, chunk, state["salt"])):
+                        self._update_block(fh, state, count, chunk)
+                    count += 1
+                    total += len(chunk)
+                stats = self._finish_update(fh, state, count, total)
+        finally:
+            if owns_source:
+                src.close()
+        print(f"[🔐] Contêiner '{container_path}' atualizado: {stats['rewritten'] + stats['appended']} "
+              f"de {stats['blocks']} blocos regravados.")
+        return stats
+
+    def update_range(self, container_path: str, offset: int, data: bytes) -> dict:
+        """
+        Sobrescreve o conteúdo a partir de `offset` com `data` (pode estender o final),
+        decifrando e regravando apenas os blocos tocados.
+        """
+        with open(container_path, 'r+b') as fh:
+            reader = GhostSeekableReaderG(self, fh)
+            if offset < 0 or offset > reader.size:
+                raise ValueError("Offset fora do conteúdo do contêiner.")
+            state = self._begin_update(reader)
+            block_size = state["block_size"]
+            end = offset + len(data)
+            total = max(reader.size, end)
+            count = -(-total // block_size)
+            # Sem dados, nenhum bloco é tocado (intervalo vazio)
+            first, last = (offset // block_size, (end - 1) // block_size) if data else (0, -1)
+            # Contêineres anteriores à v3: completa as impressões digitais dos blocos não tocados
+            for i, fingerprint in enumerate(state["fingerprints"]):
+                if fingerprint is None and not first <= i <= last:
+                    state["fingerprints"][i] = self.fingerprint(i, reader.read_block(i), state["salt"])
+            if not data:
+                return self._finish_update(fh, state, count, total)
+
+            for i in range(first, last + 1):
+                start = i * block_size
+                block = bytearray(reader.read_block(i) if i < reader.block_count else b'')
+                rel = max(offset - start, 0)
+                piece = data[max(start - offset, 0):min(start + block_size, end) - offset]
+                block[rel:rel + len(piece)] = piece
+                self._update_block(fh, state, i, bytes(block))
+            return self._finish_update(fh, state, count, total)
+
+    # ------------------------------------------------------------------ #
+    # Leitura
+    # ------------------------------------------------------------------ #
+    def open(self, source) -> "GhostSeekableReaderG":
+        """Abre um contêiner (bytes, caminho ou objeto de arquivo) para leitura aleatória."""
+        return GhostSeekableReaderG(self, source)
+
+    def read_range(self, source, offset: int, length: int) -> bytes:
+        """Atalho: abre o contêiner e lê apenas o intervalo pedido."""
+        with self.open(source) as reader:
+            return reader.read_range(offset, length)
+
+    def decrypt(self, container: bytes) -> bytes:
+        """Decifra o contêiner inteiro."""
+        with self.open(container) as reader:
+            return reader.read_range(0, reader.size)
+
+
+# Class GhostSeekableReaderG
+# Leitor de contêineres indexados. Carrega e autentica apenas o trailer e o índice;
+# os blocos são lidos, verificados e decifrados sob demanda.
+class GhostSeekableReaderG:
+    def __init__(self, seekable: GhostSeekableG, source):
+        self.seekable = seekable
+        self._owns_handle = False
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._fh = io.BytesIO(bytes(source))
+        elif isinstance(source, str):
+            self._fh = open(source, 'rb')
+            self._owns_handle = True
+        else:
+            self._fh = source
+
+        self._cached_block = (None, b'')
+        self._load_index()
+
+    def _read_at(self, offset: int, length: int) -> bytes:
+        self._fh.seek(offset)
+        data = self._fh.read(length)
+        if len(data) != length:
+            raise ValueError("Contêiner indexado truncado.")
+        return data
+
+    def _load_index(self) -> None:
+        self._fh.seek(0, io.SEEK_END)
+        end = self._fh.tell()
+        if end < _HEADER.size + _MAC_SIZE + _TRAILER.size:
+            raise ValueError("Contêiner indexado truncado.")
+
+        header = self._read_at(0, _HEADER.size)
+        magic, version, block_size, pubkey = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Flag de contêiner indexado inválida.")
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Versão de contêiner indexado não suportada: {version}")
+        entry = _INDEX_ENTRY if version >= 2 else _INDEX_ENTRY_V1
+
+        index_offset, count, total, trailer_magic = _TRAILER.unpack(
+            self._read_at(end - _TRAILER.size, _TRAILER.size))
+        if trailer_magic != TRAILER_MAGIC:
+            raise ValueError("Trailer do contêiner indexado inválido.")
+
+        salt_size = FINGERPRINT_SALT_SIZE if version >= 3 else 0
+        index = self._read_at(index_offset, count * entry.size + salt_size)
+        index_mac = self._read_at(index_offset + len(index), _MAC_SIZE)
+        mac = self.seekable.encryptor.mac
+        expected = mac.generate_mac(header + index + _INDEX_TOTALS.pack(count, total))
+        if not mac._constant_time_compare(expected, index_mac):
+            raise ValueError("MAC-G do índice falhou! Dados comprometidos.")
+
+        self.version = version
+        self.block_size = block_size
+        self.pubkey = pubkey
+        self.block_count = count
+        self.size = total
+        self.index_offset = index_offset
+        self.salt = index[len(index) - salt_size:] if salt_size else None
+        rows = [entry.unpack_from(index, i * entry.size) for i in range(count)]
+        self.entries = [row[:3] for row in rows]
+        # Antes da versão 3 não há impressões digitais confiáveis (todos os blocos contam como alterados)
+        self.fingerprints = [row[3] if version >= 3 else None for row in rows]
+
+    def read_block(self, index: int) -> bytes:
+        """Lê, verifica e decifra um único bloco."""
+        cached_index, cached_data = self._cached_block
+        if cached_index == index:
+            return cached_data
+
+        offset, sealed_len, plain_len = self.entries[index]
+        plaintext = self.seekable.open_block(index, self._read_at(offset, sealed_len))
+        if len(plaintext) != plain_len:
+            raise ValueError(f"Tamanho inesperado no bloco {index}.")
+        expected = self.fingerprints[index]
+        if expected is not None and self.seekable.fingerprint(index, plaintext, self.salt) != expected:
+            raise ValueError(f"Impressão digital divergente no bloco {index}.")
+        self._cached_block = (index, plaintext)
+        return plaintext
+
+    def read_range(self, offset: int, length: int) -> bytes:
+        """Decifra somente os blocos que cobrem [offset, offset + length)."""
+        if offset < 0 or length < 0:
+            raise ValueError("Offset e tamanho devem ser não negativos.")
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b''
+
+        first = offset // self.block_size
+        last = (end - 1) // self.block_size
+        parts = []
+        for i in range(first, last + 1):
+            block = self.read_block(i)
+            start = i * self.block_size
+            parts.append(block[max(offset - start, 0):end - start])
+        return b''.join(parts)
+
+    def close(self) -> None:
+        if self._owns_handle:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
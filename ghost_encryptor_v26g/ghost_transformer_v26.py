@@ -6,6 +6,8 @@
 # secure and should not be used for sensitive data. It is only for educational
 # purposes.
 # It is only for educational purposes.
+from . import ghost_backend_g as backend
+
 class GhostTransformerV26:
     def __init__(self, key: bytes, entropy_ai):
         self.key = key
@@ -18,10 +20,8 @@ class GhostTransformerV26:
             result = self._round_transform(result)
         return result
 
-    def transform_decrypt(self, data: bytes) -> bytes:
-        """Transformação reversa (fixa rounds para simplificação)."""
-        # Poderia ser simétrico, aqui fixo para rounds padrão
-        rounds = 9
+    def transform_decrypt(self, data: bytes, rounds: int = 9) -> bytes:
+        """Transformação reversa; rounds deve ser o mesmo usado em transform (vem do cabeçalho)."""
         result = data
         for _ in range(rounds):
             result = self._round_reverse(result)
@@ -29,8 +29,8 @@ class GhostTransformerV26:
 
     def _round_transform(self, data: bytes) -> bytes:
         """Simula uma rodada de transformação baseada em operadores G."""
-        return bytes([(b ^ self.key[i % len(self.key)]) for i, b in enumerate(data)])
+        return backend.xor_keys(data, [self.key])
 
     def _round_reverse(self, data: bytes) -> bytes:
         """Simula reversão da rodada (xor simétrico)."""
-        return bytes([(b ^ self.key[i % len(self.key)]) for i, b in enumerate(data)])
+        return backend.xor_keys(data, [self.key])
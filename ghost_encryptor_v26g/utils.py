@@ -2,6 +2,8 @@
 
 import random
 
+from . import ghost_backend_g as backend
+
 # GhostEntropyAI
 # Classe para avaliar a entropia de dados com base em um seed.
 # Esta classe simula uma IA de entropia que não é linear e não usa hashlib.
@@ -38,6 +40,67 @@ class GhostNumberG:
         # Reverte a transformação
         return (self.val ^ ((self.e * 73) % 251)) % 256
 
+    @staticmethod
+    def transform_bytes(data: bytes, entropy_level: int) -> bytes:
+        # Aplica transform() a um buffer inteiro de uma vez (XOR é sua própria inversa)
+        return backend.xor_byte(data, (entropy_level * 73) % 251)
+
+_TRANSLATION_TABLES = {}
+
+
+def _number_g_table(entropy_level: int) -> bytes:
+    # Tabela de 256 posições com GhostNumberG(b, e).transform() para cada byte b
+    table = _TRANSLATION_TABLES.get(entropy_level)
+    if table is None:
+        table = bytes(GhostNumberG(b, entropy_level).transform() for b in range(256))
+        _TRANSLATION_TABLES[entropy_level] = table
+    return table
+
+
+# GhostNumberGArray
+# Forma vetorial do GhostNumberG: um buffer inteiro (bytearray) com um único nível de entropia.
+# transform/reverse aplicam uma tabela de tradução de 256 posições pré-calculada (bytes.translate),
+# sem um objeto nem uma chamada de método por byte.
+class GhostNumberGArray:
+    __slots__ = ("data", "e")
+
+    def __init__(self, data: bytes, entropy_level: int):
+        self.data = bytearray(data)
+        self.e = entropy_level
+
+    @classmethod
+    def from_numbers(cls, numbers: list) -> "GhostNumberGArray":
+        # Todos os GhostNumberG precisam compartilhar o mesmo nível de entropia
+        levels = {n.e for n in numbers}
+        if len(levels) > 1:
+            raise ValueError("GhostNumberGArray exige um único nível de entropia.")
+        return cls(bytes(n.val for n in numbers), levels.pop() if levels else 0)
+
+    def transform(self) -> bytes:
+        return bytes(self.data.translate(_number_g_table(self.e)))
+
+    def reverse(self) -> bytes:
+        # A transformação é um XOR com constante, logo a tabela é a própria inversa
+        return bytes(self.data.translate(_number_g_table(self.e)))
+
+    def transform_inplace(self) -> None:
+        self.data[:] = self.data.translate(_number_g_table(self.e))
+
+    def reverse_inplace(self) -> None:
+        self.data[:] = self.data.translate(_number_g_table(self.e))
+
+    def to_numbers(self) -> list:
+        return [GhostNumberG(b, self.e) for b in self.data]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: int) -> GhostNumberG:
+        return GhostNumberG(self.data[index], self.e)
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.data)
+
 def pq_derive(seed: bytes, context: bytes, length: int = 64) -> bytes:
     """
     Derivador pseudoquântico sem hashlib.
@@ -1,6 +1,18 @@
-import time
+import cProfile
+import io
+import json
 import math
-from collections import Counter
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+from . import ghost_backend_g as backend
+from .ghost_pq_hybrid import simulate_kyber_encapsulate
 
 # Funções de benchmark para medir o desempenho e a entropia de funções criptográficas.
 # Essas funções são projetadas para avaliar o desempenho de algoritmos de criptografia
@@ -10,9 +22,10 @@ def measure_entropy(data: bytes) -> float:
     """
     if not data:
         return 0.0
-    counter = Counter(data)
+    # Histograma via backend (bincount no NumPy); fsum torna o resultado independente da ordem
+    counts = backend.byte_histogram(data)
     total = len(data)
-    entropy = -sum((count / total) * math.log2(count / total) for count in counter.values())
+    entropy = -math.fsum((count / total) * math.log2(count / total) for count in counts if count)
     return entropy
 
 # Função de benchmark para medir o tempo e a entropia de uma operação
@@ -36,3 +49,380 @@ def benchmark_operation(func, *args, **kwargs):
         "entropy_bits_per_byte": entropy,
         "result": result
     }
+
+
+# ---------------------------------------------------------------------- #
+# Benchmark de memória (tracemalloc)
+# ---------------------------------------------------------------------- #
+# Mede, por estágio e de ponta a ponta, o pico de memória alocada (acima da linha de base),
+# o pico por MB de entrada e a memória/quantidade de blocos que permanecem alocados.
+# Os relatórios são listas de dicionários serializáveis em JSON e podem ser comparados
+# com limites fixos ou com um relatório de referência para detectar regressões.
+DEFAULT_MEMORY_SIZES = (1024, 64 * 1024, 1024 * 1024)
+_MB = 1024 * 1024
+
+
+class _NullWriter(io.TextIOBase):
+    # Descarta os prints dos estágios para não contaminar a medição nem a saída JSON
+    def write(self, text):
+        return len(text)
+
+
+def memory_profile_operation(func, *args, **kwargs):
+    """
+    Mede o pico de memória e as alocações remanescentes de uma função.
+    Retorna (resultado, métricas).
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        with redirect_stdout(_NullWriter()):
+            result = func(*args, **kwargs)
+        duration = time.perf_counter() - start
+
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    metrics = {
+        "duration_seconds": duration,
+        "peak_bytes": max(peak - baseline, 0),
+        "retained_bytes": current - baseline,
+        "retained_blocks": sum(stat.count_diff for stat in diff),
+    }
+    return result, metrics
+
+
+def _sample_payload(size: int) -> bytes:
+    # Metade texto repetitivo (comprimível), metade pseudoaleatória: formato de produção típico
+    rnd = random.Random(size)
+    text = (b"GhostEncryptor V26G - payload de benchmark de memoria. " * (size // 56 + 1))[:size // 2]
+    noise = bytes(rnd.getrandbits(8) for _ in range(size - len(text)))
+    return text + noise
+
+
+def _encryptor_stages(encryptor, plaintext: bytes) -> list:
+    """Lista (nome, função) dos estágios, encadeando os resultados intermediários."""
+    state = {}
+
+    def run(name, func):
+        def stage():
+            state[name] = func()
+            return state[name]
+        return name, stage
+
+    if hasattr(encryptor, "operator_g"):  # GhostEncryptorV26G (Final)
+        def iv():
+            return encryptor._session_keys()[1][:16]
+        return [
+            run("compress", lambda: encryptor.compressor.compress(plaintext)),
+            run("operator", lambda: encryptor.operator_g.apply_operations(state["compress"])),
+            # _session_keys() fica em cache na instância: mede-se a derivação completa do KEM
+            run("kem", lambda: simulate_kyber_encapsulate(encryptor.seed)),
+            run("gcbc_encrypt", lambda: encryptor.cipher.encrypt_gcbc(state["operator"], iv(), rounds=9)),
+            run("mac", lambda: encryptor.mac.generate_mac(state["gcbc_encrypt"])),
+            run("gcbc_decrypt", lambda: encryptor.cipher.decrypt_gcbc(state["gcbc_encrypt"], iv(), rounds=9)),
+            run("operator_reverse", lambda: encryptor.operator_g.reverse_operations(state["gcbc_decrypt"])),
+            run("decompress", lambda: encryptor.compressor.decompress(state["operator_reverse"])),
+            run("encrypt_total", lambda: encryptor.encryptByte(plaintext)),
+            run("decrypt_total", lambda: encryptor.decryptByte(state["encrypt_total"])),
+        ]
+
+    if hasattr(encryptor, "transformer"):  # GhostCore
+        iv = encryptor.main_key[:16]
+        return [
+            run("compress", lambda: encryptor.compressor.compress(plaintext)),
+            run("transform", lambda: encryptor.transformer.transform(state["compress"], rounds=9)),
+            run("gcbc_encrypt", lambda: encryptor.matrix_cipher.encrypt_gcbc(state["transform"], iv, rounds=9)),
+            run("encrypt_total", lambda: encryptor.encrypt(plaintext)),
+            run("decrypt_total", lambda: encryptor.decrypt(state["encrypt_total"])),
+        ]
+
+    return [
+        run("encrypt_total", lambda: encryptor.encrypt(plaintext)),
+        run("decrypt_total", lambda: encryptor.decrypt(state["encrypt_total"])),
+    ]
+
+
+def memory_benchmark(encryptor, sizes=DEFAULT_MEMORY_SIZES) -> list:
+    """
+    Executa o benchmark de memória para cada tamanho de payload.
+    Retorna uma lista de registros: {size, stage, peak_bytes, peak_bytes_per_mb, ...}.
+    """
+    report = []
+    for size in sizes:
+        plaintext = _sample_payload(size)
+        for name, stage in _encryptor_stages(encryptor, plaintext):
+            _, metrics = memory_profile_operation(stage)
+            metrics.update({
+                "size": size,
+                "stage": name,
+                "peak_bytes_per_mb": metrics["peak_bytes"] * _MB / max(size, 1),
+            })
+            report.append(metrics)
+    return report
+
+
+def check_memory_thresholds(report: list, thresholds: dict) -> list:
+    """
+    Confere o relatório contra limites de pico por MB de entrada ({estágio: bytes}).
+    A chave "*" vale para todos os estágios. Retorna a lista de violações.
+    """
+    violations = []
+    for record in report:
+        limit = thresholds.get(record["stage"], thresholds.get("*"))
+        if limit is not None and record["peak_bytes_per_mb"] > limit:
+            violations.append(
+                f"{record['stage']} ({record['size']} bytes): "
+                f"{record['peak_bytes_per_mb']:.0f} B/MB > limite {limit:.0f} B/MB"
+            )
+    return violations
+
+
+def compare_memory_reports(report: list, baseline: list, tolerance: float = 0.10) -> list:
+    """Aponta estágios cujo pico cresceu mais que `tolerance` em relação ao relatório de referência."""
+    reference = {(r["size"], r["stage"]): r["peak_bytes"] for r in baseline}
+    regressions = []
+    for record in report:
+        previous = reference.get((record["size"], record["stage"]))
+        if previous and record["peak_bytes"] > previous * (1 + tolerance):
+            regressions.append(
+                f"{record['stage']} ({record['size']} bytes): "
+                f"{record['peak_bytes']} B > referência {previous} B (+{tolerance:.0%})"
+            )
+    return regressions
+
+
+def write_json_report(report: list, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+# ---------------------------------------------------------------------- #
+# Perfis de CPU (cProfile e amostragem)
+# ---------------------------------------------------------------------- #
+# cprofile_operation: perfil determinístico (todas as chamadas, com sobrecarga por chamada).
+# sample_operation: perfil por amostragem; uma thread lê a pilha da thread medida via
+# sys._current_frames a cada `interval` segundos, com sobrecarga quase nula no código medido.
+# As tabelas de hotspots são listas de dicionários (JSON) e as pilhas são exportadas no
+# formato "collapsed" (quadro;quadro;quadro contagem), lido por flamegraph.pl, speedscope
+# e inferno.
+DEFAULT_SAMPLE_INTERVAL = 0.001
+DEFAULT_TOP = 20
+
+
+def _frame_label(code) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{module}.{name}:{code.co_firstlineno}"
+
+
+def cprofile_operation(func, *args, **kwargs):
+    """
+    Executa a função sob cProfile. Retorna (resultado, métricas), com os hotspots
+    ordenados pelo tempo próprio de cada função.
+    """
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    with redirect_stdout(_NullWriter()):
+        result = profiler.runcall(func, *args, **kwargs)
+    duration = time.perf_counter() - start
+
+    hotspots = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in pstats.Stats(profiler).stats.items():
+        module = os.path.splitext(os.path.basename(filename))[0]
+        hotspots.append({
+            "function": f"{module}.{name}:{line}" if line else name,
+            "calls": calls,
+            "self_seconds": tottime,
+            "total_seconds": cumtime,
+        })
+    hotspots.sort(key=lambda h: h["self_seconds"], reverse=True)
+    return result, {"duration_seconds": duration, "hotspots": hotspots}
+
+
+# Class GhostSamplingProfilerG
+# Amostrador de pilhas em uma thread de fundo. Mede a thread que chamou start();
+# os quadros acima do ponto de início (quem chamou o profiler) não entram nas pilhas.
+class GhostSamplingProfilerG:
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = {}  # tupla de rótulos (raiz primeiro) -> nº de amostras
+        self.samples = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, root=None) -> None:
+        self._target = threading.get_ident()
+        self._root = root or sys._getframe(1)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ghost-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        # Amostras tiradas enquanto a thread medida já está parando o profiler são descartadas
+        own = {GhostSamplingProfilerG.stop.__code__, GhostSamplingProfilerG.__exit__.__code__}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None and frame is not self._root:
+                if frame.f_code in own:
+                    stack = []
+                    break
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                key = tuple(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def __enter__(self):
+        self.start(sys._getframe(1))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def hotspots(self) -> list:
+        """Tabela por função: amostras próprias (topo da pilha) e totais (em qualquer nível)."""
+        own, total = {}, {}
+        for stack, count in self.stacks.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for label in set(stack):
+                total[label] = total.get(label, 0) + count
+        samples = max(self.samples, 1)
+        table = [{
+            "function": label,
+            "self_samples": own.get(label, 0),
+            "total_samples": count,
+            "self_percent": 100.0 * own.get(label, 0) / samples,
+            "total_percent": 100.0 * count / samples,
+        } for label, count in total.items()]
+        table.sort(key=lambda h: (h["self_samples"], h["total_samples"]), reverse=True)
+        return table
+
+    def collapsed(self, prefix: str = None) -> str:
+        """Pilhas no formato collapsed, opcionalmente sob um quadro raiz `prefix`."""
+        lines = []
+        for stack, count in sorted(self.stacks.items()):
+            frames = ((prefix,) if prefix else ()) + stack
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+def sample_operation(func, *args, **kwargs):
+    """
+    Executa a função sob o amostrador de pilhas. Retorna (resultado, métricas), com os
+    hotspots e o texto collapsed para flamegraphs.
+    """
+    profiler = GhostSamplingProfilerG()
+    start = time.perf_counter()
+    with redirect_stdout(_NullWriter()), profiler:
+        result = func(*args, **kwargs)
+    duration = time.perf_counter() - start
+    return result, {
+        "duration_seconds": duration,
+        "samples": profiler.samples,
+        "hotspots": profiler.hotspots(),
+        "collapsed": profiler.collapsed(),
+    }
+
+
+def profile_benchmark(encryptor, size: int = 64 * 1024, mode: str = "sampling", top: int = DEFAULT_TOP) -> dict:
+    """
+    Perfila cada estágio do encriptador (mesmos estágios do benchmark de memória) em um
+    payload de `size` bytes. Retorna {"stages": [{stage, duration_seconds, hotspots}], "collapsed"};
+    no modo "sampling", o texto collapsed traz o nome do estágio como quadro raiz.
+    """
+    if mode not in ("cprofile", "sampling"):
+        raise ValueError(f"Modo de perfil desconhecido: {mode}")
+    operation = cprofile_operation if mode == "cprofile" else sample_operation
+    stages = []
+    collapsed = []
+    for name, stage in _encryptor_stages(encryptor, _sample_payload(size)):
+        _, metrics = operation(stage)
+        if mode == "sampling":
+            text = metrics.pop("collapsed")
+            collapsed.extend(f"{name};{line}" for line in text.splitlines())
+        metrics["hotspots"] = metrics["hotspots"][:top]
+        metrics.update({"size": size, "stage": name})
+        stages.append(metrics)
+    return {"mode": mode, "stages": stages, "collapsed": "\n".join(collapsed) + ("\n" if collapsed else "")}
+
+
+def format_hotspots(hotspots: list) -> str:
+    """Tabela de texto dos hotspots (cProfile ou amostragem)."""
+    lines = []
+    for h in hotspots:
+        if "calls" in h:
+            lines.append(f"{h['self_seconds']:>10.4f}s {h['total_seconds']:>10.4f}s {h['calls']:>9}  {h['function']}")
+        else:
+            lines.append(f"{h['self_percent']:>9.1f}% {h['total_percent']:>9.1f}% {h['self_samples']:>9}  {h['function']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .GhostEncryptorV26G_Final import GhostEncryptorV26G
+
+    parser = argparse.ArgumentParser(description="Benchmark de memória do GhostEncryptor V26G")
+    parser.add_argument("--seed", default="seed_benchmark_v26g")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_MEMORY_SIZES),
+                        help="tamanhos de payload separados por vírgula")
+    parser.add_argument("--json", help="arquivo de saída do relatório JSON")
+    parser.add_argument("--thresholds", help="JSON {estágio: pico máximo em bytes por MB}")
+    parser.add_argument("--baseline", help="relatório JSON de referência para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--profile", choices=("cprofile", "sampling"),
+                        help="em vez do benchmark de memória, perfila a CPU de cada estágio")
+    parser.add_argument("--collapsed", help="arquivo de saída das pilhas collapsed (modo sampling)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    args = parser.parse_args()
+
+    if args.profile:
+        size = int(args.sizes.split(",")[-1])
+        profile = profile_benchmark(GhostEncryptorV26G(args.seed.encode()), size, args.profile, args.top)
+        for stage in profile["stages"]:
+            print(f"== {stage['stage']} ({stage['size']} bytes, {stage['duration_seconds']:.4f}s)")
+            print(format_hotspots(stage["hotspots"]))
+        if args.json:
+            write_json_report(profile["stages"], args.json)
+        if args.collapsed:
+            with open(args.collapsed, "w", encoding="utf-8") as f:
+                f.write(profile["collapsed"])
+        sys.exit(0)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    report = memory_benchmark(GhostEncryptorV26G(args.seed.encode()), sizes)
+
+    for record in report:
+        print(f"{record['size']:>10} {record['stage']:<18} pico={record['peak_bytes']:>12} B "
+              f"({record['peak_bytes_per_mb']:>12.0f} B/MB) retidos={record['retained_bytes']:>10} B "
+              f"blocos={record['retained_blocks']:>6}")
+    if args.json:
+        write_json_report(report, args.json)
+
+    problems = []
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as f:
+            problems += check_memory_thresholds(report, json.load(f))
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            problems += compare_memory_reports(report, json.load(f), args.tolerance)
+    for problem in problems:
+        print(f"[❌] {problem}")
+    sys.exit(1 if problems else 0)
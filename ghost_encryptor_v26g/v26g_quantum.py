@@ -19,7 +19,7 @@ class GhostSecurityAutotuner:
         elif score > 100:
             return {"level": "medium", "rounds": 9}
         else:
-            return {"level": "low", "rounds": 6}
+            return {"level": "low", "rounds": 7}  # ímpar: rodadas pares se cancelam
 
 # Exemplo de encapsulamento via C com ctypes (para Kyber)
 import ctypes
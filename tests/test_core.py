@@ -0,0 +1,803 @@
+# test_core.py
+# Testes do GhostEncryptor V26G. Executar com `python -m pytest` ou `python tests/test_core.py`.
+
+import io
+import os
+import sys
+import json
+import random
+import socket
+import stat
+import tempfile
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ghost_encryptor_v26g import ghost_backend_g as backend
+from ghost_encryptor_v26g.ghost_audit_g import GhostAuditorG
+from ghost_encryptor_v26g.ghost_compact_g import (
+    GhostCompactFramerG, GhostCompactSessionG, decode_varint, encode_varint,
+)
+from ghost_encryptor_v26g.compressor_zlib import GhostCompressor
+from ghost_encryptor_v26g.ghost_compressor_g_adaptive import RAW_AUDIT_INTERVAL, GhostCompressorGAdaptive
+from ghost_encryptor_v26g.ghost_compressor_g_symbolic import GhostCompressorG
+from ghost_encryptor_v26g.ghost_daemon_g import (
+    GhostDaemonClientG, GhostEncryptionDaemonG, OP_DECRYPT, OP_ENCRYPT, STATUS_ERROR, decode_request,
+)
+from ghost_encryptor_v26g import ghost_core
+from ghost_encryptor_v26g.ghost_dedup_g import GhostDedupStoreG, iter_chunks
+from ghost_encryptor_v26g.ghost_dictionary_g import GhostDictionaryRegistryG, build_dictionary
+from ghost_encryptor_v26g.ghost_file_engine_g import GhostFileEngineG, run_pipeline
+from ghost_encryptor_v26g.ghost_archive_g import GhostArchiveG
+from ghost_encryptor_v26g.ghost_cache_g import GhostCacheG
+from ghost_encryptor_v26g.ghost_log_g import GhostLogReaderG, GhostLogWriterG
+from ghost_encryptor_v26g.ghost_header_g import CODEC_SYMBOLIC, HEADER_SIZE, GhostHeaderG
+from ghost_encryptor_v26g import ghost_mac_g
+from ghost_encryptor_v26g.ghost_mac_g import GhostMACG
+from ghost_encryptor_v26g.ghost_matrix_cipher_g import GhostMatrixCipherG
+from ghost_encryptor_v26g.ghost_operator_g import GhostOperatorG
+from ghost_encryptor_v26g.ghost_parallel_g import GhostParallelExecutorG
+from ghost_encryptor_v26g.ghost_pipeline_g import GhostPipelineBuilderG, GhostPipelineG, plan_stages
+from ghost_encryptor_v26g import ghost_seekable_g
+from ghost_encryptor_v26g.ghost_seekable_g import GhostSeekableG
+from ghost_encryptor_v26g.GhostEncryptorV26G_Final import GhostEncryptorV26G
+from ghost_encryptor_v26g.utils import GhostNumberG, GhostNumberGArray
+from ghost_encryptor_v26g.v26g_benchmark import (
+    check_memory_thresholds, compare_memory_reports, cprofile_operation, measure_entropy, memory_benchmark,
+    profile_benchmark, sample_operation,
+)
+
+
+SEED = b"seed_teste_v26g"
+
+
+def test_seekable_read_range_roundtrip():
+    data = bytes(range(256)) * 40 + b"fim do arquivo"
+    seekable = GhostSeekableG(SEED, block_size=1000)
+    container = seekable.encrypt(data)
+
+    assert seekable.decrypt(container) == data
+    with seekable.open(container) as reader:
+        assert reader.block_count == 11
+        assert reader.read_range(0, 10) == data[:10]
+        assert reader.read_range(995, 10) == data[995:1005]
+        assert reader.read_range(9000, 5000) == data[9000:]
+        assert reader.read_range(len(data), 5) == b''
+
+
+def test_seekable_detects_tampered_block():
+    data = b"bloco" * 1000
+    seekable = GhostSeekableG(SEED, block_size=1024)
+    container = bytearray(seekable.encrypt(data))
+    with seekable.open(bytes(container)) as reader:
+        offset, sealed_len, _ = reader.entries[2]
+    container[offset + sealed_len - 1] ^= 0x01
+
+    with seekable.open(bytes(container)) as reader:
+        assert reader.read_range(0, 1024) == data[:1024]
+        try:
+            reader.read_range(2048, 10)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Bloco adulterado não foi detectado.")
+
+
+def test_tree_mac_locates_corruption_and_matches_parallel():
+    data = os.urandom(10 * 512 + 100)
+    sequential = GhostMACG(SEED, mode="tree", block_size=512, workers=1)
+    parallel = GhostMACG(SEED, mode="tree", block_size=512, workers=2)
+
+    root, leaves = sequential.generate_tree(data)
+    assert len(leaves) == 11
+    assert parallel.generate_mac(data) == root
+    assert sequential.verify_mac(data, root)
+    # O pool de processos é criado uma vez e reaproveitado entre chamadas e instâncias
+    pool = ghost_mac_g._pools[2]
+    assert GhostMACG(SEED, mode="tree", block_size=512, workers=2).generate_mac(data) == root
+    assert ghost_mac_g._pools[2] is pool
+    ghost_mac_g.shutdown_pools()
+    assert not ghost_mac_g._pools
+
+    corrupted = bytearray(data)
+    corrupted[3 * 512 + 7] ^= 0xFF
+    assert sequential.locate_corrupted_blocks(bytes(corrupted), leaves) == [3]
+    assert sequential.verify_block(4, data[4 * 512:5 * 512], leaves, root)
+    assert not sequential.verify_block(3, corrupted[3 * 512:4 * 512], leaves, root)
+
+
+def test_daemon_pipelined_requests_over_unix_socket(capsys):
+    with tempfile.TemporaryDirectory() as tmp:
+        daemon = GhostEncryptionDaemonG(socket_path=os.path.join(tmp, "ghost.sock"))
+        daemon.start_in_thread()
+        try:
+            with GhostDaemonClientG(socket_path=daemon.socket_path, pool_size=2) as client:
+                messages = [b"mensagem %d" % i for i in range(5)]
+                ciphertexts = client.pipeline(SEED, [(OP_ENCRYPT, m) for m in messages])
+                assert client.pipeline(SEED, [(OP_DECRYPT, c) for c in ciphertexts]) == messages
+                assert client.verify(SEED, ciphertexts[0])
+
+                tampered = ciphertexts[0][:-1] + bytes([ciphertexts[0][-1] ^ 1])
+                assert not client.verify(SEED, tampered)
+                try:
+                    client.decrypt(SEED, tampered)
+                except ValueError:
+                    pass
+                else:
+                    raise AssertionError("Ciphertext adulterado foi aceito.")
+            assert capsys.readouterr().out == ""  # o daemon não imprime progresso por requisição
+
+            # Tamanho de seed além do fim da requisição é rejeitado com erro
+            body = b"E" + (7).to_bytes(4, "big") + (500).to_bytes(2, "big") + b"curta"
+            with pytest.raises(ValueError):
+                decode_request(body)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                conn.connect(daemon.socket_path)
+                conn.sendall(len(body).to_bytes(4, "big") + body)
+                response = conn.makefile("rb").read()
+            assert response[4] == STATUS_ERROR and response[5:9] == (7).to_bytes(4, "big")
+        finally:
+            daemon.stop()
+        assert list(daemon._instances) == [SEED]
+
+
+def test_daemon_pipeline_larger_than_socket_buffers():
+    with tempfile.TemporaryDirectory() as tmp:
+        daemon = GhostEncryptionDaemonG(socket_path=os.path.join(tmp, "ghost.sock"))
+        daemon.start_in_thread()
+        try:
+            with GhostDaemonClientG(socket_path=daemon.socket_path, timeout=20) as client:
+                # Respostas grandes (1 MiB descomprimido) intercaladas com requisições grandes:
+                # os dois sentidos excedem os buffers do socket ao mesmo tempo
+                ciphertext = client.encrypt(SEED, bytes(1024 * 1024))
+                operations = [(OP_DECRYPT, ciphertext), (b"X", bytes(256 * 1024))] * 16
+                with pytest.raises(ValueError, match="Operação desconhecida"):
+                    client.pipeline(SEED, operations)
+                results = client.pipeline(SEED, [(OP_DECRYPT, ciphertext)] * 16)
+                assert all(r == bytes(1024 * 1024) for r in results)
+        finally:
+            daemon.stop()
+
+
+def test_parallel_executor_matches_single_core():
+    data = os.urandom(50_001)
+    iv = b"0123456789abcdef"
+    cipher = GhostMatrixCipherG(SEED)
+    operator = GhostOperatorG(SEED)
+
+    with GhostParallelExecutorG(workers=3, threshold=1024, min_slice=4096) as executor:
+        par_cipher = GhostMatrixCipherG(SEED, executor=executor)
+        par_operator = GhostOperatorG(SEED, executor=executor)
+
+        encrypted = par_cipher.encrypt_gcbc(data, iv, rounds=9)
+        assert encrypted == cipher.encrypt_gcbc(data, iv, rounds=9)
+        assert par_cipher.decrypt_gcbc(encrypted, iv, rounds=9) == data
+        assert par_cipher.encrypt_gcbc(data, iv, rounds=4) == data
+
+        transformed = par_operator.apply_operations(data)
+        assert transformed == operator.apply_operations(data)
+        assert par_operator.reverse_operations(transformed) == data
+
+
+def _run_with_backend(name, func):
+    previous = backend.get_backend()
+    backend.set_backend(name)
+    try:
+        return func()
+    finally:
+        backend.set_backend(previous)
+
+
+def test_backends_produce_identical_output():
+    if not backend.NUMPY_AVAILABLE:
+        pytest.skip("NumPy não instalado")
+
+    data = os.urandom(10_007)
+    iv = b"0123456789abcdef"
+
+    def run_all():
+        cipher = GhostMatrixCipherG(SEED)
+        operator = GhostOperatorG(SEED)
+        return [
+            cipher.encrypt_gcbc(data, iv, rounds=3),
+            operator.apply_operations(data),
+            operator.reverse_operations(data),
+            operator.g_add_bytes(data),
+            operator.g_sub_bytes(data),
+            backend.xor_keys(data, [iv, SEED, b"abc"], offset=13),
+            GhostCompressorG(SEED).compress(data),
+            backend.xor_byte(data, 0x1F3),
+            backend.byte_histogram(data),
+            measure_entropy(data),
+        ]
+
+    assert _run_with_backend("numpy", run_all) == _run_with_backend("python", run_all)
+
+
+def test_memory_benchmark_reports_stages_and_thresholds():
+    report = memory_benchmark(GhostEncryptorV26G(SEED), sizes=[2048])
+    stages = [record["stage"] for record in report]
+    assert stages[0] == "compress" and "mac" in stages and stages[-1] == "decrypt_total"
+    assert all(record["peak_bytes"] >= 0 and record["size"] == 2048 for record in report)
+
+    assert check_memory_thresholds(report, {"*": float("inf")}) == []
+    assert len(check_memory_thresholds(report, {"encrypt_total": 0})) == 1
+    inflated = [dict(record, peak_bytes=record["peak_bytes"] * 2 + 1) for record in report]
+    assert compare_memory_reports(report, report) == []
+    assert len(compare_memory_reports(inflated, report)) == len(report)
+
+
+def _json_message(rnd):
+    return json.dumps({
+        "event": rnd.choice(["login", "logout", "purchase", "refund"]),
+        "user_id": rnd.randint(1, 10**6),
+        "session": "%016x" % rnd.getrandbits(64),
+        "device": {"os": rnd.choice(["android", "ios", "linux"]), "app_version": "5.12.%d" % rnd.randint(0, 9)},
+        "status": "ok",
+    }).encode()
+
+
+def test_preset_dictionary_shrinks_small_messages():
+    rnd = random.Random(42)
+    registry = GhostDictionaryRegistryG()
+    dict_id = registry.register(build_dictionary([_json_message(rnd) for _ in range(200)], size=4096))
+    message = _json_message(rnd)
+
+    plain = GhostCompressorG(SEED)
+    with_dict = GhostCompressorG(SEED, dictionary_id=dict_id, registry=registry)
+    compressed = with_dict.compress(message)
+    assert compressed[:3] == b'\x00G\x02'
+    assert len(compressed) < len(plain.compress(message)) * 0.8
+    assert GhostCompressorG(SEED, registry=registry).decompress(compressed) == message
+
+    adaptive = GhostCompressorGAdaptive(dictionary_id=dict_id, registry=registry)
+    assert adaptive.decompress(adaptive.compress(message)) == message
+    with pytest.raises(ValueError):
+        GhostCompressorG(SEED, registry=GhostDictionaryRegistryG()).decompress(compressed)
+
+
+def test_adaptive_compressor_bypasses_incompressible_data():
+    compressor = GhostCompressorGAdaptive(throughput_target=0)
+    noise = os.urandom(64 * 1024)
+    text = b"linha de log repetitiva 0123456789\n" * 2000
+
+    stored = compressor.compress(noise)
+    assert stored[0] == 0x03 and stored[1:] == noise
+    packed = compressor.compress(text)
+    assert packed[0] == 0x01 and len(packed) < len(text) // 10
+    assert compressor.decompress(stored) == noise
+    assert compressor.decompress(packed) == text
+    small = os.urandom(50)
+    assert compressor.decompress(compressor.compress(small)) == small
+
+    stats = compressor.decision_stats()
+    assert stats["raw"]["count"] == 1 and stats["level_9"]["hit_rate"] == 1.0
+    assert abs(sum(entry["share"] for entry in stats.values()) - 1.0) < 1e-9
+
+    # Decisões "raw" são conferidas por amostragem: a sonda só vê ruído, mas o resto é compressível
+    compressor.reset_stats()
+    tricky = bytearray(64 * 1024)
+    for offset in (0, 30720, 61440):
+        tricky[offset:offset + 4096] = os.urandom(4096)
+    outputs = [compressor.compress(bytes(tricky)) for _ in range(RAW_AUDIT_INTERVAL + 1)]
+    assert [o[0] for o in outputs].count(0x01) == 2 and compressor.decompress(outputs[0]) == tricky
+    raw = compressor.decision_stats()["raw"]
+    assert (raw["count"], raw["checked"], raw["hit_rate"]) == (RAW_AUDIT_INTERVAL + 1, 2, 0.0)
+
+
+def test_shared_encryptor_is_thread_safe():
+    encryptor = GhostEncryptorV26G(SEED)
+    messages = [os.urandom(200 + i) for i in range(40)]
+    expected = [encryptor.encrypt(m) for m in messages]
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(offset, len(messages), 4):
+                ciphertext = encryptor.encrypt(messages[i])
+                assert ciphertext == expected[i]
+                assert encryptor.decrypt(ciphertext) == messages[i]
+        except Exception as e:  # pragma: no cover - só em caso de falha
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+    try:
+        assert encryptor.encrypt_concurrent(messages, max_workers=4) == expected
+        assert encryptor.decrypt_concurrent(expected) == messages
+    finally:
+        encryptor.shutdown()
+
+
+def test_header_records_rounds_and_mac_mode():
+    message = b"parametros autodescritos " * 50
+    encryptor = GhostEncryptorV26G(SEED, rounds=3)
+    ciphertext = encryptor.encryptByte(message)
+    header = GhostHeaderG.unpack(ciphertext)
+    assert (header.rounds, header.mac_mode) == (3, "linear")
+    assert GhostEncryptorV26G(SEED).decryptByte(ciphertext) == message
+    assert GhostEncryptorV26G(SEED).decrypt(encryptor.encrypt(message, rounds=11)) == message
+
+    tree = GhostEncryptorV26G(SEED, mac_mode="tree")
+    tree_ciphertext = tree.encryptByte(message)
+    assert GhostHeaderG.unpack(tree_ciphertext).mac_mode == "tree"
+    assert encryptor.decryptByte(tree_ciphertext) == message
+
+    # Alterar as rodadas no cabeçalho invalida o MAC-G
+    tampered = bytearray(ciphertext)
+    tampered[5] = 9
+    with pytest.raises(ValueError):
+        encryptor.decryptByte(bytes(tampered))
+
+
+def test_legacy_ciphertext_without_header_still_decrypts():
+    encryptor = GhostEncryptorV26G(SEED)
+    message = b"formato legado"
+    current = encryptor.encryptByte(message)
+    encrypted = current[HEADER_SIZE + 96:]
+    legacy = current[HEADER_SIZE:HEADER_SIZE + 32] + encryptor.mac.generate_mac(encrypted) + encrypted
+    assert encryptor.decryptByte(legacy) == message
+
+    # Pubkey legada que começa com um cabeçalho válido: o MAC-G com cabeçalho falha e o quadro
+    # é conferido como legado
+    ambiguous = GhostHeaderG(CODEC_SYMBOLIC, 9).pack() + legacy[HEADER_SIZE:]
+    assert GhostHeaderG.has_header(ambiguous) and encryptor.decryptByte(ambiguous) == message
+    assert encryptor.verify_only(ambiguous) and encryptor.verify_stream(io.BytesIO(ambiguous), len(ambiguous))
+    assert not encryptor.verify_only(ambiguous[:-1] + bytes([ambiguous[-1] ^ 1]))
+
+
+def test_even_or_zero_rounds_are_rejected():
+    for rounds in (0, 4, 6, 256):
+        with pytest.raises(ValueError):
+            GhostEncryptorV26G(SEED, rounds=rounds)
+        with pytest.raises(ValueError):
+            GhostHeaderG(CODEC_SYMBOLIC, rounds)
+    with pytest.raises(ValueError):
+        GhostEncryptorV26G(SEED).encryptByte(b"dados", rounds=2)
+    ciphertext = bytearray(GhostEncryptorV26G(SEED).encryptByte(b"dados"))
+    ciphertext[5] = 4  # rodadas pares no cabeçalho: rejeitado antes de decifrar
+    with pytest.raises(ValueError):
+        GhostHeaderG.unpack(bytes(ciphertext))
+    with pytest.raises(ValueError):
+        GhostEncryptorV26G(SEED).decryptByte(bytes(ciphertext))
+
+
+def test_ghost_core_uses_autotuned_rounds_from_header(monkeypatch):
+    # A libkyber.so nativa não faz parte do repositório; o KEM é substituído por um segredo fixo
+    monkeypatch.setattr(ghost_core, "kyber_encapsulate", lambda: (b"ct", bytes(range(64))))
+    core = ghost_core.GhostCore("seed_core")
+    for message in (b"a", b"mensagem media " * 20, os.urandom(3000)):
+        payload = core.encrypt(message)
+        header = GhostHeaderG.unpack(payload)
+        assert header.rounds in (7, 9, 11, 13)
+        assert core.decrypt(payload) == message
+
+
+def test_compact_frames_and_session():
+    assert all(decode_varint(encode_varint(n)) == (n, len(encode_varint(n))) for n in (0, 127, 128, 2 ** 40))
+    encryptor = GhostEncryptorV26G(SEED)
+    framer = GhostCompactFramerG(encryptor, tag_length=8)
+    message = b'{"id": 7, "ok": true}'
+    frame = framer.seal(message)
+    assert len(frame) < len(encryptor.encryptByte(message)) - 80
+    assert framer.open(frame) == message
+    with pytest.raises(ValueError):
+        framer.open(frame[:-1] + bytes([frame[-1] ^ 1]))
+
+    sender, receiver = GhostCompactSessionG(framer), GhostCompactSessionG(GhostCompactFramerG(encryptor, tag_length=8))
+    messages = [f"msg {i}".encode() for i in range(5)]
+    frames = [sender.seal(m) for m in messages]
+    assert len(frames[1]) < len(frames[0]) - 28
+    assert receiver.open_stream(b''.join(frames)) == messages
+    with pytest.raises(ValueError):
+        receiver.open(frames[2])  # repetição
+
+
+def test_compact_rejects_tag_downgrade_and_forged_handshake():
+    encryptor = GhostEncryptorV26G(SEED)
+    strict = GhostCompactFramerG(encryptor, tag_length=32)
+    weak_frame = GhostCompactFramerG(encryptor, tag_length=8).seal(b"rebaixado")
+    with pytest.raises(ValueError, match="Tamanho de tag"):
+        strict.open(weak_frame)
+
+    sender = GhostCompactSessionG(GhostCompactFramerG(encryptor))
+    receiver = GhostCompactSessionG(GhostCompactFramerG(encryptor))
+    first, second = sender.seal(b"primeiro"), sender.seal(b"segundo")
+    with pytest.raises(ValueError):
+        receiver.open(first[:-1] + bytes([first[-1] ^ 1]))  # handshake forjado
+    with pytest.raises(ValueError, match="chave pública"):
+        receiver.open(second)
+    assert receiver.open(first) == b"primeiro" and receiver.open(second) == b"segundo"
+
+
+def test_file_engine_pipeline_roundtrip_and_errors():
+    data = os.urandom(5000) + b"texto repetido " * 2000
+    engine = GhostFileEngineG(SEED, chunk_size=4096, queue_depth=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        src, enc, out = (os.path.join(tmp, name) for name in ("in.bin", "in.g", "out.bin"))
+        with open(src, "wb") as f:
+            f.write(data)
+        stats = engine.encrypt_file(src, enc)
+        assert stats["items"] == -(-len(data) // 4096)
+        engine.decrypt_file(enc, out)
+        with open(out, "rb") as f:
+            assert f.read() == data
+        # O resultado é um contêiner indexado comum
+        assert GhostSeekableG(SEED).read_range(enc, 4090, 20) == data[4090:4110]
+        # encryptFile/decryptFile agora funcionam também pela instância
+        encryptor = GhostEncryptorV26G(SEED)
+        encryptor.encryptFile(src, enc, encryptor.encryptByte)
+        encryptor.decryptFile(enc, out, encryptor.decryptByte)
+        with open(out, "rb") as f:
+            assert f.read() == data
+
+    # Falhas em qualquer etapa são propagadas sem travar as threads
+    items = iter(range(100))
+    with pytest.raises(ValueError):
+        run_pipeline(lambda: next(items, None), lambda i: i if i < 50 else int("x"), lambda r: None, 1)
+
+
+def test_bounded_streaming_decompression():
+    bomb = b"\x00" * (4 * 1024 * 1024)
+    encryptor = GhostEncryptorV26G(SEED, max_output=1024 * 1024)
+    ciphertext = encryptor.encryptByte(bomb)
+    assert len(ciphertext) < 10_000
+    with pytest.raises(ValueError):
+        encryptor.decryptByte(ciphertext)
+
+    chunks = list(encryptor.decrypt_iter(ciphertext, chunk_size=64 * 1024, max_output=len(bomb)))
+    assert max(len(c) for c in chunks) <= 64 * 1024 and b"".join(chunks) == bomb
+    assert list(encryptor.decrypt_iter(encryptor.encryptByte(b""))) == []
+
+    for compressor in (GhostCompressor(), GhostCompressorGAdaptive(), GhostCompressorG(SEED)):
+        packed = compressor.compress(bomb)
+        assert compressor.decompress(packed) == bomb
+        with pytest.raises(ValueError):
+            compressor.decompress(packed, max_output=1000)
+        # None por chamada desativa o limite; 0 é um limite literal
+        compressor.max_output = 1000
+        assert compressor.decompress(packed, max_output=None) == bomb
+        with pytest.raises(ValueError):
+            compressor.decompress(packed, max_output=0)
+        with pytest.raises(ValueError):
+            compressor.decompress(packed[:-8])
+
+
+def test_dedup_backup_scales_with_changed_data():
+    rnd = random.Random(39)
+    original = bytes(rnd.getrandbits(8) for _ in range(120_000))
+    changed = original[:60_000] + b"linha inserida no meio" + original[60_000:]
+    assert b"".join(iter_chunks(io.BytesIO(changed), 256, 1024, 4096)) == changed
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with GhostDedupStoreG(os.path.join(tmp, "store"), SEED, 1024, 4096, 16384) as store:
+            manifest, first = store.backup_stream(io.BytesIO(original))
+            assert first["new_chunks"] == first["chunks"] > 10
+            manifest2, second = store.backup_stream(io.BytesIO(changed))
+            assert second["new_chunks"] <= 2 and second["bytes_new"] < len(changed) // 5
+
+            out = io.BytesIO()
+            store.restore_stream(manifest2, out)
+            assert out.getvalue() == changed
+
+        # O índice persiste entre execuções
+        with GhostDedupStoreG(os.path.join(tmp, "store"), SEED, 1024, 4096, 16384) as store:
+            assert store.backup_stream(io.BytesIO(original))[1]["new_chunks"] == 0
+            out = io.BytesIO()
+            store.restore_stream(manifest, out)
+            assert out.getvalue() == original
+
+
+def test_dedup_vectorized_cuts_and_unchanged_backup_cost():
+    data = os.urandom(300_000)
+    chunks = lambda: list(iter_chunks(io.BytesIO(data), 1024, 4096, 16384))
+    if backend.NUMPY_AVAILABLE:
+        assert _run_with_backend("numpy", chunks) == _run_with_backend("python", chunks)
+
+    encryptor = GhostEncryptorV26G(SEED)
+    start = time.perf_counter()
+    encryptor.encryptByte(data)
+    encrypt_time = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        with GhostDedupStoreG(os.path.join(tmp, "store"), SEED) as store:
+            store.backup_stream(io.BytesIO(data))
+            start = time.perf_counter()
+            assert store.backup_stream(io.BytesIO(data))[1]["new_chunks"] == 0
+            assert time.perf_counter() - start < encrypt_time / 3
+
+
+def test_seekable_incremental_update():
+    seekable = GhostSeekableG(SEED, block_size=1000)
+    data = bytearray(os.urandom(9500))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dados.gs")
+        with open(path, "wb") as f:
+            f.write(seekable.encrypt(bytes(data)))
+
+        stats = seekable.update_range(path, 4321, b"EDITADO")
+        data[4321:4328] = b"EDITADO"
+        assert stats["rewritten"] + stats["appended"] == 1
+        assert seekable.decrypt(path) == data
+
+        data[7000:7002] = b"xy"
+        data += b"final estendido" * 100
+        stats = seekable.update_file(path, io.BytesIO(bytes(data)))
+        assert stats["rewritten"] + stats["appended"] == 1 + 2  # bloco 7 + bloco 9 (parcial) + bloco 10
+        assert seekable.read_range(path, 6990, 30) == bytes(data[6990:7020])
+        assert seekable.decrypt(path) == data
+
+        # Contêineres da versão 1 (sem impressões digitais) continuam legíveis e atualizáveis
+        header = ghost_seekable_g._HEADER.pack(ghost_seekable_g.MAGIC, 1, 1000, seekable.pubkey)
+        sealed = [seekable.seal_block(i, bytes(data[i * 1000:(i + 1) * 1000])) for i in range(3)]
+        index, offset = b"", len(header)
+        for i, block in enumerate(sealed):
+            index += ghost_seekable_g._INDEX_ENTRY_V1.pack(offset, len(block), 1000)
+            offset += len(block)
+        out = io.BytesIO()
+        out.write(header + b"".join(sealed))
+        seekable._finish_container(out, header, index, b"", offset, 3, 3000)
+        with open(path, "wb") as f:
+            f.write(out.getvalue())
+        assert seekable.read_range(path, 1500, 10) == bytes(data[1500:1510])
+        seekable.update_range(path, 10, b"")  # dados vazios: só converte o índice para a v3
+        with seekable.open(path) as reader:
+            assert reader.version == 3 and reader.read_range(0, 3000) == bytes(data[:3000])
+        with open(path, "wb") as f:
+            f.write(out.getvalue())
+        seekable.update_range(path, 2990, b"v3!" * 10)
+        with seekable.open(path) as reader:
+            assert reader.version == 3 and None not in reader.fingerprints
+            assert reader.read_range(0, 3020) == bytes(data[:2990]) + b"v3!" * 10
+
+        # Impressões digitais com chave por contêiner: o mesmo bloco muda de impressão entre
+        # contêineres, e outra seed não reproduz a impressão
+        first, second = (GhostSeekableG(SEED, block_size=1000).open(seekable.encrypt(b"igual" * 300))
+                         for _ in range(2))
+        assert first.salt != second.salt and first.fingerprints[0] != second.fingerprints[0]
+        assert GhostSeekableG(b"outra", 1000).fingerprint(0, b"igual" * 200, first.salt) != first.fingerprints[0]
+        assert seekable.fingerprint(0, b"igual" * 200, first.salt) == first.fingerprints[0]
+
+
+def test_pipeline_builder_elides_cancelling_stages():
+    assert plan_stages([{"stage": "gcbc", "rounds": 10}]) == []
+    assert plan_stages([{"stage": "transform", "rounds": 9}, {"stage": "gcbc", "rounds": 9}]) == [("xor", ("iv",))]
+
+    message = "pipeline declarativo " * 40
+    builder = GhostPipelineBuilderG().compress("symbolic").operator().transform(3).gcbc(9).xor(["iv"], 2).mac("tree")
+    optimized, naive = builder.build(SEED), builder.build(SEED, optimize=False)
+    assert len(optimized.plan) == 3 and len(naive.plan) == 2 + 3 + 9 + 2
+    ciphertext = optimized.encrypt_text(message)
+    assert ciphertext == naive.encrypt_text(message)
+    assert naive.decrypt_text(ciphertext) == message
+
+    core = GhostPipelineG.from_config(SEED, {"preset": "core"})
+    assert core.decrypt_text(core.encrypt_text(message)) == message
+    with pytest.raises(ValueError):
+        core.decrypt_text(ciphertext)  # outra configuração: o MAC-G não confere
+
+
+def test_ghost_number_array_matches_scalar():
+    data = bytes(range(256)) * 3
+    for level in (0, 5, 19):
+        array = GhostNumberGArray(data, level)
+        assert array.transform() == bytes(GhostNumberG(b, level).transform() for b in data)
+        assert array.transform() == GhostNumberG.transform_bytes(data, level)
+        assert GhostNumberGArray(array.transform(), level).reverse() == data
+        array.transform_inplace()
+        array.reverse_inplace()
+        assert bytes(array) == data and array[7].transform() == GhostNumberG(7, level).transform()
+    assert bytes(GhostNumberGArray.from_numbers(array.to_numbers())) == data
+
+
+def test_verify_only_and_parallel_audit():
+    encryptor = GhostEncryptorV26G(SEED)
+    messages = [os.urandom(50) * (i + 1) for i in range(6)]
+    ciphertexts = [encryptor.encryptByte(m) for m in messages]
+    legacy = ciphertexts[0][HEADER_SIZE:HEADER_SIZE + 32] + encryptor.mac.generate_mac(ciphertexts[0][HEADER_SIZE + 96:]) \
+        + ciphertexts[0][HEADER_SIZE + 96:]
+    tree = GhostEncryptorV26G(SEED, mac_mode="tree").encryptByte(messages[-1])
+    assert all(encryptor.verify_only(c) for c in ciphertexts + [legacy, tree])
+    corrupted = ciphertexts[2][:-1] + bytes([ciphertexts[2][-1] ^ 0x40])
+    assert not encryptor.verify_only(corrupted)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, blob in enumerate(ciphertexts + [legacy, tree, corrupted, b"curto"]):
+            with open(os.path.join(tmp, f"obj{i}.g"), "wb") as f:
+                f.write(blob)
+        for name in ("obj0.g", "obj6.g", "obj7.g"):  # atual, legado e árvore, em pedaços
+            with open(os.path.join(tmp, name), "rb") as f:
+                assert encryptor.verify_stream(f, chunk_size=7)
+        report = GhostAuditorG(SEED, workers=2, batch_size=3).audit_directory(tmp)
+        assert report["checked"] == 10 and report["passed"] == 8
+        assert sorted(os.path.basename(f["name"]) for f in report["failed"]) == ["obj8.g", "obj9.g"]
+
+
+def test_append_only_log_tail_and_checkpoints():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "auditoria.glog")
+        writer = GhostLogWriterG(path, SEED, checkpoint_interval=3)
+        reader = GhostLogReaderG(path, SEED)
+        writer.append(b"evento 0")
+        assert reader.poll() == [b"evento 0"]
+        sizes = []
+        for i in range(1, 5):
+            writer.append(f"evento {i}")
+            sizes.append(os.path.getsize(path))
+        writer.append_batch([b"lote a", b"lote b"])
+        assert reader.poll() == [f"evento {i}".encode() for i in range(1, 5)] + [b"lote a", b"lote b"]
+        assert reader.verified_through == 6
+        writer.close()
+
+        # Reabrir retoma a sequência e a cadeia; custo do acréscimo independe do tamanho do log
+        with GhostLogWriterG(path, SEED, checkpoint_interval=3) as writer:
+            writer.append(b"depois de reabrir")
+        assert reader.poll() == [b"depois de reabrir"] and reader.verified_through == 7
+        reader.close()
+        assert abs((sizes[2] - sizes[1]) - (sizes[1] - sizes[0])) < 40
+
+        # Remover um registro antes de um checkpoint é detectado
+        data = open(path, "rb").read()
+        with open(path, "wb") as f:
+            f.write(data[:36] + data[36 + 2 + data[37]:])
+        with pytest.raises(ValueError):
+            with GhostLogReaderG(path, SEED) as tampered:
+                tampered.poll()
+
+        # Registro adulterado depois de registros válidos: o prefixo verificado é entregue e o
+        # erro vem na chamada seguinte, sem avançar a sequência
+        path = os.path.join(tmp, "parcial.glog")
+        with GhostLogWriterG(path, SEED) as writer:
+            for i in range(3):
+                writer.append(f"registro {i}")
+            with open(path, "r+b") as f:
+                f.seek(-1, os.SEEK_END)
+                last = f.read(1)
+                f.seek(-1, os.SEEK_END)
+                f.write(bytes([last[0] ^ 1]))
+            with GhostLogReaderG(path, SEED) as partial:
+                assert partial.poll() == [b"registro 0", b"registro 1"] and partial.sequence == 2
+                for _ in range(2):
+                    with pytest.raises(ValueError):
+                        partial.poll()
+                assert partial.sequence == 2
+
+
+def test_persistent_cache_matrix_and_kem():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        cold = GhostEncryptorV26G(SEED, cache=cache_dir)
+        assert cold.cipher.matrix == GhostMatrixCipherG(SEED).matrix
+        assert stat.S_IMODE(os.stat(cache_dir).st_mode) == 0o700
+        files = os.listdir(cache_dir)
+        assert len(files) == 2 and all(stat.S_IMODE(os.stat(os.path.join(cache_dir, f)).st_mode) == 0o600
+                                       for f in files)
+
+        cache = GhostCacheG(cache_dir)
+        warm = GhostEncryptorV26G(SEED, cache=cache)
+        assert (cache.hits, cache.misses) == (2, 0)
+        assert GhostEncryptorV26G(SEED).decryptByte(warm.encryptByte(b"inicio frio")) == b"inicio frio"
+
+        # Entrada corrompida é descartada e recalculada
+        path = os.path.join(cache_dir, files[0])
+        data = bytearray(open(path, "rb").read())
+        data[-1] ^= 1
+        open(path, "wb").write(bytes(data))
+        fresh = GhostCacheG(cache_dir)
+        fresh.warm(SEED)
+        assert fresh.misses == 1 and fresh.kem_for(SEED) == GhostEncryptorV26G(SEED)._session_keys()
+
+
+def test_persistent_cache_isolates_seeds():
+    with tempfile.TemporaryDirectory() as tmp:
+        first = GhostEncryptorV26G(b"seed-1", cache=tmp)
+        second = GhostEncryptorV26G(b"seed-6", cache=tmp)
+        assert second.cipher.matrix == GhostMatrixCipherG(b"seed-6").matrix
+        assert GhostEncryptorV26G(b"seed-6").decryptByte(second.encryptByte(b"isolado")) == b"isolado"
+        assert len({GhostCacheG.seed_key(f"seed-{i}".encode()) for i in range(200)}) == 200
+
+        # Arquivo de outra seed plantado no nome desta seed é recalculado, não usado
+        key_1, key_6 = GhostCacheG.seed_key(b"seed-1"), GhostCacheG.seed_key(b"seed-6")
+        for kind in ("matrix", "kem"):
+            os.replace(os.path.join(tmp, f"{kind}-{key_1}.gk"), os.path.join(tmp, f"{kind}-{key_6}.gk"))
+        cache = GhostCacheG(tmp)
+        assert cache.kem_for(b"seed-6") == GhostEncryptorV26G(b"seed-6")._session_keys()
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert first.decryptByte(first.encryptByte(b"ok")) == b"ok"
+
+
+def test_persistent_cache_warm_start_is_faster_than_cold():
+    def best_of(func, runs=20):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        counter = iter(range(1000))
+        cold = best_of(lambda: GhostCacheG(os.path.join(tmp, f"frio-{next(counter)}")).warm(SEED))
+        GhostCacheG(os.path.join(tmp, "quente")).warm(SEED)
+        warm = best_of(lambda: GhostCacheG(os.path.join(tmp, "quente")).warm(SEED))
+        assert warm < cold
+
+
+def test_packed_archive_list_and_extract():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "src")
+        os.makedirs(os.path.join(src, "sub"))
+        contents = {f"sub/nota_{i}.txt" if i % 2 else f"nota_{i}.txt": f"registro {i} ".encode() * (i + 1)
+                    for i in range(40)}
+        contents["vazio.txt"] = b""
+        for name, data in contents.items():
+            with open(os.path.join(src, *name.split("/")), "wb") as f:
+                f.write(data)
+
+        archive = GhostArchiveG(SEED, block_size=4096)
+        packed = os.path.join(tmp, "notas.gpack")
+        stats = archive.pack_directory(src, packed)
+        assert stats["files"] == len(contents) and stats["blocks"] > 1
+        encryptor = GhostEncryptorV26G(SEED)
+        assert stats["bytes_out"] < sum(len(encryptor.encryptByte(d)) for d in contents.values()) // 2
+
+        with archive.open(packed) as reader:
+            assert sorted(reader.names()) == sorted(contents)
+            assert reader.read("sub/nota_7.txt") == contents["sub/nota_7.txt"]
+            with pytest.raises(ValueError):
+                reader.extract("../fora.txt", tmp)
+
+        out = os.path.join(tmp, "out")
+        assert archive.extract_all(packed, out) == len(contents)
+        for name, data in contents.items():
+            assert open(os.path.join(out, *name.split("/")), "rb").read() == data
+
+        data = bytearray(open(packed, "rb").read())
+        data[100] ^= 1
+        with pytest.raises(ValueError):
+            with archive.open(bytes(data)) as reader:
+                reader.read("nota_0.txt")
+
+
+def test_profiling_hotspots_and_collapsed_stacks():
+    mac = GhostMACG(SEED)
+    payload = bytes(range(256)) * 512
+    _, metrics = cprofile_operation(mac.generate_mac, payload)
+    assert metrics["hotspots"][0]["function"].startswith("ghost_mac_g._ghash_v6_update")
+
+    _, metrics = sample_operation(lambda: [mac.generate_mac(payload) for _ in range(3)])
+    assert metrics["samples"] > 0
+    assert any(h["function"].startswith("ghost_mac_g._ghash_v6_update") for h in metrics["hotspots"])
+    for line in metrics["collapsed"].splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and "GhostSamplingProfilerG" not in stack
+
+    report = profile_benchmark(GhostEncryptorV26G(SEED), size=2048, mode="cprofile", top=5)
+    assert [s["stage"] for s in report["stages"]][:2] == ["compress", "operator"]
+    assert all(len(s["hotspots"]) <= 5 for s in report["stages"])
+    with pytest.raises(ValueError):
+        profile_benchmark(GhostEncryptorV26G(SEED), mode="perf")
+
+
+if __name__ == "__main__":
+    import inspect
+
+    for name, func in sorted(globals().items()):
+        if not (name.startswith("test_") and callable(func)):
+            continue
+        if inspect.signature(func).parameters:
+            print(f"[⏭️] {name} (requer fixtures do pytest)")
+            continue
+        try:
+            func()
+        except pytest.skip.Exception as e:
+            print(f"[⏭️] {name} ({e})")
+            continue
+        print(f"[✔️] {name}")